@@ -11,7 +11,7 @@
 from PyQt5 import QtWidgets
 from PyQt5.QtGui import QPainter, QBrush, QDoubleValidator, QIntValidator
 from PyQt5.QtWidgets import QWidget, QStyledItemDelegate, QStyleOptionViewItem, QStyle, \
-    QCompleter, QCheckBox, QComboBox
+    QCheckBox, QComboBox
 from PyQt5 import QtCore
 from PyQt5.QtCore import Qt, QModelIndex
 
@@ -22,6 +22,7 @@ from aas.model.concept import *
 from aas.model.submodel import *
 
 from aas_editor.settings import DEFAULT_COMPLETIONS
+from aas_editor.models.table_completions import createCompleter
 from aas_editor.utils.util import inheritors
 from aas_editor.utils.util_type import issubtype, getTypeName
 from aas_editor.widgets import CompleterComboBox
@@ -70,8 +71,7 @@ class EditDelegate(ColorDelegate):
             widget = LineEdit(parent)
             completions = DEFAULT_COMPLETIONS.get(objType, {}).get(attr, [])
             if completions:
-                completer = QCompleter(parent, completions=completions)
-                widget.setCompleter(completer)
+                widget.setCompleter(createCompleter(completions, parent))
         elif issubtype(objType, int):
             widget = LineEdit(parent)
             widget.setValidator(QIntValidator())
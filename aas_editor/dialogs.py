@@ -15,19 +15,22 @@ from inspect import isabstract
 from typing import Union, List, Dict, Optional
 
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPaintEvent
+from PyQt5.QtGui import QPaintEvent, QStandardItemModel, QStandardItem
 from PyQt5.QtWidgets import QLabel, QPushButton, QDialog, QDialogButtonBox, \
-    QGroupBox, QWidget, QVBoxLayout, QHBoxLayout
+    QGroupBox, QWidget, QVBoxLayout, QHBoxLayout, QTreeView
 
 from aas_editor.editWidgets import StandardInputWidget, SpecialInputWidget
 from aas_editor.settings import DEFAULTS, DEFAULT_COMPLETIONS, ATTRIBUTE_COLUMN, OBJECT_ROLE,\
     DEFAULT_ATTRS_TO_HIDE
 from aas_editor.delegates import ColorDelegate
+from aas_editor.models.table_diff import DiffModel
+from aas_editor.tools.diff import diffPackages
 from aas_editor.utils.util import inheritors, getReqParams4init, getParams4init, getDefaultVal, \
     getAttrDoc
 from aas_editor.utils.util_type import getTypeName, issubtype, isoftype, isSimpleIterableType, \
     isIterableType, isIterable
 from aas_editor.utils.util_classes import DictItem
+from aas_editor.utils.util_references import Usage, referableTarget
 from aas_editor.widgets import *
 from aas_editor import widgets
 
@@ -521,3 +524,65 @@ class AASReferenceGroupBox(ObjGroupBox):
         else:
             print("Item adding cancelled")
         dialog.deleteLater()
+
+
+class DiffDialog(QDialog):
+    """Shows the changes between two packages as tree"""
+
+    def __init__(self, oldPack, newPack, parent=None):
+        QDialog.__init__(self, parent)
+        self.setWindowTitle(f"Changes from {oldPack} to {newPack}")
+        changes = diffPackages(oldPack, newPack)
+        self.model = DiffModel(changes, self)
+        self.view = QTreeView(self)
+        self.view.setModel(self.model)
+        self.view.setUniformRowHeights(True)
+        self.view.expandAll()
+        self.view.resizeColumnToContents(0)
+        label = QLabel(f"{len(changes)} changes" if changes else "Packages are equal", self)
+        buttonBox = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttonBox.rejected.connect(self.reject)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.addWidget(label)
+        layout.addWidget(self.view)
+        layout.addWidget(buttonBox)
+        self.setMinimumSize(700, 500)
+
+
+class UsagesDialog(QDialog):
+    """Lists the referables referencing an element, a double click chooses the referencing one"""
+    COLUMNS = ("Element", "Attribute")
+
+    def __init__(self, obj: Referable, usages: List[Usage], parent=None):
+        QDialog.__init__(self, parent)
+        self.setWindowTitle(f"Usages of {obj.id_short}")
+        paths = {id(usage.obj): " / ".join(referableTarget(usage.obj) or (usage.obj.id_short,))
+                 for usage in usages}
+        self.usages = sorted(usages, key=lambda usage: (paths[id(usage.obj)], usage.attr))
+        self.model = QStandardItemModel(self)
+        self.model.setHorizontalHeaderLabels(self.COLUMNS)
+        for usage in self.usages:
+            row = [QStandardItem(paths[id(usage.obj)]), QStandardItem(usage.attr)]
+            for item in row:
+                item.setEditable(False)
+            self.model.appendRow(row)
+        self.view = QTreeView(self)
+        self.view.setModel(self.model)
+        self.view.setRootIsDecorated(False)
+        self.view.setUniformRowHeights(True)
+        self.view.resizeColumnToContents(0)
+        self.view.doubleClicked.connect(self.accept)
+        label = QLabel(f"{len(usages)} usages" if usages else f"{obj.id_short} is not referenced", self)
+        buttonBox = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttonBox.rejected.connect(self.reject)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.addWidget(label)
+        layout.addWidget(self.view)
+        layout.addWidget(buttonBox)
+        self.setMinimumSize(700, 500)
+
+    def chosenUsage(self) -> Optional[Usage]:
+        index = self.view.currentIndex()
+        return self.usages[index.row()] if index.isValid() else None
@@ -19,11 +19,12 @@ import pytz
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIntValidator, QDoubleValidator
 
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QDateTimeEdit, QCheckBox, QLineEdit, QCompleter, \
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QDateTimeEdit, QCheckBox, QLineEdit, \
     QComboBox, QDateEdit, QSpinBox, QHBoxLayout, QPlainTextEdit, QPushButton, \
     QFileDialog
 from aas.model.datatypes import Date
 
+from aas_editor.models.table_completions import createCompleter
 from aas_editor.utils.util import inheritors
 from aas_editor.utils.util_type import issubtype, getTypeName, isoftype
 from aas_editor.widgets import CompleterComboBox
@@ -242,8 +243,7 @@ class StandardInputWidget(QWidget):
         elif issubtype(self.objType, str):
             widget = LineEdit(self)
             if kwargs.get("completions"):
-                completer = QCompleter(kwargs["completions"], self)
-                widget.setCompleter(completer)
+                widget.setCompleter(createCompleter(kwargs["completions"], self))
         elif issubtype(self.objType, int):
             widget = LineEdit(self)
             widget.setValidator(QIntValidator())
@@ -45,6 +45,7 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
         self.initActions()
         self.initMenu()
         self.initToolbars()
+        self.initStatusBar()
         self.buildHandlers()
         self.readSettings()
         self.setWindowIcon(QIcon('aas_editor/icons/logo.svg'))
@@ -59,6 +60,11 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
                                             activated=self.setFocus2rightTree)
         self.switch2leftTreeSC = QShortcut(SC_FOCUS2LEFT_TREE, self,
                                            activated=self.packTreeView.setFocus)
+        self.parallelRestoreAct = QAction("Restore files in parallel", self,
+                                          statusTip="Read previously opened files concurrently "
+                                                    "in separate processes at startup",
+                                          checkable=True, checked=True)
+
         # Theme actions
         self.themeActs = []
         for theme in THEMES:
@@ -85,6 +91,8 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
         self.menuFile.addAction(self.packTreeView.saveAct)
         self.menuFile.addAction(self.packTreeView.saveAsAct)
         self.menuFile.addAction(self.packTreeView.saveAllAct)
+        self.menuFile.addAction(self.packTreeView.compareAct)
+        self.menuFile.addAction(self.packTreeView.mergeAct)
         self.menuFile.addSeparator()
         self.menuStandardFile = QMenu("Set default new File type", self.menuFile)
         self.menuFile.addMenu(self.menuStandardFile)
@@ -122,6 +130,8 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
         self.menuNavigate.addAction(self.packTreeView.openInCurrTabAct)
         self.menuNavigate.addAction(self.packTreeView.openInBackgroundAct)
         self.menuNavigate.addAction(self.packTreeView.openInNewWindowAct)
+        self.menuNavigate.addSeparator()
+        self.menuNavigate.addAction(self.packTreeView.findUsagesAct)
 
         self.menubar.addAction(self.menuFile.menuAction())
         self.menubar.addAction(self.menuView.menuAction())
@@ -140,6 +150,7 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
         menuSettings.addAction(self.packTreeView.zoomOutAct)
         menuSettings.addAction(self.packTreeView.autoScrollToSrcAct)
         menuSettings.addAction(self.packTreeView.autoScrollFromSrcAct)
+        menuSettings.addAction(self.parallelRestoreAct)
         settingsBtn.setMenu(menuSettings)
 
         self.packToolBar.addWidget(settingsBtn)
@@ -155,6 +166,18 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
         self.packToolBar.addSeparator()
         self.packToolBar.addAction(self.packTreeView.shellViewAct)
 
+    def initStatusBar(self):
+        self.loadingProgressBar = QProgressBar(self.statusbar)
+        self.loadingProgressBar.setMaximumWidth(200)
+        self.loadingProgressBar.setRange(0, 100)
+        self.loadingProgressBar.setVisible(False)
+        self.cancelLoadingBtn = QToolButton(self.statusbar, icon=CLOSE_ICON,
+                                            toolTip="Cancel opening of files",
+                                            statusTip="Cancel opening of files")
+        self.cancelLoadingBtn.setVisible(False)
+        self.statusbar.addPermanentWidget(self.loadingProgressBar)
+        self.statusbar.addPermanentWidget(self.cancelLoadingBtn)
+
 
     @staticmethod
     def iterItems(root):
@@ -182,6 +205,13 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
 
         self.packTreeModel.rowsRemoved.connect(self.mainTabWidget.removePackTab)
 
+        self.packTreeView.loadingStarted.connect(self.onLoadingStarted)
+        self.packTreeView.loadingProgress.connect(self.onLoadingProgress)
+        self.packTreeView.loadingFinished.connect(self.onLoadingFinished)
+        self.cancelLoadingBtn.clicked.connect(self.packTreeView.cancelLoading)
+        self.packTreeView.savingStarted.connect(self.onSavingStarted)
+        self.packTreeView.savingFinished.connect(self.onSavingFinished)
+
     def onCurrTabItemChanged(self, item: QModelIndex):
         if self.packTreeView.autoScrollFromSrcAct.isChecked():
             self.packTreeView.setCurrentIndex(item)
@@ -194,6 +224,31 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
         if not self.packTreeView.autoScrollToSrcAct.isChecked():
             self.mainTabWidget.openItemInNewTab(item)
 
+    def onLoadingStarted(self, file: str):
+        self.loadingProgressBar.setValue(0)
+        self.loadingProgressBar.setVisible(True)
+        self.cancelLoadingBtn.setVisible(True)
+        self.statusbar.showMessage(f"Opening {file}")
+
+    def onLoadingProgress(self, file: str, bytesRead: int, size: int, objsParsed: int):
+        if size:
+            self.loadingProgressBar.setValue(int(100 * bytesRead / size))
+        self.statusbar.showMessage(f"Opening {file}: {bytesRead // 2**20} of {size // 2**20} MB read, "
+                                   f"{objsParsed} objects parsed")
+
+    def onLoadingFinished(self, file: str):
+        if not self.packTreeView.isLoading():
+            self.loadingProgressBar.setVisible(False)
+            self.cancelLoadingBtn.setVisible(False)
+            self.statusbar.clearMessage()
+
+    def onSavingStarted(self, file: str):
+        self.statusbar.showMessage(f"Saving {file}")
+
+    def onSavingFinished(self, file: str):
+        if not self.packTreeView.isSaving():
+            self.statusbar.showMessage(f"{file} saved", 5000)
+
     def removeTabsOfClosedRows(self, parent: QModelIndex, first: int, last: int):
         for row in range(first, last):
             packItem = self.packTreeModel.index(row, 0, parent)
@@ -217,6 +272,7 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
             self.currTheme = theme
 
     def closeEvent(self, a0: QCloseEvent) -> None:
+        discardChanges = True
         if not self.packTreeModel.openedFiles():
             self.writeSettings()
             a0.accept()
@@ -227,6 +283,7 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
                                          QMessageBox.No)
 
             if reply == QMessageBox.Yes:
+                discardChanges = False
                 self.packTreeView.saveAll()
                 self.writeSettings()
                 a0.accept()
@@ -236,6 +293,15 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
             else:
                 a0.ignore()
 
+        if a0.isAccepted():
+            self.packTreeView.cancelLoading()
+            self.packTreeView.waitForSaving()
+            if discardChanges:
+                # only the journals of this instance, other running instances keep theirs
+                self.packTreeModel.journal.clear()
+            # else the journals of the saved packages were dropped after saving; the ones of
+            # packages which couldn't be saved are kept to recover their changes on next start
+
     def readSettings(self):
         settings = QSettings(ACPLT, APPLICATION_NAME)
 
@@ -263,12 +329,20 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
 
         # try to open previously opened files
         openedAasFiles = settings.value('openedAasFiles', set())
-        for file in openedAasFiles:
-            try:
-                self.packTreeView.openPack(file)
-            except OSError:
-                pass
-            self.packTreeModel.setData(QModelIndex(), [], UNDO_ROLE)
+        # files with unsaved changes, if the editor was not closed properly
+        openedAasFiles = set(openedAasFiles).union(file for file in self.packTreeModel.journal.pendingFiles()
+                                                   if file.exists())
+        parallelRestore = settings.value('parallelRestore', True, type=bool)
+        self.parallelRestoreAct.setChecked(parallelRestore)
+        if parallelRestore and len(openedAasFiles) > 1:
+            self.packTreeView.restorePacks(openedAasFiles)
+        else:
+            for file in openedAasFiles:
+                try:
+                    self.packTreeView.openPack(file)
+                except OSError:
+                    pass
+                self.packTreeModel.setData(QModelIndex(), [], UNDO_ROLE)
 
         # set previously used default new file type
         self.packTreeView.defNewFileTypeFilter = settings.value('defaultNewFileTypeFilter', '')
@@ -293,6 +367,7 @@ class EditorApp(QMainWindow, design.Ui_MainWindow):
         settings.setValue('leftZoneSize', self.leftLayoutWidget.size())
         settings.setValue('rightZoneSize', self.rightLayoutWidget.size())
         settings.setValue('openedAasFiles', self.packTreeModel.openedFiles())
+        settings.setValue('parallelRestore', self.parallelRestoreAct.isChecked())
         settings.setValue('fontSizeFilesView', PacksTable.defaultFont.pointSize())
         settings.setValue('fontSizeDetailedView', DetailedInfoTable.defaultFont.pointSize())
         settings.setValue('defaultNewFileTypeFilter', self.packTreeView.defNewFileTypeFilter)
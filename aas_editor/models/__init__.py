@@ -24,3 +24,5 @@ from .item_pack_treeview import *
 from .table_standard import *
 from .table_detailed_info import *
 from .table_packs import *
+from .table_diff import *
+from .table_completions import *
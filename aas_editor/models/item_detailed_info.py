@@ -27,17 +27,39 @@ from aas_editor.package import Package
 
 
 class DetailedInfoItem(StandardItem):
+    """Item of the detailed info table, its child items are created when the model fetches them"""
+    __slots__ = ("_childrenCheck",)
+
     def __init__(self, obj, name="", parent=None, package: Package = None, **kwargs):
         super().__init__(obj, name, parent, **kwargs)
         if parent and not package:
             self.package = parent.data(PACKAGE_ROLE)
         else:
             self.package = package
-        self.populate()
+        self.populated = False
+        # (obj, result) of the last canHaveChildren() check
+        self._childrenCheck = None
+
+    def _isNotToPopulate(self) -> bool:
+        return isinstance(self.obj, TYPES_WITH_INSTANCES_NOT_TO_POPULATE) \
+               or type(self.obj) in TYPES_NOT_TO_POPULATE
+
+    def canHaveChildren(self) -> bool:
+        if self.populated:
+            return super(DetailedInfoItem, self).canHaveChildren()
+        # the check is cached, as views call it on every repaint
+        if self._childrenCheck is None or self._childrenCheck[0] is not self.obj:
+            if self._isNotToPopulate():
+                res = False
+            elif isinstance(self.obj, dict) or isSimpleIterable(self.obj):
+                res = any(True for _ in self.obj)
+            else:
+                res = bool(getAttrs4detailInfo(self.obj))
+            self._childrenCheck = (self.obj, res)
+        return self._childrenCheck[1]
 
     def populate(self):
-        if isinstance(self.obj, TYPES_WITH_INSTANCES_NOT_TO_POPULATE) \
-                or type(self.obj) in TYPES_NOT_TO_POPULATE:
+        if self._isNotToPopulate():
             return
 
         kwargs = {
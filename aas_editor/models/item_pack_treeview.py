@@ -17,6 +17,7 @@
 #  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
 
 from types import GeneratorType
+from typing import Any, Iterator, Optional, Tuple
 
 from PyQt5.QtCore import Qt
 from aas.adapter.aasx import DictSupplementaryFileContainer
@@ -31,6 +32,9 @@ from aas_editor.package import Package, StoredFile
 
 
 class PackTreeViewItem(StandardItem):
+    """Item of the package tree, its child items are created when the model fetches them"""
+    __slots__ = ("packageAttr",)
+
     def __init__(self, obj, parent, **kwargs):
         super().__init__(obj, parent=parent, **kwargs)
         if isinstance(obj, Package):
@@ -41,11 +45,14 @@ class PackTreeViewItem(StandardItem):
 
         try:
             if isinstance(obj, AASReference):
-                obj = obj.resolve(self.package.objStore)
+                obj = self.package.resolve(obj)
         except KeyError as e:
             print(e)
+        # items of package attributes returning generators, e.g. shells, get the objStore as obj,
+        # their children are got from the attribute
+        self.packageAttr = self.objName if isinstance(obj, GeneratorType) else None
         self.obj = obj
-        self.populate()
+        self.populated = False
 
     def data(self, role, column=ATTRIBUTE_COLUMN):
         if role == Qt.ToolTipRole:
@@ -60,27 +67,28 @@ class PackTreeViewItem(StandardItem):
             "parent": self,
             "new": self.new,
         }
-        if ClassesInfo.hasPackViewAttrs(type(self.obj)):
-            for attr in ClassesInfo.packViewAttrs(type(self.obj)):
+        for itemObj, name in self._iterChildObjs():
+            packItem = PackTreeViewItem(itemObj, name=name, **kwargs)
+            if isinstance(itemObj, GeneratorType):
                 # set package objStore as obj, so that delete works
-                itemObj = getattr(self.obj, attr)
-                packItem = PackTreeViewItem(itemObj, name=attr, **kwargs)
-                if isinstance(itemObj, GeneratorType):
-                    packItem.obj = self.obj.objStore
-        elif isIterable(self.obj):
-            if isinstance(self.obj, DictSupplementaryFileContainer):
-                self._populateFileContainer(self.obj, **kwargs)
-            else:
-                self._populateIterable(self.obj, **kwargs)
+                packItem.obj = self.obj.objStore
 
-    @staticmethod
-    def _populateIterable(obj, **kwargs):
-        for sub_item_obj in obj:
-            PackTreeViewItem(sub_item_obj, **kwargs)
+    def canHaveChildren(self) -> bool:
+        if self.populated:
+            return super(PackTreeViewItem, self).canHaveChildren()
+        for _ in self._iterChildObjs():
+            return True
+        return False
 
-    @staticmethod
-    def _populateFileContainer(fileContainer, **kwargs):
-        # populate file container
-        for name in fileContainer:
-            itemObj = StoredFile(name, fileContainer)
-            PackTreeViewItem(itemObj, **kwargs)
+    def _iterChildObjs(self) -> Iterator[Tuple[Any, Optional[str]]]:
+        """Yield objects and names of the child items"""
+        if self.packageAttr:
+            yield from ((obj, None) for obj in getattr(self.package, self.packageAttr))
+        elif ClassesInfo.hasPackViewAttrs(type(self.obj)):
+            for attr in ClassesInfo.packViewAttrs(type(self.obj)):
+                yield getattr(self.obj, attr), attr
+        elif isinstance(self.obj, DictSupplementaryFileContainer):
+            for name in self.obj:
+                yield StoredFile(name, self.obj), None
+        elif isIterable(self.obj):
+            yield from ((obj, None) for obj in self.obj)
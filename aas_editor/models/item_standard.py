@@ -16,12 +16,12 @@
 #
 #  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
 
-import io
 from collections import namedtuple
-from types import GeneratorType
+from functools import lru_cache
+from typing import FrozenSet, Optional, Sequence
 
 from PyQt5.QtGui import QBrush, QIcon, QColor
-from PyQt5.QtCore import QObject, QVariant
+from PyQt5.QtCore import QVariant
 
 from aas_editor.package import StoredFile
 from aas_editor.settings.app_settings import PACKAGE_ROLE, NAME_ROLE, OBJECT_ROLE, \
@@ -31,36 +31,129 @@ from aas_editor.settings.app_settings import PACKAGE_ROLE, NAME_ROLE, OBJECT_ROL
     TYPE_ROLE
 from aas_editor.settings.aas_settings import TYPE_ICON_DICT, LINK_TYPES, MEDIA_TYPES
 from aas_editor.settings import FILE_ICON, MIME_TYPE_ICON_DICT
-from aas_editor.utils.util import getDescription, getAttrDoc, simplifyInfo
-from aas_editor.utils.util_type import checkType, getTypeName, getTypeHintName, isIterable, \
-    getAttrTypeHint, getIterItemTypeHint
+from aas_editor.utils.util import getDescription, getAttrDoc, simplifyInfo, getReqParams4init
+from aas_editor.utils.util_type import checkType, getTypeName, getTypeHintName, \
+    getAttrTypeHint, getIterItemTypeHint, isIterableType
 from PyQt5.QtCore import Qt
 
 from aas_editor.utils.util_classes import DictItem, ClassesInfo
 
 MediaContent = namedtuple("MediaContent", ("value", "mime_type"))
 
+# background of the items without an own one
+TRANSPARENT_BRUSH = QBrush(QColor(0, 0, 0, 0))
+NO_ICON = QIcon()
+# children of the items without child items, replaced by a list when the first child is added
+NO_CHILDREN = ()
+
+# Icons, docs and type names are shared by the items of the same types and attributes
+
+
+@lru_cache(maxsize=None)
+def _typeIcon(typ: type) -> QIcon:
+    try:
+        return QIcon(TYPE_ICON_DICT[typ])
+    except KeyError:
+        icon = NO_ICON
+        for cls in TYPE_ICON_DICT:
+            if issubclass(typ, cls):
+                icon = QIcon(TYPE_ICON_DICT[cls])
+        return icon
+
+
+@lru_cache(maxsize=None)
+def _mimeTypeIcon(mimeType: str) -> QIcon:
+    try:
+        return QIcon(MIME_TYPE_ICON_DICT[mimeType])
+    except KeyError:
+        mimeType = mimeType.rsplit("/")[0]
+        return QIcon(MIME_TYPE_ICON_DICT.get(mimeType, FILE_ICON))
+
+
+@lru_cache(maxsize=None)
+def _initParamNames(typ: type) -> Optional[FrozenSet[str]]:
+    try:
+        return frozenset(getReqParams4init(typ, rmDefParams=False, delOptional=False))
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _typeHint(parentType: type, attrName: str, parentTypehint):
+    params = _initParamNames(parentType)
+    # names of the items of iterables, e.g. id_shorts, are no attributes, don't look for their typehint
+    if params is None or attrName in params or f"{attrName}_" in params or hasattr(parentType, attrName):
+        try:
+            return getAttrTypeHint(parentType, attrName, delOptional=False)
+        except KeyError:
+            print("Typehint could not be gotten")
+
+    attrTypehint = None
+    if isIterableType(parentType):
+        attrTypehint = ClassesInfo.addType(parentType)
+        if not attrTypehint and parentTypehint:
+            try:
+                attrTypehint = getIterItemTypeHint(parentTypehint)
+            except KeyError:
+                print("Typehint could not be gotten")
+    return attrTypehint
+
+
+@lru_cache(maxsize=1024)
+def _attrDoc(attr: str, parentType: type) -> str:
+    return getAttrDoc(attr, parentType)
+
+
+@lru_cache(maxsize=None)
+def _typeName(typ: type) -> str:
+    return getTypeName(typ)
+
+
+@lru_cache(maxsize=1024)
+def _typeHintName(typehint) -> str:
+    try:
+        return getTypeHintName(typehint)
+    except TypeError as e:
+        print(e)
+        return str(typehint)
+
+
+def _cachedCall(func, *args):
+    """Call the lru_cache wrapped func, args which can't be hashed, e.g. some typehints, bypass the cache"""
+    try:
+        return func(*args)
+    except TypeError:
+        return func.__wrapped__(*args)
+
+
+class StandardItem:
+    """
+    Node of the item trees of the models
+
+    Items are plain objects with slots, not QObjects, as trees of big packages have
+    hundreds of thousands of them. Metadata depending only on the types and attribute
+    names, e.g. icons, docs and typehints, is shared between the items.
+    """
+    __slots__ = ("_parent", "_childItems", "_rowsValid", "_row", "new", "changed", "bg", "typecheck",
+                 "_obj", "_objName", "_typehint", "populated", "package")
 
-class StandardItem(QObject):
     def __init__(self, obj, name=None, parent=None, new=True, typehint=None):
-        super().__init__(parent)
+        self._parent = parent
+        self._childItems: Sequence['StandardItem'] = NO_CHILDREN
+        self._rowsValid = True
+        self._row = 0
+        if parent is not None:
+            parent._addChildItem(self)
         self.new = new
         self.changed = False
-        self.bg = QBrush(QColor(0, 0, 0, 0))
-
-        # following attrs will be set during self.obj = obj
-        self.typecheck = None
-        self.doc = None
-        self.icon = QIcon()
+        self.bg = TRANSPARENT_BRUSH
+        self.package = None
+        # items populated lazily set it to False, their children are created when the model fetches them
+        self.populated = True
 
         self._obj = obj
-        self.objTypeName = getTypeName(type(self.obj))
-        self.updateIcon()
-
-        self.objName = name
-        self.doc = getAttrDoc(self.objName, self.parentObj)
-
-        self.typehint = typehint if typehint else self.getTypeHint()
+        self._objName = name
+        self._typehint = typehint if typehint else self.getTypeHint()
         self.typecheck = checkType(self.obj, self.typehint)
 
     def __str__(self):
@@ -72,24 +165,14 @@ class StandardItem(QObject):
 
     @property
     def obj(self):
-        # try:
-        #     obj = getattr(self.parentObj, self.objName)
-        #     if not isinstance(obj, GeneratorType):
-        #         return obj
-        # except (TypeError, AttributeError):
-        #     pass
         return self._obj
 
     @obj.setter
     def obj(self, obj):
+        if obj is self._obj:
+            return
         self._obj = obj
-        try:
-            self.typecheck = checkType(self.obj, self.typehint)
-        except AttributeError:
-            pass
-        self.objTypeName = getTypeName(type(self.obj))
-        self.updateIcon()
-        self.doc = getAttrDoc(self.objName, self.parentObj)
+        self.typecheck = checkType(self.obj, self.typehint)
 
     @property
     def objName(self) -> str:
@@ -98,7 +181,6 @@ class StandardItem(QObject):
     @objName.setter
     def objName(self, value):
         self._objName = value
-        self.doc = getAttrDoc(self.objName, self.parentObj)
 
     @property
     def objectName(self) -> str:
@@ -109,7 +191,24 @@ class StandardItem(QObject):
         elif hasattr(self.obj, "name") and self.obj.name:
             return self.obj.name
         else:
-            return getTypeName(self.obj.__class__)
+            return _typeName(self.obj.__class__)
+
+    @property
+    def objTypeName(self) -> str:
+        return _typeName(type(self.obj))
+
+    @property
+    def doc(self) -> str:
+        parentObj = self.parentObj
+        if not parentObj:
+            return ""
+        return _cachedCall(_attrDoc, self.objName, type(parentObj))
+
+    @property
+    def icon(self) -> QIcon:
+        if isinstance(self.obj, StoredFile):
+            return _cachedCall(_mimeTypeIcon, self.obj.mime_type)
+        return _typeIcon(type(self.obj))
 
     @property
     def typehint(self) -> str:
@@ -119,31 +218,10 @@ class StandardItem(QObject):
     def typehint(self, value):
         self._typehint = value
         self.typecheck = checkType(self.obj, self.typehint)
-        self.updateTypehintName()
 
-    def updateTypehintName(self):
-        try:
-            self.typehintName = getTypeHintName(self.typehint)
-        except TypeError as e:
-            print(e)
-            self.typehintName = str(self.typehint)
-
-    def updateIcon(self):
-        if isinstance(self.obj, StoredFile):
-            try:
-                self.obj: StoredFile
-                mime_type: str = self.obj.mime_type
-                self.icon = QIcon(MIME_TYPE_ICON_DICT[mime_type])
-            except KeyError:
-                mime_type = mime_type.rsplit("/")[0]
-                self.icon = QIcon(MIME_TYPE_ICON_DICT.get(mime_type, FILE_ICON))
-        else:
-            try:
-                self.icon = QIcon(TYPE_ICON_DICT[type(self.obj)])
-            except KeyError:
-                for cls in TYPE_ICON_DICT:
-                    if isinstance(self.obj, cls):
-                        self.icon = QIcon(TYPE_ICON_DICT[cls])
+    @property
+    def typehintName(self) -> str:
+        return _cachedCall(_typeHintName, self.typehint)
 
     def setData(self, value, role, column=ATTRIBUTE_COLUMN):
         if role == Qt.BackgroundRole and isinstance(value, QBrush):
@@ -202,10 +280,16 @@ class StandardItem(QObject):
                 return self.obj
         return QVariant()
 
-    def setParent(self, a0: 'QObject') -> None:
-        super().setParent(a0)
+    def parent(self) -> 'StandardItem':
+        return self._parent
+
+    def setParent(self, a0: 'StandardItem') -> None:
+        if self._parent is not None:
+            self._parent._removeChildItem(self)
+        self._parent = a0
         if a0 is None:
             return
+        a0._addChildItem(self)
         if a0.data(PACKAGE_ROLE):
             try:
                 self.package = a0.data(PACKAGE_ROLE)
@@ -223,7 +307,7 @@ class StandardItem(QObject):
     def isLink(self) -> bool:
         if self.package and isinstance(self.obj, LINK_TYPES):
             try:
-                self.obj.resolve(self.package.objStore)
+                self.package.resolve(self.obj)
                 return True
             except (AttributeError, KeyError, NotImplementedError, TypeError) as e:
                 print(e)
@@ -238,42 +322,72 @@ class StandardItem(QObject):
 
     @property
     def isUrlMedia(self) -> bool:
+        if isinstance(self.obj, StoredFile):
+            # value of stored file is its content, don't read it
+            return False
         value = self.obj.value
         return isinstance(value, str) and value.startswith(("http", "www."))
 
+    def populate(self):
+        """Create the child items"""
+        pass
+
+    def canHaveChildren(self) -> bool:
+        """Return True if the item has children or gets them when populated, must be cheap"""
+        return bool(self._childItems)
+
+    def childItems(self) -> Sequence['StandardItem']:
+        """Return child items in the order of their rows, the sequence must not be changed"""
+        return self._childItems
+
+    def _addChildItem(self, item: 'StandardItem'):
+        if self._childItems is NO_CHILDREN:
+            self._childItems = []
+        item._row = len(self._childItems)
+        self._childItems.append(item)
+
+    def _removeChildItem(self, item: 'StandardItem'):
+        del self._childItems[item.row()]
+        # rows of the following children are updated when a row is requested next time
+        self._rowsValid = False
+
+    def removeChildItems(self, row: int, count: int):
+        """Remove count child items starting with row"""
+        if not count:
+            return
+        removed = self._childItems[row:row + count]
+        del self._childItems[row:row + count]
+        self._rowsValid = False
+        for item in removed:
+            item._parent = None
+
+    def _updateRows(self):
+        for row, item in enumerate(self._childItems):
+            item._row = row
+        self._rowsValid = True
+
     def row(self):
-        if self.parent():
-            return self.parent().children().index(self)
-        else:
+        parent = self.parent()
+        if parent is None:
             return 0
+        if not parent._rowsValid:
+            parent._updateRows()
+        return self._row
 
     def getTypeHint(self):
-        attrTypehint = None
-        attrName = self.data(NAME_ROLE)
-
-        try:
-            attrTypehint = getAttrTypeHint(type(self.parentObj), attrName, delOptional=False)
-            return attrTypehint
-        except KeyError:
-            print("Typehint could not be gotten")
-
-        if isIterable(self.parentObj):
-            attrTypehint = ClassesInfo.addType(type(self.parentObj))
-            if not attrTypehint and self.parent().data(TYPE_HINT_ROLE):
-                parentTypehint = self.parent().data(TYPE_HINT_ROLE)
-                try:
-                    attrTypehint = getIterItemTypeHint(parentTypehint)
-                except KeyError:
-                    print("Typehint could not be gotten")
-        return attrTypehint
+        parentObj = self.parentObj
+        # typehint of the parent is needed only for the items of iterables
+        parentTypehint = self.parent().data(TYPE_HINT_ROLE) if isIterableType(type(parentObj)) else None
+        return _cachedCall(_typeHint, type(parentObj), self.data(NAME_ROLE), parentTypehint)
 
     def getMediaContent(self):
-        if self.isUrlMedia or isinstance(self.obj.value, bytes):
+        if isinstance(self.obj, StoredFile):
+            return MediaContent(self.obj.buffer(), str(self.obj.mime_type))
+        elif self.isUrlMedia or isinstance(self.obj.value, bytes):
             return MediaContent(self.obj.value, str(self.obj.mime_type))
         elif isinstance(self.obj.value, str) and self.obj.value in self.package.fileStore:
-            file_content = io.BytesIO()
-            self.package.fileStore.write_file(self.obj.value, file_content)
-            return MediaContent(file_content.getvalue(), str(self.obj.mime_type))
+            return MediaContent(StoredFile(self.obj.value, self.package.fileStore).buffer(),
+                                str(self.obj.mime_type))
         elif not self.obj.value:
             return MediaContent(b"Value is not given", "text/plain")
         else:
@@ -49,6 +49,10 @@ class SearchProxyModel(QSortFilterProxyModel):
         else:
             self.setFilterCaseSensitivity(Qt.CaseInsensitive)
 
+        # lazily populated items are searched only if they are fetched
+        if hasattr(self.sourceModel(), "fetchAll"):
+            self.sourceModel().fetchAll()
+
         if regExp:
             self.setFilterRegExp(pattern)
         else:
@@ -0,0 +1,76 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import bisect
+import heapq
+import itertools
+from typing import Iterable, List, Tuple
+
+from PyQt5.QtCore import QStringListModel
+from PyQt5.QtWidgets import QCompleter, QWidget
+from aas.model import Key
+
+from aas_editor.package import Package
+from aas_editor.settings import DEFAULT_COMPLETIONS
+
+
+class IdCompletionModel(QStringListModel):
+    """
+    Sorted identification ids of the opened packages, shared by all completers
+
+    Every package keeps the sorted ids of its objects. They are merged only if a
+    completion is needed and a package was changed, opened or closed since the last merge.
+    """
+
+    def __init__(self, parent=None):
+        super(IdCompletionModel, self).__init__(parent)
+        self._packs: List[Package] = []
+        # (package id, store version) of the last merge
+        self._versions: List[Tuple[int, int]] = []
+
+    def setPackages(self, packs: Iterable[Package]):
+        """Set the packages whose ids are completed, e.g. after a package was opened or closed"""
+        self._packs = list(packs)
+
+    def _currVersions(self) -> List[Tuple[int, int]]:
+        return [(id(pack.objStore), pack.objStore.version) for pack in self._packs]
+
+    def refresh(self):
+        """Merge the ids of the packages again if they were changed"""
+        versions = self._currVersions()
+        if versions != self._versions:
+            merged = heapq.merge(*(pack.objStore.sortedIds() for pack in self._packs))
+            # ids of several packages may be equal
+            self.setStringList([id for id, _ in itertools.groupby(merged)])
+            self._versions = versions
+
+    def completions(self, prefix: str) -> List[str]:
+        """Return ids starting with prefix"""
+        self.refresh()
+        ids = self.stringList()
+        start = bisect.bisect_left(ids, prefix)
+        end = bisect.bisect_right(ids, prefix + chr(0x10FFFF), start)
+        return ids[start:end]
+
+
+def createCompleter(completions, parent: QWidget = None) -> QCompleter:
+    """Return completer for a list of completions or a shared completion model"""
+    if isinstance(completions, IdCompletionModel):
+        completions.refresh()
+        completer = QCompleter(completions, parent)
+        # the model is sorted, so the completer can use binary search
+        completer.setModelSorting(QCompleter.CaseSensitivelySortedModel)
+    else:
+        completer = QCompleter(completions, parent)
+    return completer
+
+
+ID_COMPLETIONS = IdCompletionModel()
+DEFAULT_COMPLETIONS[Key]["value"] = ID_COMPLETIONS
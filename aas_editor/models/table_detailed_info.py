@@ -16,14 +16,15 @@
 #
 #  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
 
-from typing import Any
+from typing import Any, Optional, Tuple
 
-from PyQt5.QtCore import QModelIndex, Qt, QPersistentModelIndex
+from PyQt5.QtCore import QModelIndex, Qt, QPersistentModelIndex, QAbstractProxyModel
 from PyQt5.QtGui import QFont, QBrush
 
 from aas_editor.models import DetailedInfoItem, StandardTable
 from aas_editor.settings.app_settings import PACKAGE_ROLE, NAME_ROLE, OBJECT_ROLE, COLUMNS_IN_DETAILED_INFO,\
     ATTRIBUTE_COLUMN, PACK_ITEM_ROLE, LIGHT_BLUE, DEFAULT_FONT, LINKED_ITEM_ROLE, IS_LINK_ROLE
+from aas_editor.utils.util_journal import ItemPath
 
 
 class DetailedInfoTable(StandardTable):
@@ -35,6 +36,9 @@ class DetailedInfoTable(StandardTable):
         self.package = packItem.data(PACKAGE_ROLE)
         root = DetailedInfoItem(self.mainObj, name=packItem.data(NAME_ROLE),
                                 package=self.package, new=False)
+        # attributes of the object are shown anyway, deeper items are populated when fetched
+        root.populate()
+        root.populated = True
         super(DetailedInfoTable, self).__init__(COLUMNS_IN_DETAILED_INFO, root)
 
     def data(self, index: QModelIndex, role: int = ...) -> Any:
@@ -45,6 +49,15 @@ class DetailedInfoTable(StandardTable):
         else:
             return super(DetailedInfoTable, self).data(index, role)
 
+    def editLocation(self, index: QModelIndex) -> Optional[Tuple[ItemPath, Optional[ItemPath]]]:
+        packItem = QModelIndex(self.packItem)
+        while isinstance(packItem.model(), QAbstractProxyModel):
+            packItem = packItem.model().mapToSource(packItem)
+        if not packItem.isValid():
+            return None
+        packTreePath = packItem.model().itemPath(packItem)[1:]
+        return packTreePath, self.itemPath(index)
+
     def _getBgColor(self, index: QModelIndex):
         bg = super(DetailedInfoTable, self)._getBgColor(index)
         if isinstance(bg, QBrush) and bg.color().alpha():
@@ -75,8 +88,7 @@ class DetailedInfoTable(StandardTable):
             return QModelIndex()
         try:
             reference = self.data(index, OBJECT_ROLE)
-            objStore = self.data(index, PACKAGE_ROLE).objStore
-            obj = reference.resolve(objStore)
+            obj = self.data(index, PACKAGE_ROLE).resolve(reference)
             linkedPackItem, = self.data(index, PACK_ITEM_ROLE).model().match(QModelIndex(), OBJECT_ROLE, obj, hits=1)
             return linkedPackItem
         except AttributeError:
@@ -0,0 +1,52 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+from typing import Dict, Iterable, Tuple
+
+from PyQt5.QtGui import QStandardItemModel, QStandardItem
+
+from aas_editor.settings.app_settings import NEW_GREEN, RED, CHANGED_BLUE
+from aas_editor.tools.diff import Change, ADDED, REMOVED, CHANGED
+
+
+class DiffModel(QStandardItemModel):
+    """Tree of the changes between two packages, parents of changed elements are shown too"""
+    COLUMNS = ("Element", "Change", "Attributes")
+    COLORS = {ADDED: NEW_GREEN, REMOVED: RED, CHANGED: CHANGED_BLUE}
+
+    def __init__(self, changes: Iterable[Change], parent=None):
+        super(DiffModel, self).__init__(parent)
+        self.setHorizontalHeaderLabels(self.COLUMNS)
+        self._items: Dict[Tuple[str, ...], QStandardItem] = {}
+        for change in changes:
+            self.addChange(change)
+
+    def addChange(self, change: Change):
+        item = self._item(change.path)
+        parent = item.parent() if item.parent() else self.invisibleRootItem()
+        kindItem = parent.child(item.row(), 1)
+        attrsItem = parent.child(item.row(), 2)
+        kindItem.setText(change.kind)
+        attrsItem.setText(", ".join(change.attrs))
+        for i in (item, kindItem, attrsItem):
+            i.setForeground(self.COLORS[change.kind])
+
+    def _item(self, path: Tuple[str, ...]) -> QStandardItem:
+        """Return item of the path, missing items of the path are created"""
+        item = self._items.get(path)
+        if item is None:
+            parent = self._item(path[:-1]) if len(path) > 1 else self.invisibleRootItem()
+            item = QStandardItem(path[-1])
+            row = [item, QStandardItem(), QStandardItem()]
+            for i in row:
+                i.setEditable(False)
+            parent.appendRow(row)
+            self._items[path] = item
+        return item
@@ -16,13 +16,17 @@
 #
 #  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
 
-from typing import Any
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from PyQt5.QtCore import QModelIndex, Qt
 from PyQt5.QtGui import QFont
+from aas.model import Identifier
 
-from aas_editor.models import StandardTable
+from aas_editor.models import StandardTable, PackTreeViewItem, DetailedInfoTable
 from aas_editor.package import Package
+from aas_editor.tools.diff import Differ
+from aas_editor.utils.util_classes import ClassesInfo
+from aas_editor.utils.util_journal import ItemPath, JournalEntry
 from aas_editor.settings.app_settings import PACKAGE_ROLE, DEFAULT_FONT, OPENED_PACKS_ROLE, OPENED_FILES_ROLE
 
 
@@ -55,3 +59,88 @@ class PacksTable(StandardTable):
         else:
             return super(PacksTable, self).data(index, role)
 
+    def editLocation(self, index: QModelIndex) -> Optional[Tuple[ItemPath, Optional[ItemPath]]]:
+        # edits of the top level items open and close packages
+        if not index.parent().isValid():
+            return None
+        return self.itemPath(index)[1:], None
+
+    def replayEdits(self, packIndex: QModelIndex, entries: Iterable[JournalEntry]) -> int:
+        """
+        Apply journaled edits to the package at packIndex, e.g. to recover them after a crash
+
+        Replaying stops at the first edit which can't be applied, as later edits may depend on it.
+        :return: number of applied edits
+        """
+        applied = 0
+        for entry in entries:
+            index = self.indexByPath(entry.path, packIndex)
+            if index is None:
+                break
+            model = self
+            if entry.detailPath is not None:
+                model = DetailedInfoTable(index)
+                treeIndex, index = index, model.indexByPath(entry.detailPath)
+                if index is None:
+                    break
+            if not model.setData(index.siblingAtColumn(entry.column), entry.value, entry.role):
+                break
+            if model is not self:
+                # the detailed info table changed the objects of the package tree item
+                self.update(treeIndex)
+            applied += 1
+        return applied
+
+    def reloadPack(self, packIndex: QModelIndex, newPack: Package) -> int:
+        """
+        Take over the content of newPack, a newer version of the package at packIndex
+
+        Only rows of added, removed and changed identifiables are updated, the rest of
+        the tree is kept. Changes are not recorded for undo.
+        :return: number of added, removed and changed identifiables
+        """
+        pack: Package = packIndex.data(PACKAGE_ROLE)
+        packItem = self.objByIndex(packIndex)
+        oldObjs = {obj.identification: obj for obj in pack.objStore}
+        newObjs = {obj.identification: obj for obj in newPack.objStore}
+        differ = Differ()
+        changed = [identification for identification in oldObjs.keys() & newObjs.keys()
+                   if differ.diffObjects(oldObjs[identification], newObjs[identification], ())]
+        toRemove = set(oldObjs.keys() - newObjs.keys()).union(changed)
+        toAdd = set(newObjs.keys() - oldObjs.keys()).union(changed)
+
+        attrItems = {child.objectName: child for child in packItem.childItems()}
+        # identification -> (attribute row, row) of the rows to remove
+        rows: Dict[Identifier, Tuple[int, int]] = {}
+        for attrRow, attrItem in enumerate(packItem.childItems()):
+            for row, item in enumerate(attrItem.childItems()):
+                identification = getattr(item.obj, "identification", None)
+                if identification in toRemove and item.obj is oldObjs[identification]:
+                    rows[identification] = (attrRow, row)
+        for identification, (attrRow, row) in sorted(rows.items(), key=lambda item: item[1], reverse=True):
+            self.removeRow(row, self.index(attrRow, 0, packIndex))
+        for identification in toRemove:
+            pack.discard(oldObjs[identification])
+
+        for identification in toAdd:
+            obj = newObjs[identification]
+            pack.add(obj)
+            for attr, attrItem in attrItems.items():
+                addType = ClassesInfo.addType(Package, attr)
+                if addType and isinstance(obj, addType):
+                    if not attrItem.populated:
+                        # the item is created when the attribute item is fetched
+                        break
+                    attrIndex = self.index(attrItem.row(), 0, packIndex)
+                    self.beginInsertRows(attrIndex, self.rowCount(attrIndex), self.rowCount(attrIndex))
+                    item = PackTreeViewItem(obj, parent=attrItem, new=identification not in oldObjs)
+                    self._indexObjItems((item,))
+                    self.endInsertRows()
+                    break
+
+        pack.fileStore = newPack.fileStore
+        fileStoreItem = attrItems.get("fileStore")
+        if fileStoreItem is not None:
+            fileStoreItem.obj = pack.fileStore
+            self.update(self.index(fileStoreItem.row(), 0, packIndex))
+        return len(toRemove) + len(toAdd) - len(changed)
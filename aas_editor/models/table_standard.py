@@ -18,11 +18,12 @@
 
 from collections import namedtuple, deque
 from enum import Enum
-from typing import Any, Iterable, Union, AbstractSet, List
+from typing import Any, Dict, Iterable, Union, AbstractSet, List, Optional, Tuple
 
 from PyQt5.QtCore import QAbstractItemModel, QVariant, QModelIndex, Qt, QItemSelection, QSize, \
     QPersistentModelIndex
 from PyQt5.QtGui import QFont
+from aas.model import Identifiable, Identifier, Referable
 
 from aas_editor.models import DetailedInfoItem, StandardItem, PackTreeViewItem
 from aas_editor.package import Package
@@ -30,9 +31,10 @@ from aas_editor.settings.app_settings import NAME_ROLE, OBJECT_ROLE, ATTRIBUTE_C
     VALUE_COLUMN, NOT_GIVEN, \
     PACKAGE_ROLE, PACK_ITEM_ROLE, DEFAULT_FONT, ADD_ITEM_ROLE, CLEAR_ROW_ROLE, \
     DATA_CHANGE_FAILED_ROLE, IS_LINK_ROLE, LINK_BLUE, NEW_GREEN, CHANGED_BLUE, RED, TYPE_COLUMN, \
-    TYPE_CHECK_ROLE, TYPE_ROLE, UNDO_ROLE, REDO_ROLE, MAX_UNDOS
+    TYPE_CHECK_ROLE, TYPE_ROLE, UNDO_ROLE, REDO_ROLE, MAX_UNDOS, EDIT_JOURNAL_DIR
 
 from aas_editor.utils.util_classes import DictItem, ClassesInfo
+from aas_editor.utils.util_journal import EditJournal, ItemPath, JournalEntry
 from aas_editor.utils.util_type import isIterable
 
 SetDataItem = namedtuple("SetDataItem", ("index", "value", "role"))
@@ -40,20 +42,33 @@ SetDataItem = namedtuple("SetDataItem", ("index", "value", "role"))
 
 class StandardTable(QAbstractItemModel):
     defaultFont = QFont(DEFAULT_FONT)
+    # unsaved edits are recorded for packages whose journal is started
+    journal: EditJournal = EditJournal(EDIT_JOURNAL_DIR)
+    JOURNALED_ROLES = (Qt.EditRole, ADD_ITEM_ROLE, CLEAR_ROW_ROLE)
+    # items with objects of these types are matched by equality, not by the index of the objects
+    UNINDEXED_TYPES = (type(None), bool, int, float, str, bytes, Enum)
 
     def __init__(self, columns=("Item",), rootItem: StandardItem = None):
         super(StandardTable, self).__init__()
-        self._rootItem = rootItem if rootItem else DetailedInfoItem(None) # FIXME
+        if rootItem is None:
+            rootItem = DetailedInfoItem(None)  # FIXME
+            # rows of the default root are added by addItem only
+            rootItem.populated = True
+        self._rootItem = rootItem
         self._columns = columns
         self.lastErrorMsg = ""
         self.undo: deque[SetDataItem] = deque(maxlen=MAX_UNDOS)
         self.redo: List[SetDataItem] = []
+        self._journaling = False
+        # id of object -> item or list of items with the object, for match() by OBJECT_ROLE
+        self._objItems: Dict[int, Union[StandardItem, List[StandardItem]]] = {}
+        self._indexObjItems(self._rootItem.childItems())
 
     def index(self, row: int, column: int = 0, parent: QModelIndex = QModelIndex()) -> QModelIndex:
         if not self.hasIndex(row, column, parent):
             return QModelIndex()
         parentObj = self.objByIndex(parent)
-        return self.createIndex(row, column, parentObj.children()[row])
+        return self.createIndex(row, column, parentObj.childItems()[row])
 
     def parent(self, child: QModelIndex) -> QModelIndex:
         if not child.isValid():
@@ -65,12 +80,12 @@ class StandardTable(QAbstractItemModel):
         if parentObj == self._rootItem or not parentObj:
             return QModelIndex()
 
-        grandParentObj = parentObj.parent()
-        row = grandParentObj.children().index(parentObj)
-        return self.createIndex(row, 0, parentObj)
+        return self.createIndex(parentObj.row(), 0, parentObj)
 
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
-        return len(self.objByIndex(parent).children())
+        item = self.objByIndex(parent)
+        # rows of items which are not populated yet are inserted by fetchMore
+        return len(item.childItems()) if item.populated else 0
 
     def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
         return len(self._columns)
@@ -97,21 +112,47 @@ class StandardTable(QAbstractItemModel):
 
         return Qt.ItemIsEnabled | Qt.ItemIsSelectable
 
-    def hasChildren(self, parent: QModelIndex = ...) -> bool:
-        return True if self.rowCount(parent) else False
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return self.objByIndex(parent).canHaveChildren()
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        return not self.objByIndex(parent).populated
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        """Populate the item of parent, e.g. when it is expanded in a view"""
+        item = self.objByIndex(parent)
+        if item.populated:
+            return
+        parent = parent.siblingAtColumn(0)
+        item.populate()
+        # the created children are counted as rows only after populated is set
+        count = len(item.childItems())
+        if count:
+            self.beginInsertRows(parent, 0, count - 1)
+        item.populated = True
+        self._indexObjItems(item.childItems())
+        if count:
+            self.endInsertRows()
+
+    def fetchAll(self, parent: QModelIndex = QModelIndex()):
+        """Populate all items below parent, e.g. to search in them"""
+        for _ in self.iterItems(parent):
+            pass
 
     def objByIndex(self, index: QModelIndex):
         if not index.isValid():
             return self._rootItem
         return index.internalPointer()
 
-    def iterItems(self, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+    def iterItems(self, parent: QModelIndex = QModelIndex(), fetch: bool = True) -> QModelIndex:
+        """Yield indexes of all items below parent, items not fetched yet are fetched or, if not fetch, skipped"""
         def recurse(parent: QModelIndex):
+            if fetch and self.canFetchMore(parent):
+                self.fetchMore(parent)
             for row in range(self.rowCount(parent)):
                 childIndex = self.index(row, 0, parent)
                 yield childIndex
-                child = self.objByIndex(childIndex)
-                if child.children():
+                if self.rowCount(childIndex) or (fetch and self.hasChildren(childIndex)):
                     yield from recurse(childIndex)
         yield from recurse(parent)
 
@@ -123,12 +164,16 @@ class StandardTable(QAbstractItemModel):
         if flags is not ...:
             kwargs["flags"] = flags
 
+        # objects may be below items which are not fetched yet, types and names are matched in fetched items only
         if role == OBJECT_ROLE and hits != 0:
+            res = [] if isinstance(value, self.UNINDEXED_TYPES) else self._matchObj(start, value)
+            if res:
+                return res if hits is ... or hits < 0 else res[:hits]
+            # no item has the object itself, fall back to a scan of the fetched items for equal objects
             res = []
-            for item in self.iterItems(start):
-                print("match for:", item.data(NAME_ROLE))
+            for item in self.iterItems(start, fetch=False):
                 try:
-                    if (item.data(OBJECT_ROLE) is value) or (item.data(OBJECT_ROLE) == value):
+                    if item.data(OBJECT_ROLE) == value:
                         res.append(item)
                 except AttributeError:
                     continue
@@ -137,8 +182,7 @@ class StandardTable(QAbstractItemModel):
             return res
         elif role == TYPE_ROLE and hits != 0:
             res = []
-            for item in self.iterItems(start):
-                print("match for:", item.data(NAME_ROLE))
+            for item in self.iterItems(start, fetch=False):
                 try:
                     if issubclass(value, item.data(TYPE_ROLE)):
                         res.append(item)
@@ -149,8 +193,7 @@ class StandardTable(QAbstractItemModel):
             return res
         elif role == Qt.DisplayRole and hits != 0:
             res = []
-            for item in self.iterItems(start):
-                print("match for:", item.data(NAME_ROLE))
+            for item in self.iterItems(start, fetch=False):
                 try:
                     if value == item.data(Qt.DisplayRole):
                         res.append(item)
@@ -162,9 +205,160 @@ class StandardTable(QAbstractItemModel):
         else:
             return super(StandardTable, self).match(start, role, value, **kwargs)
 
+    def _indexObjItems(self, items: Iterable[StandardItem]):
+        """Add items to the index of the items by their objects"""
+        for item in items:
+            if isinstance(item.obj, self.UNINDEXED_TYPES):
+                continue
+            key = id(item.obj)
+            indexed = self._objItems.get(key)
+            if indexed is None:
+                self._objItems[key] = item
+            elif isinstance(indexed, list):
+                if item not in indexed:
+                    indexed.append(item)
+            elif indexed is not item:
+                self._objItems[key] = [indexed, item]
+
+    def _unindexObjItems(self, items: Iterable[StandardItem]):
+        """Remove items and their descendants from the index of the items by their objects"""
+        for item in items:
+            key = id(item.obj)
+            indexed = self._objItems.get(key)
+            if indexed is item:
+                del self._objItems[key]
+            elif isinstance(indexed, list) and item in indexed:
+                indexed.remove(item)
+                if not indexed:
+                    del self._objItems[key]
+            self._unindexObjItems(item.childItems())
+
+    def _indexedItems(self, obj, startItem: StandardItem) -> List[StandardItem]:
+        """Return indexed items of obj below startItem"""
+        key = id(obj)
+        indexed = self._objItems.get(key)
+        if indexed is None:
+            return []
+        indexed = indexed if isinstance(indexed, list) else [indexed]
+        # the object of an item may have been replaced, e.g. by an edit, drop such items
+        items = [item for item in indexed if item.obj is obj]
+        if len(items) != len(indexed):
+            if not items:
+                del self._objItems[key]
+            else:
+                self._objItems[key] = items if len(items) > 1 else items[0]
+        res = []
+        for item in items:
+            parent = item.parent()
+            while parent is not None and parent is not startItem:
+                parent = parent.parent()
+            if parent is startItem:
+                res.append(item)
+        return res
+
+    def _itemIndex(self, item: StandardItem) -> QModelIndex:
+        if item is self._rootItem:
+            return QModelIndex()
+        return self.createIndex(item.row(), 0, item)
+
+    def _matchObj(self, start: QModelIndex, obj) -> List[QModelIndex]:
+        """
+        Return indexes of the items below start which have obj itself as object
+
+        Items not fetched yet are fetched: for referables the items below the items of
+        their parents. Else the tree is fetched level by level, but not below the items of
+        referables at the depth of obj, for other objects not below identifiables.
+        """
+        startItem = self.objByIndex(start)
+        items = self._indexedItems(obj, startItem)
+        if items:
+            return [self._itemIndex(item) for item in items]
+
+        parentItems = []
+        if isinstance(obj, Referable) and not isinstance(obj, Identifiable) and obj.parent is not None:
+            parentItems = [self.objByIndex(index) for index in self._matchObj(start, obj.parent)]
+        if parentItems:
+            # obj is below the items of its parent, but not below other referables
+            level = [(item, 0) for item in parentItems]
+            maxDepth = 0
+        else:
+            # (item, number of referables from the top level item to the item)
+            level = [(startItem, sum(isinstance(item.obj, Referable) for item in self._itemsTo(startItem)))]
+            maxDepth = self._referableDepth(obj)
+        while not items and level:
+            nextLevel = []
+            for item, depth in level:
+                if depth > maxDepth:
+                    continue
+                index = self._itemIndex(item)
+                if self.canFetchMore(index):
+                    self.fetchMore(index)
+                nextLevel.extend((child, depth + isinstance(child.obj, Referable)) for child in item.childItems())
+            items = self._indexedItems(obj, startItem)
+            level = nextLevel
+        return [self._itemIndex(item) for item in items]
+
+    @staticmethod
+    def _itemsTo(item: StandardItem) -> List[StandardItem]:
+        """Return item and its ancestors, without the root item"""
+        items = []
+        while item is not None and item.parent() is not None:
+            items.append(item)
+            item = item.parent()
+        return items
+
+    @staticmethod
+    def _referableDepth(obj) -> int:
+        """Return number of parents of referable obj up to its identifiable, 0 for other objects"""
+        depth = 0
+        if isinstance(obj, Referable):
+            while not isinstance(obj, Identifiable) and obj.parent is not None:
+                obj = obj.parent
+                depth += 1
+        return depth
+
+    def itemPath(self, index: QModelIndex) -> ItemPath:
+        """Return names and rows of the items from the top level item to the item of index"""
+        path = []
+        index = index.siblingAtColumn(0)
+        while index.isValid():
+            path.append((index.data(NAME_ROLE), index.row()))
+            index = index.parent()
+        return tuple(reversed(path))
+
+    def indexByPath(self, path: ItemPath, parent: QModelIndex = QModelIndex()) -> Optional[QModelIndex]:
+        """Return index of the item at path below parent, None if there is no such item
+
+        Items are found by row, if the item at the row has another name, by name.
+        """
+        index = parent
+        for name, row in path:
+            if self.canFetchMore(index):
+                self.fetchMore(index)
+            child = self.index(row, 0, index)
+            if not child.isValid() or child.data(NAME_ROLE) != name:
+                rows = (self.index(r, 0, index) for r in range(self.rowCount(index)))
+                child = next((i for i in rows if i.data(NAME_ROLE) == name), None)
+                if child is None:
+                    return None
+            index = child
+        return index
+
+    def editLocation(self, index: QModelIndex) -> Optional[Tuple[ItemPath, Optional[ItemPath]]]:
+        """
+        Return location of the item of index for the edit journal:
+        path in the package tree and path in the detailed info table of the package tree item
+
+        :return: None if edits of index are not journaled
+        """
+        return None
+
     def addItem(self, obj: Union[Package, 'SubmodelElement', Iterable],
                 parent: QModelIndex = QModelIndex()):
         parent = parent.siblingAtColumn(0)
+        # populate the parent before obj is added, else obj would get two items
+        if self.canFetchMore(parent):
+            self.fetchMore(parent)
         parentItem = self.objByIndex(parent)
         parentObj = parentItem.data(OBJECT_ROLE)
         parentObjCls = type(parentObj)
@@ -200,6 +394,7 @@ class StandardTable(QAbstractItemModel):
                 f"Object couldn't be added: parent obj type is not appendable: {type(parentObj)}")
         self.beginInsertRows(parent, self.rowCount(parent), self.rowCount(parent))
         item = itemTyp(**kwargs)
+        self._indexObjItems((item,))
         self.endInsertRows()
         itemIndex = self.index(item.row(), 0, parent)
         self.undo.append(SetDataItem(index=QPersistentModelIndex(itemIndex), value=NOT_GIVEN, role=CLEAR_ROW_ROLE))
@@ -214,6 +409,12 @@ class StandardTable(QAbstractItemModel):
     def update(self, index: QModelIndex):
         if not index.isValid():
             return QVariant()
+        # the object of the item may have been replaced
+        self._indexObjItems((self.objByIndex(index),))
+        if not self.objByIndex(index).populated:
+            # children are created from the current object when fetched
+            self.dataChanged.emit(index, index)
+            return True
         if self.hasChildren(index):
             self.beginRemoveRows(index, 0, max(self.rowCount(index)-1, 0))
             self.removeRows(0, self.rowCount(index), index)
@@ -223,6 +424,7 @@ class StandardTable(QAbstractItemModel):
                                                      self.columnCount(index) - 1))
 
         self.objByIndex(index).populate()
+        self._indexObjItems(self.objByIndex(index).childItems())
         if self.hasChildren(index):
             self.beginInsertRows(index, 0, max(self.rowCount(index)-1, 0))
             self.endInsertRows()
@@ -280,6 +482,54 @@ class StandardTable(QAbstractItemModel):
     def setData(self, index: QModelIndex, value: Any, role: int = ...) -> bool:
         if isinstance(index, QPersistentModelIndex):
             index = QModelIndex(index)
+        # edits made by other edits, e.g. clearing a row sets it to default, are not journaled
+        if role not in self.JOURNALED_ROLES or self._journaling:
+            return self._setData(index, value, role)
+
+        item = self.objByIndex(index)
+        # referable whose references may be changed by the edit and the replaced or removed object
+        owner = self._referableOf(item if role == ADD_ITEM_ROLE else item.parent())
+        oldObj = item.obj if role != ADD_ITEM_ROLE and index.isValid() else None
+
+        file, entry = None, None
+        location = self.editLocation(index)
+        pack: Package = index.data(PACKAGE_ROLE) if index.isValid() else self._rootItem.data(PACKAGE_ROLE)
+        if not isinstance(pack, Package):
+            pack = None
+        if location is not None and pack is not None and self.journal.isStarted(pack.file):
+            # encode before the edit, which links an added object with the package
+            file, entry = pack.file, self.journal.encode(JournalEntry(*location, index.column(), role, value))
+        self._journaling = True
+        try:
+            res = self._setData(index, value, role)
+        finally:
+            self._journaling = False
+        if res and pack is not None:
+            # the edit may have renamed, added or removed referables
+            pack.invalidateReferences()
+            if role == ADD_ITEM_ROLE:
+                pack.updateReferenceIndex(changed=owner, added=value)
+            elif role == Qt.EditRole:
+                pack.updateReferenceIndex(changed=owner, removed=oldObj, added=item.obj)
+            else:
+                pack.updateReferenceIndex(changed=owner, removed=oldObj)
+            if isinstance(oldObj, Identifier) or isinstance(item.obj, Identifier):
+                # the store is keyed by the identifications and completes their ids
+                pack.objStore.identificationsChanged()
+        if res and file is not None:
+            self.journal.record(file, entry)
+        return res
+
+    @staticmethod
+    def _referableOf(item: StandardItem) -> Optional[Referable]:
+        """Return the referable of the item or of its nearest parent item with a referable"""
+        while item is not None:
+            if isinstance(item.obj, Referable):
+                return item.obj
+            item = item.parent()
+        return None
+
+    def _setData(self, index: QModelIndex, value: Any, role: int = ...) -> bool:
         if not index.isValid() and role not in (Qt.FontRole, ADD_ITEM_ROLE, UNDO_ROLE, REDO_ROLE):
             return QVariant()
         elif role == Qt.BackgroundRole:
@@ -391,10 +641,8 @@ class StandardTable(QAbstractItemModel):
         parentItem = self.objByIndex(parent)
 
         self.beginRemoveRows(parent, row, row+count-1)
-        for n in range(count):
-            child = parentItem.children()[row]
-            child.setParent(None)
-            # child.deleteLater()
+        self._unindexObjItems(parentItem.childItems()[row:row + count])
+        parentItem.removeChildItems(row, count)
         self.endRemoveRows()
         return True
 
@@ -414,7 +662,7 @@ class StandardTable(QAbstractItemModel):
                 pass
 
         for currRow in range(row+count-1, row-1, -1):
-            child = parentItem.children()[currRow]
+            child = parentItem.childItems()[currRow]
             if isinstance(parentObj, (list, dict, AbstractSet)):
                 if isinstance(parentObj, list):
                     oldValue = parentObj.pop(currRow)
@@ -8,32 +8,470 @@
 #
 #  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
 
+import copy
+import hashlib
 import io
+import logging
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Union, Iterable, Optional
+from typing import Union, Iterable, Optional, Callable, Dict, Tuple, IO, Iterator, List
 import mimetypes
 
 import pyecma376_2
 from aas.adapter import aasx
 from aas.adapter.aasx import DictSupplementaryFileContainer
+from aas.adapter.json import read_aas_json_file_into
+from aas.adapter.xml import read_aas_xml_file_into, AASFromXmlDecoder, StrictAASFromXmlDecoder
+from aas.adapter.xml.xml_serialization import NS_AAS
 from aas.model import AssetAdministrationShell, Asset, Submodel, ConceptDescription, \
-    DictObjectStore, Key
+    DictObjectStore, AbstractObjectStore, Identifiable, AASReference, Referable
+from lxml import etree
 
-from aas_editor.settings import DEFAULT_COMPLETIONS
+from aas_editor.settings import XML_STREAMING_READ_MIN_SIZE, PACKAGE_CACHE_DIR, \
+    PACKAGE_CACHE_MAX_SIZE, PACKAGE_CACHE_MIN_FILE_SIZE, AASX_STORED_MIME_TYPES, AASX_COMPRESS_LEVEL
+from aas_editor.utils.util_cache import FileCache
 from aas_editor.utils.util_classes import ClassesInfo
+from aas_editor.utils.util_references import ReferenceIndex
+from aas_editor.utils.util_zip import RawCopyZipPackageWriter, ZipPartWriter, dataOffset, CompressionPolicy
+
+logger = logging.getLogger(__name__)
+
+# permissions of new files are masked by the umask, it can only be read by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def readAasXmlFileStreaming(objStore: AbstractObjectStore, file, failsafe: bool = True):
+    """
+    Read AAS XML file into objStore without building the whole element tree
+
+    Every identifiable is constructed as soon as its element is parsed and the element
+    is freed afterwards, so the memory usage is bounded by the size of the biggest
+    identifiable instead of the size of the file.
+    :param file: filename or binary file-like object
+    :param failsafe: if True, defect identifiables are logged and skipped instead of raising
+    """
+    decoder = AASFromXmlDecoder if failsafe else StrictAASFromXmlDecoder
+    constructors = {
+        NS_AAS + "assetAdministrationShell": decoder.construct_asset_administration_shell,
+        NS_AAS + "asset": decoder.construct_asset,
+        NS_AAS + "submodel": decoder.construct_submodel,
+        NS_AAS + "conceptDescription": decoder.construct_concept_description,
+    }
+
+    elements = etree.iterparse(file, events=("end",), tag=tuple(constructors),
+                               remove_blank_text=True, remove_comments=True, huge_tree=True)
+    try:
+        for _, element in elements:
+            lst = element.getparent()
+            # only elements of the top-level lists, e.g. <aas:submodels><aas:submodel>
+            if lst is None or lst.tag != element.tag + "s" or lst.getparent().getparent() is not None:
+                continue
+
+            try:
+                obj = constructors[element.tag](element)
+            except (KeyError, ValueError) as e:
+                if not failsafe:
+                    raise
+                logger.error(f"Failed to construct {element.tag}: {e}")
+            else:
+                if objStore.get(obj.identification) is not None:
+                    if not failsafe:
+                        raise KeyError(f"{obj} has a duplicate identifier already parsed in the document!")
+                    logger.error(f"{obj} has a duplicate identifier already parsed in the document! skipping it...")
+                else:
+                    objStore.add(obj)
+
+            # free the converted element and its already converted siblings
+            element.clear(keep_tail=False)
+            while element.getprevious() is not None:
+                del lst[0]
+    except etree.XMLSyntaxError as e:
+        if not failsafe:
+            raise
+        logger.error(e)
+
+
+class ReadingCancelled(Exception):
+    """Raised from a read progress callback to stop reading of a package"""
+
+
+class ProgressFile(io.FileIO):
+    """Binary file which reports read bytes to a callback after every read
+
+    The callback gets the number of read bytes and the file size. It may raise
+    ReadingCancelled to abort the reading.
+    """
+    def __init__(self, file: Union[str, Path], callback: Callable[[int, int], None]):
+        super(ProgressFile, self).__init__(file, "rb")
+        self.size = os.fstat(self.fileno()).st_size
+        self.bytesRead = 0
+        self.callback = callback
+        self.cancelled = False
+
+    def _report(self, n):
+        if self.cancelled:
+            raise ReadingCancelled()
+        if n:
+            self.bytesRead += n
+        try:
+            self.callback(min(self.bytesRead, self.size), self.size)
+        except ReadingCancelled:
+            self.cancelled = True
+            raise
+
+    def read(self, size=-1):
+        res = super(ProgressFile, self).read(size)
+        self._report(len(res) if res else 0)
+        return res
+
+    def readall(self):
+        res = super(ProgressFile, self).readall()
+        self._report(len(res))
+        return res
+
+    def readinto(self, b):
+        n = super(ProgressFile, self).readinto(b)
+        self._report(n)
+        return n
+
+
+def mapFile(file: Union[str, Path], offset: int = 0, size: Optional[int] = None) -> memoryview:
+    """Return read-only memoryview of the file content without reading it in memory"""
+    with open(file, "rb") as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size - offset
+        if not size:
+            return memoryview(b"")
+        fileMap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(fileMap)[offset:offset+size]
+
+
+def syncFile(file: IO):
+    """Flush file and make sure its content is written to the disk"""
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def syncDir(path: Union[str, Path]):
+    """Make sure that renames in the directory are written to the disk"""
+    if os.name != "posix":
+        # directories can not be opened on windows, renames are durable there anyway
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class LazySupplementaryFileContainer(DictSupplementaryFileContainer):
+    """
+    File container which reads the files of an AASX archive only when they are needed
+
+    Files added from the archive while reading it (see readingArchive) are only
+    recorded with their zip entry; all other files are kept in memory as in
+    DictSupplementaryFileContainer.
+    """
+    CHUNK_SIZE = 2**20
+
+    def __init__(self, archive: Union[str, Path, None] = None):
+        super(LazySupplementaryFileContainer, self).__init__()
+        self._archive = Path(archive) if archive else None
+        self._archiveInfos: Dict[str, zipfile.ZipInfo] = {}
+        if archive:
+            with zipfile.ZipFile(self._archive) as zf:
+                self._archiveInfos = {i.filename: i for i in zf.infolist()}
+        # Maps file names to (zip entry, content_type) of files which are not read in memory
+        self._lazyFiles: Dict[str, Tuple[zipfile.ZipInfo, str]] = {}
+        self._lazyHashes: Dict[str, bytes] = {}
+        self._readingArchive = False
+
+    @property
+    def archive(self) -> Path:
+        return self._archive
+
+    def isLazy(self, name: str) -> bool:
+        return name in self._lazyFiles
+
+    @contextmanager
+    def readingArchive(self):
+        """Files added in this context are zip entries opened from the archive of the container"""
+        self._readingArchive = True
+        try:
+            yield
+        finally:
+            self._readingArchive = False
+
+    def add_file(self, name: str, file: IO[bytes], content_type: str) -> str:
+        info = None
+        if self._readingArchive and isinstance(file, zipfile.ZipExtFile):
+            info = self._archiveInfos.get(file.name)
+
+        if info is None:
+            data = file.read()
+            hash = hashlib.sha256(data).digest()
+
+            def isSame(name):
+                if name in self._lazyFiles:
+                    return self._lazyFiles[name][1] == content_type and self.get_sha256(name) == hash
+                return self._name_map[name] == (hash, content_type)
+        else:
+            def isSame(name):
+                return self._lazyFiles.get(name) == (info, content_type)
+
+        newName = name
+        i = 1
+        while newName in self:
+            if isSame(newName):
+                return newName
+            newName = self._append_counter(name, i)
+            i += 1
+
+        if info is None:
+            self._store.setdefault(hash, data)
+            self._name_map[newName] = (hash, content_type)
+        else:
+            self._lazyFiles[newName] = (info, content_type)
+        return newName
+
+    def get_content_type(self, name: str) -> str:
+        if name in self._lazyFiles:
+            return self._lazyFiles[name][1]
+        return super(LazySupplementaryFileContainer, self).get_content_type(name)
+
+    def get_sha256(self, name: str) -> bytes:
+        if name in self._lazyFiles:
+            if name not in self._lazyHashes:
+                hash = hashlib.sha256()
+                with self._open(name) as f:
+                    for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                        hash.update(chunk)
+                self._lazyHashes[name] = hash.digest()
+            return self._lazyHashes[name]
+        return super(LazySupplementaryFileContainer, self).get_sha256(name)
+
+    def write_file(self, name: str, file: IO[bytes]) -> None:
+        if name in self._lazyFiles and isinstance(file, ZipPartWriter):
+            # copy the compressed zip entry instead of decompressing and compressing it again
+            with zipfile.ZipFile(self._archive) as zf:
+                info = self._currentInfo(zf, name)
+            if file.canCopyRaw(info):
+                file.copyRaw(self._archive, info)
+                return
+        if name in self._lazyFiles:
+            with self._open(name) as f:
+                shutil.copyfileobj(f, file, self.CHUNK_SIZE)
+        else:
+            super(LazySupplementaryFileContainer, self).write_file(name, file)
+
+    def buffer(self, name: str) -> memoryview:
+        """
+        Return read-only view of the file content
+
+        Files in memory and uncompressed files of the archive are not copied, the latter
+        are memory mapped. Compressed files have to be decompressed in memory.
+        """
+        if name not in self._lazyFiles:
+            return memoryview(self._store[self._name_map[name][0]])
+
+        with zipfile.ZipFile(self._archive) as zf:
+            info = self._currentInfo(zf, name)
+        if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+            with self._open(name) as f:
+                return memoryview(f.read())
+
+        with open(self._archive, "rb") as f:
+            offset = dataOffset(f, info)
+        return mapFile(self._archive, offset, info.file_size)
+
+    @contextmanager
+    def open(self, name: str) -> Iterator[IO[bytes]]:
+        """Open file for streamed reading"""
+        if name in self._lazyFiles:
+            with self._open(name) as f:
+                yield f
+        else:
+            # BytesIO shares the buffer of bytes until it is written to
+            yield io.BytesIO(self._store[self._name_map[name][0]])
+
+    def _currentInfo(self, zf: zipfile.ZipFile, name: str) -> zipfile.ZipInfo:
+        """:raise ValueError if the zip entry was changed since it was recorded"""
+        info = self._lazyFiles[name][0]
+        try:
+            currInfo = zf.getinfo(info.filename)
+        except KeyError:
+            currInfo = None
+        if currInfo is None or (currInfo.CRC, currInfo.file_size) != (info.CRC, info.file_size):
+            raise ValueError(f"File {name} was changed in {self._archive} since it was opened")
+        return currInfo
+
+    @contextmanager
+    def _open(self, name: str) -> Iterator[IO[bytes]]:
+        """:raise ValueError if the zip entry was changed since it was recorded"""
+        with zipfile.ZipFile(self._archive) as zf:
+            with zf.open(self._currentInfo(zf, name)) as f:
+                yield f
+
+    def moveToArchive(self, newArchive: Union[str, Path], path: Union[str, Path] = None):
+        """
+        Point the lazy files to a new version of the archive, e.g. after the package was saved
+
+        Files not contained in the new archive are read into memory from the current one.
+        :param newArchive: the new archive
+        :param path: where the new archive will be moved to, if not at its final place yet
+        """
+        with zipfile.ZipFile(newArchive) as zf:
+            infos = {i.filename: i for i in zf.infolist()}
+
+        for name, (info, contentType) in list(self._lazyFiles.items()):
+            newInfo = infos.get(name.lstrip("/"))
+            if newInfo is not None and (newInfo.CRC, newInfo.file_size) == (info.CRC, info.file_size):
+                self._lazyFiles[name] = (newInfo, contentType)
+            else:
+                with self._open(name) as f:
+                    data = f.read()
+                hash = hashlib.sha256(data).digest()
+                self._store.setdefault(hash, data)
+                self._name_map[name] = (hash, contentType)
+                del self._lazyFiles[name]
+                self._lazyHashes.pop(name, None)
+
+        self._archive = Path(path if path else newArchive)
+        self._archiveInfos = infos
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._lazyFiles or item in self._name_map
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._lazyFiles
+        yield from self._name_map
+
+
+class IndexedObjectStore(DictObjectStore):
+    """
+    Object store, which additionally keeps its objects in buckets by type
+
+    Objects of a type can be iterated and counted without checking all objects of the store.
+    The sorted identification ids are kept for completion until the store is changed.
+    """
+
+    def __init__(self, objects: Iterable[Identifiable] = ()):
+        # Maps types to the objects of exactly this type, keyed by object id
+        self._typeIndex: Dict[type, Dict[int, Identifiable]] = {}
+        self._sortedIds: Optional[List[str]] = None
+        self.version = 0  # incremented on every change of the store
+        super(IndexedObjectStore, self).__init__(objects)
+
+    def add(self, x: Identifiable) -> None:
+        super(IndexedObjectStore, self).add(x)
+        self._typeIndex.setdefault(type(x), {})[id(x)] = x
+        self._changed()
+
+    def discard(self, x: Identifiable) -> None:
+        super(IndexedObjectStore, self).discard(x)
+        if x not in self:
+            bucket = self._typeIndex.get(type(x), {})
+            if bucket.get(id(x)) is x:
+                del bucket[id(x)]
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._sortedIds = None
+
+    def identificationsChanged(self):
+        """Update the store after identifications of its objects were replaced, e.g. by an edit"""
+        self._backend = {x.identification: x for x in self._backend.values()}
+        self._changed()
+
+    def sortedIds(self) -> List[str]:
+        """Return sorted list of the unique identification ids of the objects"""
+        if self._sortedIds is None:
+            self._sortedIds = sorted({x.identification.id for x in self._backend.values()})
+        return self._sortedIds
+
+    def objectsOfType(self, typ: type) -> Iterator[Identifiable]:
+        for bucketType, bucket in list(self._typeIndex.items()):
+            if issubclass(bucketType, typ):
+                yield from list(bucket.values())
+
+    def numOfType(self, typ: type) -> int:
+        return sum(len(bucket) for bucketType, bucket in self._typeIndex.items()
+                   if issubclass(bucketType, typ))
+
+    def __getstate__(self):
+        # the index is keyed by object ids, which change on unpickling
+        state = self.__dict__.copy()
+        del state["_typeIndex"]
+        del state["_sortedIds"]
+        return state
+
+    def __setstate__(self, state):
+        self.version = 0
+        self.__dict__.update(state)
+        self._typeIndex = {}
+        self._sortedIds = None
+        for x in self._backend.values():
+            self._typeIndex.setdefault(type(x), {})[id(x)] = x
+
+
+class IncrementalAASXWriter(aasx.AASXWriter):
+    """
+    AASXWriter, which copies the parts unchanged since the source archive without recompressing them
+
+    A part is unchanged if its new content has the same size and CRC as the entry of the
+    source archive with the same name.
+    """
+
+    def __init__(self, file: Union[str, Path, IO], sourceArchive: Union[str, Path, None] = None,
+                 policy: Optional[CompressionPolicy] = None):
+        # same as AASXWriter.__init__, but with another package writer
+        self._aas_part_names = []
+        self._thumbnail_part = None
+        self._properties_part = None
+        self._supplementary_part_names = {}
+        self._aas_name_friendlyfier = aasx.NameFriendlyfier()
+
+        self.writer = RawCopyZipPackageWriter(file, sourceArchive, policy)
+
+        p = self.writer.open_part(self.AASX_ORIGIN_PART_NAME, "text/plain")
+        p.close()
 
 
 class Package:
-    def __init__(self, file: Union[str, Path] = ""):
-        """:raise TypeError if file has wrong file type"""
-        self.objStore = DictObjectStore()
-        self.fileStore = DictSupplementaryFileContainer()
+    FILE_TYPES = (".xml", ".json", ".aasx")
+    # cache of parsed packages, consulted before a file is parsed
+    cache: Optional[FileCache] = FileCache(PACKAGE_CACHE_DIR, PACKAGE_CACHE_MAX_SIZE, PACKAGE_CACHE_MIN_FILE_SIZE)
+    # compression of the parts of written AASX files
+    compressionPolicy = CompressionPolicy(AASX_STORED_MIME_TYPES, AASX_COMPRESS_LEVEL)
+
+    def __init__(self, file: Union[str, Path] = "",
+                 readProgress: Callable[[int, int, int], None] = None):
+        """
+        :param file: AAS file to read
+        :param readProgress: called while reading with read bytes, file size and
+                             number of parsed objects; may raise ReadingCancelled
+        :raise TypeError if file has wrong file type
+        :raise ReadingCancelled if reading was cancelled via readProgress
+        """
+        self.objStore = IndexedObjectStore()
+        self.fileStore = LazySupplementaryFileContainer()
+        # (type, keys) of references -> resolved object or the error raised by resolving
+        self._resolved: Dict[Tuple[type, Tuple], Union[Referable, Exception]] = {}
+        # (object store id, store version) the resolved references are valid for
+        self._resolvedVersion: Optional[Tuple[int, int]] = None
+        self._referenceIndex: Optional[ReferenceIndex] = None
         self.file = file
         if file:
-            self._read()
-        for obj in self.objStore:
-            DEFAULT_COMPLETIONS[Key]["value"].append(obj.identification.id)
+            self._read(readProgress)
         self._changed = False
 
     @classmethod
@@ -54,46 +492,207 @@ class Package:
     def __repr__(self):
         return self.file.as_posix()
 
-    def _read(self):
+    def _read(self, readProgress: Callable[[int, int, int], None] = None):
         fileType = self.file.suffix.lower().strip()
-        if fileType == ".xml":
-            self.objStore = aasx.read_aas_xml_file(self.file.as_posix())
-        elif fileType == ".json":
-            with open(self.file, "r") as f:  # TODO change if aas changes
-                self.objStore = aasx.read_aas_json_file(f)
-        elif fileType == ".aasx":
-            reader = aasx.AASXReader(self.file.as_posix())
-            reader.read_into(self.objStore, self.fileStore)
-        else:
+        if fileType not in self.FILE_TYPES:
             raise TypeError("Wrong file type:", self.file.suffix)
 
+        cacheKey = self.cache.key(self.file) if self.cache else None
+        cached = self.cache.get(cacheKey) if self.cache else None
+        if cached is not None:
+            objStore, self.fileStore = cached
+            self.objStore = objStore if isinstance(objStore, IndexedObjectStore) else IndexedObjectStore(objStore)
+            if readProgress is not None:
+                size = self.file.stat().st_size
+                readProgress(size, size, len(self.objStore))
+            return
+
+        if readProgress is None:
+            file = open(self.file, "rb")
+        else:
+            file = ProgressFile(self.file, lambda bytesRead, size:
+                                readProgress(bytesRead, size, len(self.objStore)))
+
+        with file:
+            try:
+                if fileType == ".xml" and os.fstat(file.fileno()).st_size >= XML_STREAMING_READ_MIN_SIZE:
+                    readAasXmlFileStreaming(self.objStore, file)
+                elif fileType == ".xml":
+                    read_aas_xml_file_into(self.objStore, file)
+                elif fileType == ".json":
+                    with io.TextIOWrapper(file, encoding="utf-8-sig") as f:  # TODO change if aas changes
+                        read_aas_json_file_into(self.objStore, f)
+                elif fileType == ".aasx":
+                    self.fileStore = LazySupplementaryFileContainer(self.file)
+                    reader = aasx.AASXReader(file)
+                    with self.fileStore.readingArchive():
+                        reader.read_into(self.objStore, self.fileStore)
+            except Exception as e:
+                # readers of the aas lib may wrap the exception raised in the progress callback
+                if getattr(file, "cancelled", False):
+                    raise ReadingCancelled(self.file.as_posix()) from e
+                raise
+
+        if readProgress is not None:
+            # parts of the file may be skipped, e.g. lazily read supplementary files
+            readProgress(file.size, file.size, len(self.objStore))
+
+        if self.cache:
+            self.cache.put(cacheKey, (self.objStore, self.fileStore))
+
     def write(self, file: str = None):
+        """
+        Write package to its file or to the given file
+
+        The package is written to a temporary file first, which replaces the target
+        file only if it was completely written and synced to the disk, so that the
+        target file is not corrupted if writing fails.
+        """
         if file:
             self.file: Path = file
+        self._replaceFile(self.writeTmpFile(self.file), self.file)
+
+    def writeTmpFile(self, file: Union[str, Path]) -> Path:
+        """
+        Write package to a temporary file next to file and return its path
+
+        The package itself is not changed, so a snapshot can be written in another thread.
+        The temporary file is removed if writing fails.
+        """
+        file = Path(file).absolute()
+        fileType = file.suffix.lower().strip()
+        if fileType not in self.FILE_TYPES:
+            raise TypeError("Wrong file type:", file.suffix)
+
+        # files of a lazy file store may also be read from the target file while writing;
+        # the name is unique, so that several processes may write the same file
+        fd, tmpFile = tempfile.mkstemp(prefix=f".{file.name}.", suffix=".tmp", dir=file.parent)
+        os.close(fd)
+        tmpFile = Path(tmpFile)
+        try:
+            if fileType == ".xml":
+                with open(tmpFile, "wb") as f:
+                    aasx.write_aas_xml_file(f, self.objStore)
+                    syncFile(f)
+            elif fileType == ".json":
+                with open(tmpFile, "w", encoding="utf-8") as f:
+                    aasx.write_aas_json_file(f, self.objStore)
+                    syncFile(f)
+            elif fileType == ".aasx":
+                # todo ask user if save in xml, json or both
+                #  writer.write_aas_objects("/aasx/data.json" if args.json else "/aasx/data.xml",
+                #  [obj.identification for obj in self.objStore], self.objStore, self.fielSotre, write_json=args.json)
+                sourceArchive = getattr(self.fileStore, "archive", None)
+                shell = next(self.shells, None)
+                if shell is None:
+                    raise ValueError("AASX package must contain an asset administration shell")
+                aas_id = shell.identification
+                with IncrementalAASXWriter(tmpFile, sourceArchive, self.compressionPolicy) as writer:
+                    writer.write_aas(aas_id, self.objStore, self.fileStore) #FIXME
+                    # Create OPC/AASX core properties
+                    cp = pyecma376_2.OPCCoreProperties()
+                    cp.created = datetime.now()
+                    from aas_editor.settings.app_settings import AAS_CREATOR
+                    cp.creator = AAS_CREATOR
+                    writer.write_core_properties(cp)
+                with open(tmpFile, "rb") as f:
+                    syncFile(f)
+        except BaseException:
+            if tmpFile.exists():
+                tmpFile.unlink()
+            raise
+        return tmpFile
+
+    def _replaceFile(self, tmpFile: Union[str, Path], file: Union[str, Path]):
+        """
+        Replace file by the temporary file the package was written to and make it the package file
+
+        Lazy files, which are not contained in the new archive, are read into memory before
+        their current archive may be replaced. The temporary file is removed if this fails.
+        """
+        tmpFile = Path(tmpFile)
+        file = Path(file).absolute()
+        try:
+            if file.suffix.lower() == ".aasx" and isinstance(self.fileStore, LazySupplementaryFileContainer):
+                self.fileStore.moveToArchive(tmpFile, file)
+            if file.exists():
+                shutil.copymode(file, tmpFile)
+            else:
+                # temporary files are only accessible by the user
+                os.chmod(tmpFile, 0o666 & ~UMASK)
+            os.replace(tmpFile, file)
+            syncDir(file.parent)
+        except BaseException:
+            if tmpFile.exists():
+                tmpFile.unlink()
+            raise
+        self.file = file
 
-        fileType = self.file.suffix.lower().strip()
-        if fileType == ".xml":
-            aasx.write_aas_xml_file(self.file.as_posix(), self.objStore)
-        elif fileType == ".json":
-            aasx.write_aas_json_file(self.file.as_posix(), self.objStore)
-        elif fileType == ".aasx":
-            # todo ask user if save in xml, json or both
-            #  writer.write_aas_objects("/aasx/data.json" if args.json else "/aasx/data.xml",
-            #  [obj.identification for obj in self.objStore], self.objStore, self.fielSotre, write_json=args.json)
-            with aasx.AASXWriter(self.file.as_posix()) as writer:
-                for obj in self.objStore:
-                    if isinstance(obj, AssetAdministrationShell):
-                        aas_id = obj.identification
-                        break
-                writer.write_aas(aas_id, self.objStore, self.fileStore) #FIXME
-                # Create OPC/AASX core properties
-                cp = pyecma376_2.OPCCoreProperties()
-                cp.created = datetime.now()
-                from aas_editor.settings.app_settings import AAS_CREATOR
-                cp.creator = AAS_CREATOR
-                writer.write_core_properties(cp)
-        else:
-            raise TypeError("Wrong file type:", self.file.suffix)
+    def onSnapshotWritten(self, tmpFile: Union[str, Path], file: Union[str, Path]):
+        """Update package after its snapshot was written to tmpFile by writeTmpFile()"""
+        self._replaceFile(tmpFile, file)
+
+    def resolve(self, reference: AASReference) -> Referable:
+        """
+        Resolve reference in the object store of the package
+
+        Results, also failures, are cached by the keys of the reference until identifiables
+        are added or removed or invalidateReferences() is called.
+        :raise same errors as AASReference.resolve
+        """
+        version = (id(self.objStore), self.objStore.version)
+        if version != self._resolvedVersion:
+            self.invalidateReferences()
+            self._resolvedVersion = version
+
+        cacheKey = (reference.type, reference.key)
+        try:
+            result = self._resolved[cacheKey]
+        except KeyError:
+            try:
+                result = reference.resolve(self.objStore)
+            except (AttributeError, IndexError, KeyError, NotImplementedError, TypeError) as e:
+                result = e
+            self._resolved[cacheKey] = result
+        except TypeError:
+            # keys are not hashable, e.g. if they were set to a list
+            return reference.resolve(self.objStore)
+
+        if isinstance(result, Exception):
+            raise result.with_traceback(None)
+        return result
+
+    def invalidateReferences(self):
+        """Drop the resolved references, e.g. after referables were renamed, added or removed"""
+        self._resolved.clear()
+
+    @property
+    def referenceIndex(self) -> ReferenceIndex:
+        """Reverse index of the references in the package, built on first use"""
+        if self._referenceIndex is None:
+            self._referenceIndex = ReferenceIndex(self.objStore)
+        return self._referenceIndex
+
+    def updateReferenceIndex(self, changed: Referable = None, removed: Referable = None, added: Referable = None):
+        """
+        Update the reference index after an edit, if it is built
+
+        :param changed: referable whose references may be changed
+        :param removed: removed referable, its elements are removed from the index too
+        :param added: added referable, its elements are added to the index too
+        """
+        if self._referenceIndex is None:
+            return
+        if isinstance(removed, Referable):
+            self._referenceIndex.remove(removed)
+        if isinstance(added, Referable):
+            self._referenceIndex.add(added)
+        if isinstance(changed, Referable):
+            self._referenceIndex.update(changed)
+
+    def snapshot(self) -> "PackageSnapshot":
+        """Return copy of the package, which can be written in another thread while this one is edited"""
+        return PackageSnapshot(self)
 
     @property
     def name(self):
@@ -105,27 +704,19 @@ class Package:
 
     @property
     def shells(self) -> Iterable[AssetAdministrationShell]:
-        for obj in self.objStore:
-            if isinstance(obj, AssetAdministrationShell):
-                yield obj
+        yield from self.objStore.objectsOfType(AssetAdministrationShell)
 
     @property
     def assets(self) -> Iterable[Asset]:
-        for obj in self.objStore:
-            if isinstance(obj, Asset):
-                yield obj
+        yield from self.objStore.objectsOfType(Asset)
 
     @property
     def submodels(self) -> Iterable[Submodel]:
-        for obj in self.objStore:
-            if isinstance(obj, Submodel):
-                yield obj
+        yield from self.objStore.objectsOfType(Submodel)
 
     @property
     def concept_descriptions(self) -> Iterable[ConceptDescription]:
-        for obj in self.objStore:
-            if isinstance(obj, ConceptDescription):
-                yield obj
+        yield from self.objStore.objectsOfType(ConceptDescription)
 
     # @property
     # def others(self):
@@ -141,29 +732,67 @@ class Package:
 
     def add(self, obj):
         if isinstance(obj, StoredFile):
-            newName = self.fileStore.add_file(name=obj.name, file=obj.file(), content_type=obj.mime_type)
+            with obj.open() as file:
+                newName = self.fileStore.add_file(name=obj.name, file=file, content_type=obj.mime_type)
             obj.setFileStore(newName, self.fileStore)
         else:
             self.objStore.add(obj)
+            self.updateReferenceIndex(added=obj)
 
     def discard(self, obj):
         self.objStore.discard(obj)
+        self.updateReferenceIndex(removed=obj)
 
     @property
     def numOfShells(self) -> int:
-        return len(tuple(self.shells))
+        return self.objStore.numOfType(AssetAdministrationShell)
 
     @property
     def numOfAssets(self) -> int:
-        return len(tuple(self.assets))
+        return self.objStore.numOfType(Asset)
 
     @property
     def numOfSubmodels(self) -> int:
-        return len(tuple(self.submodels))
+        return self.objStore.numOfType(Submodel)
 
     @property
     def numOfConceptDescriptions(self) -> int:
-        return len(tuple(self.concept_descriptions))
+        return self.objStore.numOfType(ConceptDescription)
+
+
+class PackageSnapshot:
+    """
+    Copy of a package, taken to write the package in another thread while it is edited
+
+    Taking the snapshot only serializes the objects of the package, which takes about
+    a quarter of the time of copying them; they are deserialized by package() or
+    writeTmpFile() in the writing thread. The file store is copied shallowly, as the
+    contents of stored files are not changed in place. The hashes of its lazy files are
+    shared, so that hashes computed while writing are reused by later saves.
+    """
+
+    def __init__(self, pack: Package):
+        self._pack = Package.__new__(Package)
+        self._pack.__dict__.update(pack.__dict__)
+        self._pack._resolved = {}
+        self._pack._referenceIndex = None
+        self._pack.objStore = None
+        self._pack.fileStore = copy.copy(pack.fileStore)
+        for attr, value in vars(pack.fileStore).items():
+            if isinstance(value, dict) and attr != "_lazyHashes":
+                setattr(self._pack.fileStore, attr, dict(value))
+        self._objStore: Optional[bytes] = pickle.dumps(pack.objStore, pickle.HIGHEST_PROTOCOL)
+
+    def package(self) -> Package:
+        """Return the copied package, its objects are deserialized on first call"""
+        if self._objStore is not None:
+            self._pack.objStore = pickle.loads(self._objStore)
+            self._objStore = None
+        return self._pack
+
+    def writeTmpFile(self, file: Union[str, Path]) -> Path:
+        """Write the copied package to a temporary file, see Package.writeTmpFile()"""
+        return self.package().writeTmpFile(file)
 
 
 class StoredFile:
@@ -199,7 +828,30 @@ class StoredFile:
 
     @property
     def value(self) -> bytes:
-        return self.file().getvalue()
+        return self.buffer().tobytes()
+
+    def buffer(self) -> memoryview:
+        """Return read-only view of the file content, without copying it if possible"""
+        if self.savedInStore():
+            if isinstance(self._fileStore, LazySupplementaryFileContainer):
+                return self._fileStore.buffer(self.name)
+            file_content = io.BytesIO()
+            self._fileStore.write_file(self.name, file_content)
+            return file_content.getbuffer().toreadonly()
+        else:
+            return mapFile(self._filePath)
+
+    @contextmanager
+    def open(self) -> Iterator[IO[bytes]]:
+        """Open file for streamed reading"""
+        if self.savedInStore() and isinstance(self._fileStore, LazySupplementaryFileContainer):
+            with self._fileStore.open(self.name) as f:
+                yield f
+        elif self.savedInStore():
+            yield self.file()
+        else:
+            with open(self._filePath, "rb") as f:
+                yield f
 
     def file(self) -> io.BytesIO:
         if self.savedInStore():
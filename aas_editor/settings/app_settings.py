@@ -8,8 +8,10 @@
 #
 #  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
 
+import os
+
 import qtawesome
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, QStandardPaths
 from PyQt5.QtGui import QKeySequence, QColor, QFont, QIcon
 from PyQt5.QtWidgets import QFileDialog
 
@@ -32,6 +34,30 @@ DEFAULT_FONT.setPointSize(12)
 MAX_UNDOS = 10
 MAX_RECENT_FILES = 4
 
+# XML files bigger than this are read element by element to keep the memory usage low
+XML_STREAMING_READ_MIN_SIZE = 50 * 2**20  # bytes
+
+# Parsed packages are cached on disk, so that big files are opened faster next time
+PACKAGE_CACHE_DIR = os.path.join(QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation),
+                                 APPLICATION_NAME, "packages")
+PACKAGE_CACHE_MAX_SIZE = 2 * 2**30  # bytes
+PACKAGE_CACHE_MIN_FILE_SIZE = 2**20  # bytes, smaller files are parsed fast enough
+
+# Unsaved edits are journaled, so that they can be recovered after a crash
+EDIT_JOURNAL_DIR = os.path.join(QStandardPaths.writableLocation(QStandardPaths.AppDataLocation),
+                                APPLICATION_NAME, "journal")
+
+# Parts of saved AASX files with these mime types are stored uncompressed, as they are compressed already.
+# Mime types ending with "/" stand for all their subtypes
+AASX_STORED_MIME_TYPES = (
+    "image/jpeg", "image/png", "image/gif", "image/webp", "video/", "audio/",
+    "application/zip", "application/gzip", "application/x-7z-compressed", "application/x-rar-compressed",
+    "application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+)
+AASX_COMPRESS_LEVEL = 6  # deflate level of other parts, from 1 (fastest) to 9 (smallest)
+
 #FileDialogOptions
 FILE_DIALOG_OPTIONS = QFileDialog.DontResolveSymlinks | QFileDialog.DontUseNativeDialog
 
@@ -67,7 +93,8 @@ TYPE_HINT_COLUMN = 3
 
 # Themes
 import os
-files = os.listdir("themes")
+# themes are missing if the app is not started from its directory, e.g. by command line tools
+files = os.listdir("themes") if os.path.isdir("themes") else []
 THEMES = {"standard": ""}
 DEFAULT_THEME = "standard"
 for file in files:
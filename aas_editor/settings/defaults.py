@@ -67,7 +67,7 @@ DEFAULTS = {
 
 DEFAULT_COMPLETIONS = {
     Key: {
-        "value": []
+        "value": []  # replaced by the shared model of the ids of opened packages, see models.table_completions
     },
     File: {
         "mime_type": MIME_TYPES
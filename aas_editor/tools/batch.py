@@ -0,0 +1,52 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""Helpers for command line tools processing many AAS files in a process pool"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+import aas_editor.settings  # must be imported before aas_editor.package, else circular import
+from aas_editor.package import Package
+
+FILE_TYPES = tuple(fileType.lstrip(".") for fileType in Package.FILE_TYPES)
+
+
+def findAasFiles(path: Path, fileTypes: Iterable[str] = FILE_TYPES, exclude: Optional[Path] = None) -> List[Path]:
+    """
+    Return path if it is a file, else all AAS files in the directory tree of path
+
+    :param fileTypes: file types to search for, e.g. "xml"
+    :param exclude: directory whose files are skipped, e.g. the target directory of a conversion
+    """
+    if path.is_file():
+        return [path]
+    suffixes = {f".{fileType}" for fileType in fileTypes}
+    return [file for file in sorted(path.rglob("*"))
+            if file.suffix.lower() in suffixes and file.is_file()
+            and (exclude is None or exclude not in file.parents)]
+
+
+def initWorker():
+    # every file is read only once, caching the parsed packages would only fill the cache
+    Package.cache = None
+
+
+def mapInProcessPool(func: Callable, *iterables: Sequence, workers: int) -> Iterator:
+    """Like map(), but calls func in a pool of processes, results are yielded in order"""
+    num = min(len(iterable) for iterable in iterables)
+    if not num:
+        return
+    workers = min(workers, num)
+    # many small files are sent to the workers in chunks to reduce the overhead
+    chunksize = max(1, num // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initWorker) as executor:
+        yield from executor.map(func, *iterables, chunksize=chunksize)
@@ -0,0 +1,123 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""
+Convert AAS files between xml, json and aasx without starting the editor
+
+SRC may be a file or a directory, the directory tree of SRC is reproduced in DST.
+Files are converted concurrently in a pool of processes.
+Usage: python -m aas_editor.tools.convert SRC DST --to aasx [--from xml json] [-j N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from aas_editor.tools.batch import FILE_TYPES, findAasFiles, mapInProcessPool
+from aas_editor.package import Package
+
+
+class ConversionResult(NamedTuple):
+    src: str
+    dst: str
+    size: int  # bytes of the source file
+    error: Optional[str] = None
+
+
+def conversionJobs(src: Path, dst: Path, toType: str,
+                   fromTypes: Iterable[str] = FILE_TYPES) -> List[Tuple[Path, Path]]:
+    """
+    Return pairs of source and target files
+
+    :raise ValueError if several source files would be converted to the same target file
+    """
+    if src.is_file():
+        target = dst if dst.suffix.lower() == f".{toType}" else dst.joinpath(src.name)
+        return [(src, target.with_suffix(f".{toType}"))]
+    # skip results of previous runs, if the target directory lies in the source directory
+    exclude = dst if dst != src else None
+    jobs = [(file, dst.joinpath(file.relative_to(src)).with_suffix(f".{toType}"))
+            for file in findAasFiles(src, fromTypes, exclude=exclude)]
+
+    sources: Dict[Path, List[Path]] = {}
+    for file, target in jobs:
+        sources.setdefault(target, []).append(file)
+    duplicates = [files for files in sources.values() if len(files) > 1]
+    if duplicates:
+        raise ValueError("Several files would be converted to the same file: " +
+                         "; ".join(", ".join(file.as_posix() for file in files) for files in duplicates))
+    return jobs
+
+
+def convertFile(src: str, dst: str) -> ConversionResult:
+    """Convert file, used as task for processes of the process pool"""
+    try:
+        size = os.path.getsize(src)
+        Path(dst).parent.mkdir(parents=True, exist_ok=True)
+        Package(src).write(dst)
+    except Exception as e:
+        return ConversionResult(src, dst, 0, f"{type(e).__name__}: {e}")
+    return ConversionResult(src, dst, size)
+
+
+def convert(jobs: List[Tuple[Path, Path]], workers: int) -> Iterator[ConversionResult]:
+    """Convert files in a process pool, results are yielded in order of the jobs"""
+    yield from mapInProcessPool(convertFile, [src.as_posix() for src, _ in jobs],
+                                [dst.as_posix() for _, dst in jobs], workers=workers)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aas_editor.tools.convert", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("src", type=Path, help="AAS file or directory with AAS files")
+    parser.add_argument("dst", type=Path, help="target file or directory")
+    parser.add_argument("--to", required=True, choices=FILE_TYPES, dest="toType",
+                        help="file type to convert to")
+    parser.add_argument("--from", nargs="+", default=FILE_TYPES, choices=FILE_TYPES, dest="fromTypes",
+                        help="file types to convert from, default: all")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes, default: number of CPUs")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("number of worker processes must be at least 1")
+    if not args.src.exists():
+        parser.error(f"{args.src} does not exist")
+
+    try:
+        jobs = conversionJobs(args.src.absolute(), args.dst.absolute(), args.toType, args.fromTypes)
+    except ValueError as e:
+        parser.error(str(e))
+    if not jobs:
+        print(f"No files to convert in {args.src}")
+        return 0
+
+    start = time.perf_counter()
+    converted = failed = size = 0
+    for result in convert(jobs, args.jobs):
+        if result.error:
+            failed += 1
+            print(f"{result.src} couldn't be converted: {result.error}", file=sys.stderr)
+        else:
+            converted += 1
+            size += result.size
+    duration = max(time.perf_counter() - start, 1e-9)
+
+    print(f"{converted} of {len(jobs)} files converted in {duration:.2f} s: "
+          f"{converted / duration:.1f} files/s, {size / 2**20 / duration:.2f} MB/s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
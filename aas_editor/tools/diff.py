@@ -0,0 +1,156 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""
+Show what changed between two AAS files
+
+Identifiables are matched by identification, their elements by id_short.
+Usage: python -m aas_editor.tools.diff OLD NEW [--json]
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import Set as AbstractSet
+from enum import Enum
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from aas.model import AbstractObjectStore, Referable
+from aas.model.base import NamespaceSet
+
+import aas_editor.settings  # must be imported before aas_editor.package, else circular import
+from aas_editor.package import Package
+from aas_editor.utils.util import getAttrs
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+# attributes which are no part of the object content
+IGNORED_ATTRS = {"parent", "namespace_element_sets"}
+
+
+class Change(NamedTuple):
+    kind: str  # ADDED, REMOVED or CHANGED
+    path: Tuple[str, ...]  # id of the identifiable followed by the id_shorts of the elements
+    attrs: Tuple[str, ...] = ()  # changed attributes, only for CHANGED
+
+
+def valueKey(value) -> Any:
+    """Return hashable representation of value, which is equal for values with equal content"""
+    if value is None or isinstance(value, (str, int, float, bytes, Enum, type)):
+        return value
+    if isinstance(value, dict):
+        return tuple(sorted(((key, valueKey(val)) for key, val in value.items()), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(valueKey(val) for val in value)
+    if isinstance(value, AbstractSet):
+        return frozenset(valueKey(val) for val in value)
+    try:
+        attrs = vars(value)
+    except TypeError:
+        return repr(value)
+    # objects of the aas model, e.g. references or qualifiers
+    return (type(value),) + tuple((attr, valueKey(val)) for attr, val in sorted(attrs.items())
+                                  if attr not in IGNORED_ATTRS)
+
+
+class Differ:
+    """Compares two object stores in linear time using dicts keyed by identification and id_short"""
+
+    def __init__(self):
+        self.changes: List[Change] = []
+        # attributes with content and attributes with child elements of each type
+        self._attrs: Dict[type, Tuple[List[str], List[str]]] = {}
+
+    def diff(self, old: AbstractObjectStore, new: AbstractObjectStore) -> List[Change]:
+        self.changes = []
+        oldObjs = {obj.identification: obj for obj in old}
+        newObjs = {obj.identification: obj for obj in new}
+        for identification, oldObj in oldObjs.items():
+            newObj = newObjs.get(identification)
+            if newObj is None:
+                self.changes.append(Change(REMOVED, (identification.id,)))
+            else:
+                self._diff(oldObj, newObj, (identification.id,))
+        for identification in newObjs.keys() - oldObjs.keys():
+            self.changes.append(Change(ADDED, (identification.id,)))
+        return self.changes
+
+    def diffObjects(self, old: Referable, new: Referable, path: Tuple[str, ...]) -> List[Change]:
+        """Return changes between two versions of an object, path is the path of the object"""
+        self.changes = []
+        self._diff(old, new, path)
+        return self.changes
+
+    def _diff(self, old: Referable, new: Referable, path: Tuple[str, ...]):
+        if type(old) is not type(new):
+            self.changes.append(Change(CHANGED, path, ("type",)))
+            return
+
+        valueAttrs, childAttrs = self._attrsOf(old)
+        changedAttrs = tuple(attr for attr in valueAttrs
+                             if valueKey(getattr(old, attr, None)) != valueKey(getattr(new, attr, None)))
+        if changedAttrs:
+            self.changes.append(Change(CHANGED, path, changedAttrs))
+
+        for attr in childAttrs:
+            oldChildren = {child.id_short: child for child in getattr(old, attr)}
+            newChildren = {child.id_short: child for child in getattr(new, attr)}
+            for idShort, oldChild in oldChildren.items():
+                newChild = newChildren.get(idShort)
+                if newChild is None:
+                    self.changes.append(Change(REMOVED, path + (idShort,)))
+                else:
+                    self._diff(oldChild, newChild, path + (idShort,))
+            for idShort in newChildren:
+                if idShort not in oldChildren:
+                    self.changes.append(Change(ADDED, path + (idShort,)))
+
+    def _attrsOf(self, obj) -> Tuple[List[str], List[str]]:
+        if type(obj) not in self._attrs:
+            valueAttrs = []
+            childAttrs = []
+            for attr in getAttrs(obj):
+                if attr in IGNORED_ATTRS:
+                    continue
+                elif isinstance(getattr(obj, attr, None), NamespaceSet):
+                    childAttrs.append(attr)
+                else:
+                    valueAttrs.append(attr)
+            self._attrs[type(obj)] = (valueAttrs, childAttrs)
+        return self._attrs[type(obj)]
+
+
+def diffPackages(old: Package, new: Package) -> List[Change]:
+    return Differ().diff(old.objStore, new.objStore)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aas_editor.tools.diff", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old", help="old AAS file")
+    parser.add_argument("new", help="new AAS file")
+    parser.add_argument("--json", action="store_true", help="print changes as JSON")
+    args = parser.parse_args(argv)
+
+    changes = diffPackages(Package(args.old), Package(args.new))
+    if args.json:
+        json.dump([change._asdict() for change in changes], sys.stdout, indent=1)
+        print()
+    else:
+        for change in changes:
+            attrs = f": {', '.join(change.attrs)}" if change.attrs else ""
+            print(f"{change.kind:>8} {' / '.join(change.path)}{attrs}")
+    return 1 if changes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""
+Generate synthetic AAS files of configurable size for benchmarks and stress tests
+
+Equal options and seed generate equal packages. Every OUT gets the same package,
+its file type is chosen by its suffix; aasx files contain only the first shell.
+Usage: python -m aas_editor.tools.generate OUT [OUT ...] [--shells N] [--submodels N] [--depth N]
+       [--width N] [--properties N] [--references N] [--concept-descriptions N]
+       [--languages LANG ...] [--files N] [--file-size BYTES] [--seed N]
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+from typing import List, NamedTuple, Tuple
+
+from aas.model import AASReference, Asset, AssetAdministrationShell, AssetKind, ConceptDescription, \
+    ConceptDictionary, File, Identifier, IdentifierType, Property, ReferenceElement, Submodel, \
+    SubmodelElementCollectionUnordered
+
+import aas_editor.settings  # must be imported before aas_editor.package, else circular import
+from aas_editor.package import Package
+
+ID_PREFIX = "https://example.com/generated"
+# value types of the properties and functions returning a random value of the type;
+# bool is left out, as the xml reader of the aas lib reads false as None
+VALUE_TYPES = (
+    (str, lambda rng: f"value {rng.randrange(10**6)}"),
+    (int, lambda rng: rng.randrange(-10**6, 10**6)),
+    (float, lambda rng: round(rng.uniform(-1000, 1000), 3)),
+)
+FILE_TYPES = (("application/pdf", "pdf"), ("image/png", "png"), ("text/plain", "txt"))
+
+
+class GeneratorConfig(NamedTuple):
+    shells: int = 1
+    submodels: int = 3  # per shell
+    depth: int = 2  # nesting depth of the collections in a submodel
+    width: int = 3  # collections per submodel and per collection
+    properties: int = 10  # per submodel and per collection
+    references: int = 10  # reference elements per submodel, pointing to random properties
+    conceptDescriptions: int = 10  # semantic ids of the properties are chosen from these
+    languages: Tuple[str, ...] = ("en", "de")  # languages of the descriptions
+    files: int = 0  # supplementary files per shell
+    fileSize: int = 1024  # bytes
+    seed: int = 0
+
+    def numOfElements(self) -> int:
+        """Return number of submodel elements of the generated package"""
+        collections = sum(self.width ** level for level in range(1, self.depth + 1))
+        perSubmodel = collections + (collections + 1) * self.properties + self.references
+        return self.shells * (self.submodels * perSubmodel + (self.files if self.submodels else 0))
+
+
+class PackageGenerator:
+    """Generates a package with a random, but for equal configs equal, content"""
+
+    def __init__(self, config: GeneratorConfig = GeneratorConfig()):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.pack = Package()
+        self.conceptDescriptions: List[ConceptDescription] = []
+        self.properties: List[Property] = []
+
+    def generate(self) -> Package:
+        for i in range(self.config.conceptDescriptions):
+            conceptDescription = ConceptDescription(self._id("conceptDescription", i), id_short=f"Concept{i}",
+                                                    description=self._description(f"Concept {i}"))
+            self.conceptDescriptions.append(conceptDescription)
+            self.pack.add(conceptDescription)
+        for i in range(self.config.shells):
+            self._generateShell(i)
+        return self.pack
+
+    @staticmethod
+    def _id(kind: str, *numbers: int) -> Identifier:
+        return Identifier(f"{ID_PREFIX}/{kind}/{'/'.join(str(n) for n in numbers)}", IdentifierType.IRI)
+
+    def _description(self, text: str) -> dict:
+        return {lang: f"{text} ({lang})" for lang in self.config.languages}
+
+    def _semanticId(self):
+        if not self.conceptDescriptions:
+            return None
+        return AASReference.from_referable(self.rng.choice(self.conceptDescriptions))
+
+    def _generateShell(self, i: int):
+        asset = Asset(AssetKind.INSTANCE, self._id("asset", i), id_short=f"Asset{i}",
+                      description=self._description(f"Asset {i}"))
+        self.pack.add(asset)
+        submodels = []
+        for j in range(self.config.submodels):
+            submodel = Submodel(self._id("submodel", i, j), id_short=f"Submodel{j}",
+                                description=self._description(f"Submodel {j} of shell {i}"),
+                                semantic_id=self._semanticId())
+            self._addElements(submodel.submodel_element, self.config.depth, f"{i}_{j}")
+            submodels.append(submodel)
+            self.pack.add(submodel)
+        # references are added after the properties of all submodels were generated
+        for submodel in submodels:
+            for k in range(self.config.references if self.properties else 0):
+                target = self.rng.choice(self.properties)
+                submodel.submodel_element.add(ReferenceElement(f"Reference{k}", AASReference.from_referable(target),
+                                                               description=self._description(f"Reference {k}")))
+        for k in range(self.config.files):
+            self._addFile(submodels[k % len(submodels)] if submodels else None, i, k)
+        shell = AssetAdministrationShell(AASReference.from_referable(asset), self._id("shell", i),
+                                         id_short=f"Shell{i}", description=self._description(f"Shell {i}"),
+                                         submodel={AASReference.from_referable(sm) for sm in submodels})
+        # concept descriptions are written to aasx files only if they are in a concept dictionary
+        shell.concept_dictionary.add(ConceptDictionary(
+            "ConceptDictionary", concept_description={AASReference.from_referable(cd)
+                                                      for cd in self.conceptDescriptions}))
+        self.pack.add(shell)
+
+    def _addElements(self, namespaceSet, depth: int, name: str):
+        for k in range(self.config.properties):
+            valueType, value = self.rng.choice(VALUE_TYPES)
+            prop = Property(f"Property{k}", valueType, value(self.rng), semantic_id=self._semanticId(),
+                            description=self._description(f"Property {k} of {name}"))
+            namespaceSet.add(prop)
+            self.properties.append(prop)
+        if depth > 0:
+            for k in range(self.config.width):
+                collection = SubmodelElementCollectionUnordered(
+                    f"Collection{k}", description=self._description(f"Collection {k} of {name}"))
+                namespaceSet.add(collection)
+                self._addElements(collection.value, depth - 1, f"{name}_{k}")
+
+    def _addFile(self, submodel: Submodel, i: int, k: int):
+        mimeType, suffix = FILE_TYPES[k % len(FILE_TYPES)]
+        size = self.config.fileSize
+        content = self.rng.getrandbits(8 * size).to_bytes(size, "little") if size else b""
+        name = self.pack.fileStore.add_file(f"/aasx/files/shell{i}_file{k}.{suffix}", io.BytesIO(content), mimeType)
+        if submodel is not None:
+            submodel.submodel_element.add(File(f"File{k}", mimeType, name,
+                                               description=self._description(f"File {k}")))
+
+
+def generatePackage(config: GeneratorConfig = GeneratorConfig()) -> Package:
+    return PackageGenerator(config).generate()
+
+
+def main(argv: List[str] = None) -> int:
+    defaults = GeneratorConfig()
+    parser = argparse.ArgumentParser(prog="python -m aas_editor.tools.generate", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("outputs", nargs="+", metavar="OUT", help="AAS files to write")
+    parser.add_argument("--shells", type=int, default=defaults.shells, help="number of shells")
+    parser.add_argument("--submodels", type=int, default=defaults.submodels, help="submodels per shell")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="nesting depth of the collections")
+    parser.add_argument("--width", type=int, default=defaults.width,
+                        help="collections per submodel and per collection")
+    parser.add_argument("--properties", type=int, default=defaults.properties,
+                        help="properties per submodel and per collection")
+    parser.add_argument("--references", type=int, default=defaults.references,
+                        help="reference elements per submodel")
+    parser.add_argument("--concept-descriptions", type=int, default=defaults.conceptDescriptions,
+                        dest="conceptDescriptions", help="concept descriptions used as semantic ids")
+    parser.add_argument("--languages", nargs="*", default=defaults.languages, help="languages of the descriptions")
+    parser.add_argument("--files", type=int, default=defaults.files, help="supplementary files per shell")
+    parser.add_argument("--file-size", type=int, default=defaults.fileSize, dest="fileSize",
+                        help="size of a supplementary file in bytes")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="seed of the random generator")
+    args = parser.parse_args(argv)
+    config = GeneratorConfig(**{field: getattr(args, field) for field in GeneratorConfig._fields})
+    config = config._replace(languages=tuple(config.languages))
+    if any(value < 0 for value in config if isinstance(value, int)):
+        parser.error("numbers and sizes must not be negative")
+    if config.shells < 1 and any(out.lower().endswith(".aasx") for out in args.outputs):
+        parser.error("AASX files must contain at least one shell")
+
+    start = time.perf_counter()
+    pack = generatePackage(config)
+    print(f"Generated {len(pack.objStore)} identifiables with {config.numOfElements()} elements "
+          f"in {time.perf_counter() - start:.2f} s")
+    for out in args.outputs:
+        start = time.perf_counter()
+        pack.write(out)
+        print(f"{pack.file}: {pack.file.stat().st_size / 2**20:.1f} MB in {time.perf_counter() - start:.2f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
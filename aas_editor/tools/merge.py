@@ -0,0 +1,133 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""
+Merge several AAS files into one
+
+Identifiables contained in several files with different content are conflicts;
+the version of the first (or with --keep last, of the last) file is used.
+Usage: python -m aas_editor.tools.merge OUT IN [IN ...] [--keep first|last] [--strict]
+"""
+
+import argparse
+import copy
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from aas.model import File, Identifiable, Identifier
+
+import aas_editor.settings  # must be imported before aas_editor.package, else circular import
+from aas_editor.package import Package
+from aas_editor.tools.diff import Change, Differ
+from aas_editor.utils.util_references import iterElements
+
+FIRST = "first"
+LAST = "last"
+
+
+class MergeConflict(NamedTuple):
+    id: str  # identification of the conflicting identifiable
+    files: Tuple[str, ...]  # packages with a different version of it, the kept one first
+    changes: Tuple[Change, ...]  # changes from the kept version to the other ones
+
+
+class Merger:
+    """
+    Combines packages into one in linear time over the total object count
+
+    Identifiables are indexed by identification. If an identifiable is contained in
+    several packages, an equal duplicate is dropped and a different one is recorded
+    as conflict. Supplementary files of the kept objects are copied into one file
+    store, which keeps equal file contents only once; files with the same name but
+    different content are renamed and the File elements are updated.
+    """
+
+    def __init__(self, keep: str = FIRST):
+        if keep not in (FIRST, LAST):
+            raise ValueError(f"keep must be '{FIRST}' or '{LAST}': {keep}")
+        self.keep = keep
+        self.conflicts: List[MergeConflict] = []
+        self._differ = Differ()
+
+    def merge(self, packs: Sequence[Package]) -> Package:
+        # identification -> index of the package with the kept version
+        kept: Dict[Identifier, int] = {}
+        objects: Dict[Identifier, Identifiable] = {}
+        # identification -> indexes of the packages with other versions and the changes to them
+        conflicts: Dict[Identifier, List[Tuple[int, List[Change]]]] = {}
+        order = range(len(packs)) if self.keep == FIRST else reversed(range(len(packs)))
+        for i in order:
+            for obj in packs[i].objStore:
+                identification = obj.identification
+                if identification not in kept:
+                    kept[identification] = i
+                    objects[identification] = obj
+                    continue
+                changes = self._differ.diffObjects(objects[identification], obj, (identification.id,))
+                if changes:
+                    conflicts.setdefault(identification, []).append((i, changes))
+
+        for identification, others in conflicts.items():
+            files = tuple(repr(packs[i]) for i in [kept[identification]] + [i for i, _ in others])
+            changes = tuple(change for _, changes in others for change in changes)
+            self.conflicts.append(MergeConflict(identification.id, files, changes))
+
+        result = Package()
+        fileNames: Dict[Tuple[int, str], str] = {}
+        for identification, obj in objects.items():
+            i = kept[identification]
+            obj = copy.deepcopy(obj)
+            for element in iterElements(obj):
+                if isinstance(element, File) and element.value in packs[i].fileStore:
+                    element.value = self._copyFile(packs[i], i, element.value, result, fileNames)
+            result.add(obj)
+        return result
+
+    @staticmethod
+    def _copyFile(pack: Package, i: int, name: str, result: Package,
+                  fileNames: Dict[Tuple[int, str], str]) -> str:
+        """Copy file of pack into the result package once, return its name in the result"""
+        if (i, name) not in fileNames:
+            with pack.fileStore.open(name) as f:
+                fileNames[(i, name)] = result.fileStore.add_file(name, f, pack.fileStore.get_content_type(name))
+        return fileNames[(i, name)]
+
+
+def mergePackages(packs: Iterable[Package], keep: str = FIRST) -> Tuple[Package, List[MergeConflict]]:
+    merger = Merger(keep)
+    pack = merger.merge(list(packs))
+    return pack, merger.conflicts
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aas_editor.tools.merge", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out", help="merged AAS file")
+    parser.add_argument("inputs", nargs="+", help="AAS files to merge")
+    parser.add_argument("--keep", choices=(FIRST, LAST), default=FIRST,
+                        help="version to keep if an identifiable differs between files")
+    parser.add_argument("--strict", action="store_true", help="don't write the merged file if there are conflicts")
+    args = parser.parse_args(argv)
+
+    pack, conflicts = mergePackages((Package(file) for file in args.inputs), args.keep)
+    for conflict in conflicts:
+        print(f"Conflict {conflict.id}: {', '.join(conflict.files)}", file=sys.stderr)
+        for change in conflict.changes:
+            attrs = f": {', '.join(change.attrs)}" if change.attrs else ""
+            print(f"  {change.kind:>8} {' / '.join(change.path)}{attrs}", file=sys.stderr)
+    if conflicts and args.strict:
+        return 1
+    pack.write(args.out)
+    print(f"{pack.file}: {len(pack.objStore)} objects from {len(args.inputs)} files, {len(conflicts)} conflicts")
+    return 1 if conflicts else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""
+Check types and references of all objects in AAS files without starting the editor
+
+Every attribute is checked against its type hint the same way as in the editor.
+References with global keys which can not be resolved in their package and File elements pointing
+to missing supplementary files are reported as dangling.
+The report is written as JSON, files are checked concurrently in a pool of processes.
+Usage: python -m aas_editor.tools.validate PATH [PATH ...] [-o REPORT] [-j N]
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from aas.model import AASReference, File, Identifiable
+
+from aas_editor.tools.batch import FILE_TYPES, findAasFiles, mapInProcessPool
+from aas_editor.package import Package
+from aas_editor.settings import TYPES_NOT_TO_POPULATE, TYPES_WITH_INSTANCES_NOT_TO_POPULATE
+from aas_editor.utils.util import getAttrs4detailInfo
+from aas_editor.utils.util_classes import ClassesInfo
+from aas_editor.utils.util_type import checkType, getAttrTypeHint, getArgs, getIterItemTypeHint, \
+    getTypeHintName, getTypeName, isSimpleIterable, removeOptional
+
+TYPE_MISMATCH = "typeMismatch"
+DANGLING_REFERENCE = "danglingReference"
+MISSING_FILE = "missingFile"
+
+
+class Validator:
+    """Walks all objects of a package like the detailed info tree and collects issues"""
+
+    def __init__(self, pack: Package):
+        self.pack = pack
+        self.issues: List[Dict[str, Any]] = []
+        self._visited = set()
+        # type hints and attributes are the same for all objects of a type
+        self._typeHints: Dict[Tuple[type, str], Any] = {}
+        self._attrs: Dict[type, List[str]] = {}
+
+    def validate(self) -> List[Dict[str, Any]]:
+        for obj in self.pack.objStore:
+            self._validate(obj, [obj.identification.id], None)
+        return self.issues
+
+    def _validate(self, obj, path: List[str], typeHint):
+        if typeHint is not None and not self._checkType(obj, typeHint):
+            self.issues.append({"kind": TYPE_MISMATCH, "path": path,
+                                "expected": self._typeHintName(typeHint), "actual": getTypeName(type(obj))})
+
+        if isinstance(obj, AASReference):
+            self._checkReference(obj, path)
+        elif isinstance(obj, File):
+            self._checkFile(obj, path)
+
+        if obj is None or isinstance(obj, TYPES_WITH_INSTANCES_NOT_TO_POPULATE) \
+                or type(obj) in TYPES_NOT_TO_POPULATE or id(obj) in self._visited:
+            return
+        self._visited.add(id(obj))
+
+        if isinstance(obj, dict):
+            args = getArgs(removeOptional(typeHint))
+            valueHint = args[1] if len(args) == 2 else None
+            for key, value in obj.items():
+                self._validate(value, path + [str(key)], valueHint)
+        elif isSimpleIterable(obj):
+            itemHint = self._iterItemTypeHint(typeHint)
+            for i, item in enumerate(obj):
+                name = getattr(item, "id_short", None) or str(i)
+                self._validate(item, path + [name], itemHint)
+        elif not isinstance(obj, Identifiable) or len(path) == 1:
+            # identifiables are validated as objects of the store, not where they are referenced
+            for attr in self._attrsOf(obj):
+                try:
+                    value = getattr(obj, attr)
+                except Exception:
+                    continue
+                self._validate(value, path + [attr], self._typeHint(type(obj), attr))
+
+    def _checkReference(self, ref: AASReference, path: List[str]):
+        if not any(key.get_identifier() for key in ref.key):
+            # references without global keys are not supported by the aas lib yet
+            return
+        try:
+            ref.resolve(self.pack.objStore)
+        except Exception as e:
+            self.issues.append({"kind": DANGLING_REFERENCE, "path": path,
+                                "reference": [key.value for key in ref.key], "error": str(e)})
+
+    def _checkFile(self, file: File, path: List[str]):
+        # absolute paths point into the supplementary files of an aasx package, others are URLs
+        isSupplementaryFile = self.pack.file.suffix.lower() == ".aasx" and bool(file.value) \
+                and file.value.startswith("/")
+        if isSupplementaryFile and file.value not in self.pack.fileStore:
+            self.issues.append({"kind": MISSING_FILE, "path": path, "file": file.value})
+
+    def _attrsOf(self, obj) -> List[str]:
+        if type(obj) not in self._attrs:
+            # children shown in the package tree are hidden in the detailed info
+            attrs = getAttrs4detailInfo(obj)
+            childrenAttr = ClassesInfo.changedParentObject(type(obj))
+            if childrenAttr and childrenAttr not in attrs:
+                attrs.append(childrenAttr)
+            self._attrs[type(obj)] = attrs
+        return self._attrs[type(obj)]
+
+    def _typeHint(self, objType: type, attr: str):
+        if (objType, attr) not in self._typeHints:
+            try:
+                self._typeHints[objType, attr] = getAttrTypeHint(objType, attr, delOptional=False)
+            except KeyError:
+                self._typeHints[objType, attr] = None
+        return self._typeHints[objType, attr]
+
+    @staticmethod
+    def _iterItemTypeHint(typeHint):
+        if typeHint is None:
+            return None
+        try:
+            return getIterItemTypeHint(typeHint)
+        except (KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _checkType(obj, typeHint) -> bool:
+        try:
+            return checkType(obj, typeHint)
+        except Exception:
+            # type hint can not be checked, e.g. forward references
+            return True
+
+    @staticmethod
+    def _typeHintName(typeHint) -> str:
+        try:
+            return getTypeHintName(typeHint)
+        except TypeError:
+            return str(typeHint)
+
+
+def validateFile(file: str) -> Dict[str, Any]:
+    """Validate file, used as task for processes of the process pool"""
+    try:
+        # debug output of the editor must not get into the report
+        with contextlib.redirect_stdout(sys.stderr):
+            pack = Package(file)
+            issues = Validator(pack).validate()
+    except Exception as e:
+        return {"file": file, "error": f"{type(e).__name__}: {e}", "objects": 0, "issues": []}
+    return {"file": file, "error": None, "objects": len(pack.objStore), "issues": issues}
+
+
+def validate(files: List[Path], workers: int) -> List[Dict[str, Any]]:
+    return list(mapInProcessPool(validateFile, [file.as_posix() for file in files], workers=workers))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aas_editor.tools.validate", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", type=Path, help="AAS files or directories with AAS files")
+    parser.add_argument("-o", "--output", type=Path, help="file to write the JSON report to, default: stdout")
+    parser.add_argument("--types", nargs="+", default=FILE_TYPES, choices=FILE_TYPES,
+                        help="file types to validate in directories, default: all")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes, default: number of CPUs")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("number of worker processes must be at least 1")
+
+    files = []
+    for path in args.paths:
+        if not path.exists():
+            parser.error(f"{path} does not exist")
+        files.extend(findAasFiles(path.absolute(), args.types))
+
+    start = time.perf_counter()
+    reports = validate(files, args.jobs)
+    duration = time.perf_counter() - start
+
+    summary = {
+        "files": len(reports),
+        "failed": sum(1 for report in reports if report["error"]),
+        "objects": sum(report["objects"] for report in reports),
+        "issues": sum(len(report["issues"]) for report in reports),
+        "seconds": round(duration, 3),
+    }
+    result = {"summary": summary, "files": reports}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=1)
+    else:
+        json.dump(result, sys.stdout, indent=1)
+        print()
+    print(f"{summary['files']} files validated in {duration:.2f} s: {summary['failed']} could not be read, "
+          f"{summary['issues']} issues found", file=sys.stderr)
+    return 1 if summary["failed"] or summary["issues"] else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class FileKey(NamedTuple):
+    """Fingerprint of a file, a cached value is valid only for the same fingerprint"""
+    path: str
+    size: int
+    mtime: int
+    sha256: bytes
+
+
+class FileCache:
+    """
+    On-disk cache of values derived from files, e.g. of parsed packages
+
+    Values are pickled in one entry file per source file. An entry is used only if the
+    source file has still the same size, modification time and content hash.
+    If the cache gets bigger than maxSize, the least recently used entries are removed.
+    """
+    CHUNK_SIZE = 2**20
+    SUFFIX = ".pickle"
+
+    def __init__(self, dir: Union[str, Path], maxSize: int, minFileSize: int = 0):
+        """
+        :param dir: directory of the cache entries
+        :param maxSize: max summary size of the cache entries in bytes
+        :param minFileSize: smaller files are not cached, as reading them is fast anyway
+        """
+        self.dir = Path(dir)
+        self.maxSize = maxSize
+        self.minFileSize = minFileSize
+
+    def key(self, file: Union[str, Path]) -> Optional[FileKey]:
+        """Return fingerprint of the file or None if the file is not cached"""
+        file = Path(file).absolute()
+        stat = file.stat()
+        if stat.st_size < self.minFileSize:
+            return None
+        hash = hashlib.sha256()
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                hash.update(chunk)
+        return FileKey(file.as_posix(), stat.st_size, stat.st_mtime_ns, hash.digest())
+
+    def _entry(self, key: FileKey) -> Path:
+        return self.dir.joinpath(hashlib.sha256(key.path.encode()).hexdigest() + self.SUFFIX)
+
+    def get(self, key: Optional[FileKey]) -> Optional[Any]:
+        """Return cached value for the file fingerprint or None if there is no valid entry"""
+        if key is None:
+            return None
+        entry = self._entry(key)
+        try:
+            with open(entry, "rb") as f:
+                if pickle.load(f) != key:
+                    value = None
+                else:
+                    value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Cache entry {entry} is invalid: {e}")
+            value = None
+
+        if value is None:
+            self._remove(entry)
+        else:
+            # modification time of the entry is used as its last access time for eviction
+            os.utime(entry)
+        return value
+
+    def put(self, key: Optional[FileKey], value: Any):
+        """Store value for the file fingerprint, failures are only logged"""
+        if key is None:
+            return
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            fd, tmpEntry = tempfile.mkstemp(suffix=".tmp", dir=self.dir)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(key, f, pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpEntry, self._entry(key))
+            except BaseException:
+                self._remove(Path(tmpEntry))
+                raise
+            self.evict()
+        except Exception as e:
+            logger.warning(f"{key.path} couldn't be cached: {e}")
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is not bigger than maxSize"""
+        entries = []
+        for entry in self.dir.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        size = sum(entrySize for _, entrySize, _ in entries)
+        for _, entrySize, entry in sorted(entries):
+            if size <= self.maxSize:
+                break
+            self._remove(entry)
+            size -= entrySize
+
+    def clear(self):
+        for entry in self.dir.glob(f"*{self.SUFFIX}"):
+            self._remove(entry)
+
+    @staticmethod
+    def _remove(entry: Path):
+        try:
+            entry.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,182 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import hashlib
+import logging
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# (name, row) of the items from the package item to the edited item
+ItemPath = Tuple[Tuple[str, int], ...]
+
+
+class JournalEntry(NamedTuple):
+    path: ItemPath  # path of the item in the package tree
+    detailPath: Optional[ItemPath]  # path in the detailed info table of the item, if edited there
+    column: int
+    role: int
+    value: Any
+
+
+class JournalHeader(NamedTuple):
+    file: str  # package file
+    stat: Optional[Tuple[int, int]]  # modification time and size of the file the edits are applied to
+
+
+class EditJournal:
+    """
+    Append-only journals of the unsaved edits of packages, used to recover them after a crash
+
+    Each package file has a journal file with a header and the pickled edits since the
+    package was read or saved. Edits are only flushed, not synced, so that recording
+    them is cheap; they survive a crash of the app but not necessarily one of the system.
+    """
+    SUFFIX = ".journal"
+
+    def __init__(self, dir: Union[str, Path]):
+        self.dir = Path(dir)
+        # package file -> fingerprint of the file when it was read or saved
+        self._stats: Dict[Path, Optional[Tuple[int, int]]] = {}
+        self._broken = set()
+
+    def _journalFile(self, file: Path) -> Path:
+        return self.dir.joinpath(hashlib.sha256(file.as_posix().encode()).hexdigest() + self.SUFFIX)
+
+    @staticmethod
+    def _stat(file: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = file.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def start(self, file: Union[str, Path]):
+        """Start a new journal for the package file, e.g. after the package was read"""
+        file = Path(file).absolute()
+        self.discard(file)
+        self._stats[file] = self._stat(file)
+
+    def isStarted(self, file: Union[str, Path]) -> bool:
+        return Path(file).absolute() in self._stats
+
+    def startedFiles(self) -> Set[Path]:
+        return set(self._stats)
+
+    @staticmethod
+    def encode(entry: JournalEntry) -> Optional[bytes]:
+        """Serialize entry, e.g. before the edit links the edited objects with the package"""
+        try:
+            return pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Edit couldn't be journaled: {e}")
+            return None
+
+    def record(self, file: Union[str, Path], entry: Union[JournalEntry, bytes, None]):
+        """Append entry or an encoded entry to the journal of the file"""
+        file = Path(file).absolute()
+        if file not in self._stats or file in self._broken:
+            return
+        data = self.encode(entry) if isinstance(entry, JournalEntry) else entry
+        journalFile = self._journalFile(file)
+        try:
+            if data is None:
+                raise ValueError("entry couldn't be encoded")
+            if not journalFile.exists():
+                self.dir.mkdir(parents=True, exist_ok=True)
+                data = pickle.dumps(JournalHeader(file.as_posix(), self._stats[file]),
+                                    pickle.HIGHEST_PROTOCOL) + data
+            with open(journalFile, "ab") as f:
+                f.write(data)
+        except Exception as e:
+            # later edits would be replayed without this one, so stop journaling
+            logger.warning(f"Edit of {file} couldn't be journaled: {e}")
+            self._broken.add(file)
+
+    def checkpoint(self, file: Union[str, Path]) -> int:
+        """Return position in the journal, e.g. when a snapshot of the package is taken to be saved"""
+        try:
+            return self._journalFile(Path(file).absolute()).stat().st_size
+        except OSError:
+            return 0
+
+    def saved(self, file: Union[str, Path], checkpoint: int, newFile: Union[str, Path] = None):
+        """
+        Drop the edits before the checkpoint, as the package was saved with them
+
+        Edits made while the package was saved are kept in the journal of newFile.
+        """
+        file = Path(file).absolute()
+        newFile = Path(newFile).absolute() if newFile else file
+        journalFile = self._journalFile(file)
+        entries = []
+        if file not in self._broken and checkpoint and journalFile.exists():
+            entries = self._read(journalFile, checkpoint)[1]
+        self.discard(file)
+        self.start(newFile)
+        for entry in entries:
+            self.record(newFile, entry)
+
+    def discard(self, file: Union[str, Path]):
+        """Remove the journal, e.g. after the package was closed without saving"""
+        file = Path(file).absolute()
+        self._stats.pop(file, None)
+        self._broken.discard(file)
+        try:
+            self._journalFile(file).unlink()
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove the journals started here, the ones of other editor instances are kept"""
+        for file in self.startedFiles():
+            self.discard(file)
+
+    def entries(self, file: Union[str, Path]) -> List[JournalEntry]:
+        """Return the journaled edits of the package file, if they were made on its current version"""
+        file = Path(file).absolute()
+        journalFile = self._journalFile(file)
+        if not journalFile.exists():
+            return []
+        header, entries = self._read(journalFile)
+        if header is None or Path(header.file) != file or header.stat != self._stat(file):
+            return []
+        return entries
+
+    def pendingFiles(self) -> List[Path]:
+        """Return package files with journaled edits, e.g. after the app crashed"""
+        files = []
+        for journalFile in self.dir.glob(f"*{self.SUFFIX}"):
+            header, entries = self._read(journalFile)
+            if header is not None and entries:
+                files.append(Path(header.file))
+        return files
+
+    @staticmethod
+    def _read(journalFile: Path, start: int = 0) -> Tuple[Optional[JournalHeader], List[JournalEntry]]:
+        """Read header and the entries after the position start, a truncated last entry is skipped"""
+        header = None
+        entries = []
+        try:
+            with open(journalFile, "rb") as f:
+                header = pickle.load(f)
+                if start:
+                    f.seek(start)
+                while True:
+                    entries.append(pickle.load(f))
+        except EOFError:
+            pass
+        except Exception as e:
+            logger.warning(f"Journal {journalFile} is incomplete: {e}")
+        if not isinstance(header, JournalHeader):
+            return None, []
+        return header, entries
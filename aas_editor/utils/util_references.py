@@ -0,0 +1,145 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from aas.model import AASReference, AssetAdministrationShell, HasSemantics, Identifiable, KeyType, Referable, \
+    ReferenceElement, RelationshipElement
+
+# attributes holding references to other referables and the types having them
+REFERENCE_ATTRS: Tuple[Tuple[str, type], ...] = (
+    ("semantic_id", HasSemantics),
+    ("value", ReferenceElement),
+    ("first", RelationshipElement),
+    ("second", RelationshipElement),
+    ("asset", AssetAdministrationShell),
+    ("submodel", AssetAdministrationShell),
+    ("derived_from", AssetAdministrationShell),
+)
+
+LOCAL_KEY_TYPES = frozenset(keyType for keyType in KeyType if keyType.is_local_key_type)
+
+# identification id of the identifiable followed by the id_shorts of the path to the referable
+TargetPath = Tuple[str, ...]
+
+
+class Usage(NamedTuple):
+    obj: Referable  # referencing referable
+    attr: str  # attribute of obj holding the reference
+    reference: AASReference
+
+
+def iterElements(obj: Referable) -> Iterator[Referable]:
+    """Yield all elements contained in obj recursively"""
+    for namespaceSet in getattr(obj, "namespace_element_sets", ()):
+        for element in namespaceSet:
+            yield element
+            yield from iterElements(element)
+
+
+def referableTarget(obj: Referable) -> Optional[TargetPath]:
+    """Return path of the referable, None if it is not contained in an identifiable"""
+    path = []
+    while not isinstance(obj, Identifiable):
+        if obj is None:
+            return None
+        path.append(obj.id_short)
+        obj = obj.parent
+    path.append(obj.identification.id)
+    return tuple(reversed(path))
+
+
+def referenceTarget(reference: AASReference) -> Optional[TargetPath]:
+    """Return path of the referable the reference points to, None if it has no global key"""
+    keys = reference.key
+    for i in range(len(keys) - 1, -1, -1):
+        # same as keys[i].get_identifier() is not None, without creating the identifier
+        if keys[i].id_type not in LOCAL_KEY_TYPES:
+            return tuple([key.value for key in keys[i:]])
+    return None
+
+
+class ReferenceIndex:
+    """
+    Reverse index of the references between the referables of a package
+
+    Maps the paths of referenced referables to the referables referencing them, so that
+    usages are found without resolving all references. The index is keyed by paths,
+    not objects, so renaming a referable doesn't change it, but usages are found by the
+    new path only. Referencing objects have to be updated after their references changed.
+    """
+
+    def __init__(self, objects: Iterable[Referable] = ()):
+        # target path -> (id of referencing object, attr, id of reference) -> usage
+        self._usages: Dict[TargetPath, Dict[Tuple[int, str, int], Usage]] = {}
+        # id of referencing object -> target paths and usage keys of its references
+        self._targets: Dict[int, List[Tuple[TargetPath, Tuple[int, str, int]]]] = {}
+        # type -> reference attributes of the type
+        self._attrs: Dict[type, Tuple[str, ...]] = {}
+        for obj in objects:
+            self.add(obj)
+
+    def _typeAttrs(self, typ: type) -> Tuple[str, ...]:
+        try:
+            return self._attrs[typ]
+        except KeyError:
+            attrs = tuple(attr for attr, attrType in REFERENCE_ATTRS if issubclass(typ, attrType))
+            self._attrs[typ] = attrs
+            return attrs
+
+    def add(self, obj: Referable):
+        """Index references of obj and of its elements"""
+        self.update(obj)
+        for element in iterElements(obj):
+            self.update(element)
+
+    def remove(self, obj: Referable):
+        """Remove references of obj and of its elements from the index"""
+        self._removeObj(obj)
+        for element in iterElements(obj):
+            self._removeObj(element)
+
+    def update(self, obj: Referable):
+        """Index the references of obj again, e.g. after they were edited; elements of obj are not updated"""
+        self._removeObj(obj)
+        targets = []
+        for attr in self._typeAttrs(type(obj)):
+            value = getattr(obj, attr, None)
+            references = value if isinstance(value, (set, frozenset, list, tuple)) else (value,)
+            for reference in references:
+                if not isinstance(reference, AASReference):
+                    continue
+                target = referenceTarget(reference)
+                if target is None:
+                    continue
+                # an attribute may hold several references, e.g. the submodels of a shell
+                key = (id(obj), attr, id(reference))
+                self._usages.setdefault(target, {})[key] = Usage(obj, attr, reference)
+                targets.append((target, key))
+        if targets:
+            self._targets[id(obj)] = targets
+
+    def _removeObj(self, obj: Referable):
+        for target, key in self._targets.pop(id(obj), ()):
+            usages = self._usages[target]
+            del usages[key]
+            if not usages:
+                del self._usages[target]
+
+    def usages(self, obj: Referable) -> List[Usage]:
+        """Return usages of the referable obj"""
+        target = referableTarget(obj)
+        if target is None:
+            return []
+        return list(self._usages.get(target, {}).values())
+
+    def __len__(self):
+        """Return number of indexed references"""
+        return sum(len(usages) for usages in self._usages.values())
@@ -21,6 +21,7 @@ import typing
 from abc import ABCMeta
 from collections import abc
 from enum import Enum
+from functools import lru_cache
 from typing import Union, Tuple, Iterable
 
 from aas.model import AASReference
@@ -126,7 +127,8 @@ def checkTypeAASRef(aasref, typehint):
         if args:
             if isinstance(args[0], typing.ForwardRef):
                 arg = args[0].__forward_arg__
-                return getTypeName(aasref.type) == arg
+                # forward references may be qualified by the module, e.g. 'aas.Asset'
+                return getTypeName(aasref.type) == arg or aasref.type.__name__ == arg.rsplit(".", 1)[-1]
             try:
                 return issubclass(aasref.type, args)
             except TypeError as e:
@@ -325,11 +327,21 @@ def isSimpleIterable(obj):
     return isSimpleIterableType(type(obj))
 
 
-def isIterableType(objType):
+@lru_cache(maxsize=None)
+def _isIterableType(objType):
     return issubtype(objType, Iterable) \
            and not issubtype(objType, (str, bytes, bytearray, util_classes.DictItem))
 
 
+def isIterableType(objType):
+    # called for every item of the trees, so the result is cached per type
+    try:
+        return _isIterableType(objType)
+    except TypeError:
+        # unhashable typehint
+        return _isIterableType.__wrapped__(objType)
+
+
 def isIterable(obj):
     return isIterableType(type(obj))
 
@@ -0,0 +1,185 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import io
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Union, Optional, IO, Dict, Iterable, Tuple
+
+import pyecma376_2
+
+CHUNK_SIZE = 2**20
+MASK_ENCRYPTED = 0x01
+MASK_USE_DATA_DESCRIPTOR = 0x08
+
+
+def dataOffset(archive: IO[bytes], info: zipfile.ZipInfo) -> int:
+    """Return offset of the (compressed) data of the zip entry in the archive file"""
+    archive.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, archive.read(zipfile.sizeFileHeader))
+    if header[zipfile._FH_SIGNATURE] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad magic number for file header of {info.filename}")
+    return info.header_offset + zipfile.sizeFileHeader + \
+           header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH]
+
+
+def isRawCopyable(info: zipfile.ZipInfo) -> bool:
+    return not info.flag_bits & MASK_ENCRYPTED
+
+
+class CompressionPolicy:
+    """Chooses the compression of zip entries by their content type"""
+
+    def __init__(self, storedTypes: Iterable[str] = (), level: Optional[int] = None):
+        """
+        :param storedTypes: content types of already compressed data, which is stored uncompressed;
+                            types ending with "/" stand for all their subtypes, e.g. "video/"
+        :param level: deflate level of the other entries, from 1 (fastest) to 9 (smallest)
+        """
+        self.storedTypes = frozenset(typ.lower() for typ in storedTypes)
+        self.level = level
+
+    def compression(self, contentType: str) -> Tuple[int, Optional[int]]:
+        """Return compression type and level for data of the content type"""
+        contentType = contentType.split(";")[0].strip().lower()
+        if contentType in self.storedTypes or f"{contentType.split('/')[0]}/" in self.storedTypes:
+            return zipfile.ZIP_STORED, None
+        return zipfile.ZIP_DEFLATED, self.level
+
+
+class RawCopyZipPackageWriter(pyecma376_2.ZipPackageWriter):
+    """
+    Zip package writer, which copies unchanged parts of a source archive without recompressing them
+
+    Parts are buffered while written. If a part has the same name, size and CRC as an
+    entry of the source archive, the compressed data of the entry is copied, else the
+    part is compressed as chosen by the compression policy for its content type.
+    """
+
+    def __init__(self, file: Union[str, Path, IO], sourceArchive: Union[str, Path, None] = None,
+                 policy: Optional[CompressionPolicy] = None):
+        super(RawCopyZipPackageWriter, self).__init__(file)
+        self.sourceArchive = Path(sourceArchive) if sourceArchive else None
+        self.policy = policy if policy else CompressionPolicy()
+        self._sourceInfos: Dict[str, zipfile.ZipInfo] = {}
+        if self.sourceArchive and zipfile.is_zipfile(self.sourceArchive):
+            with zipfile.ZipFile(self.sourceArchive) as zf:
+                self._sourceInfos = {info.filename: info for info in zf.infolist()}
+
+    def create_item(self, name: str, content_type: str) -> "ZipPartWriter":
+        return ZipPartWriter(self, name[1:], content_type)
+
+    def openCompressed(self, name: str, contentType: str, force_zip64: bool = False) -> IO[bytes]:
+        """Open zip entry for writing, compressed as chosen by the policy for the content type"""
+        defaultCompression = self.compression, self.compresslevel
+        # new entries get the compression of the zip file
+        self.compression, self.compresslevel = self.policy.compression(contentType)
+        try:
+            return self.open(name, "w", force_zip64=force_zip64)
+        finally:
+            self.compression, self.compresslevel = defaultCompression
+
+    def sourceInfo(self, name: str) -> Optional[zipfile.ZipInfo]:
+        return self._sourceInfos.get(name)
+
+    def copyRaw(self, name: str, srcArchive: Union[str, Path], srcInfo: zipfile.ZipInfo):
+        """Write zip entry with the compressed data of the entry srcInfo of srcArchive"""
+        if not isRawCopyable(srcInfo):
+            raise ValueError(f"Zip entry {srcInfo.filename} can not be copied")
+        zinfo = zipfile.ZipInfo(name, srcInfo.date_time)
+        zinfo.compress_type = srcInfo.compress_type
+        zinfo.flag_bits = srcInfo.flag_bits & ~MASK_USE_DATA_DESCRIPTOR
+        zinfo.create_system = srcInfo.create_system
+        zinfo.external_attr = srcInfo.external_attr
+        zinfo.CRC = srcInfo.CRC
+        zinfo.compress_size = srcInfo.compress_size
+        zinfo.file_size = srcInfo.file_size
+
+        with open(srcArchive, "rb") as src, self._lock:
+            src.seek(dataOffset(src, srcInfo))
+            if self._writing:
+                raise ValueError("Can't write to the ZIP file while there is another write handle open on it")
+            self.fp.seek(self.start_dir)
+            zinfo.header_offset = self.fp.tell()
+            self._writecheck(zinfo)
+            self._didModify = True
+            self.fp.write(zinfo.FileHeader())
+            remaining = zinfo.compress_size
+            while remaining:
+                chunk = src.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise zipfile.BadZipFile(f"Truncated data of {srcInfo.filename} in {srcArchive}")
+                self.fp.write(chunk)
+                remaining -= len(chunk)
+            self.start_dir = self.fp.tell()
+            self.filelist.append(zinfo)
+            self.NameToInfo[zinfo.filename] = zinfo
+
+
+class ZipPartWriter(io.RawIOBase):
+    """Writable part of a RawCopyZipPackageWriter, the part is written to the archive on close"""
+    SPOOL_SIZE = 32 * 2**20  # parts bigger than this are buffered in a temporary file
+
+    def __init__(self, writer: RawCopyZipPackageWriter, name: str,
+                 contentType: str = "application/octet-stream"):
+        super(ZipPartWriter, self).__init__()
+        self._writer = writer
+        self.name = name
+        self.contentType = contentType
+        self._buffer = tempfile.SpooledTemporaryFile(self.SPOOL_SIZE)
+        self._crc = 0
+        self._size = 0
+        self._copied = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self._copied:
+            raise ValueError(f"Part {self.name} was already copied from another archive")
+        self._buffer.write(b)
+        self._crc = zlib.crc32(b, self._crc)
+        size = memoryview(b).nbytes
+        self._size += size
+        return size
+
+    def canCopyRaw(self, srcInfo: zipfile.ZipInfo) -> bool:
+        """Return True if the zip entry can be copied and is compressed as the policy requires"""
+        compressType, _ = self._writer.policy.compression(self.contentType)
+        return isRawCopyable(srcInfo) and srcInfo.compress_type == compressType
+
+    def copyRaw(self, srcArchive: Union[str, Path], srcInfo: zipfile.ZipInfo):
+        """Use the compressed data of the zip entry srcInfo of srcArchive as content of the part"""
+        if self._size or self._copied:
+            raise ValueError(f"Part {self.name} was already written")
+        self._writer.copyRaw(self.name, srcArchive, srcInfo)
+        self._copied = True
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if not self._copied:
+                srcInfo = self._writer.sourceInfo(self.name)
+                if srcInfo is not None and self.canCopyRaw(srcInfo) \
+                        and (srcInfo.CRC, srcInfo.file_size) == (self._crc, self._size):
+                    self._writer.copyRaw(self.name, self._writer.sourceArchive, srcInfo)
+                else:
+                    self._buffer.seek(0)
+                    zip64 = self._size * 1.05 > zipfile.ZIP64_LIMIT
+                    with self._writer.openCompressed(self.name, self.contentType, force_zip64=zip64) as f:
+                        shutil.copyfileobj(self._buffer, f, CHUNK_SIZE)
+        finally:
+            self._buffer.close()
+            super(ZipPartWriter, self).close()
@@ -505,7 +505,8 @@ class Tab(QWidget):
                 if self.packItem.data(IS_URL_MEDIA_ROLE):
                     self.mediaWidget.load(QUrl(mediaContent.value))
                 else:
-                    self.mediaWidget.setContent(mediaContent.value, mediaContent.mime_type)
+                    # web view needs its own copy of the content
+                    self.mediaWidget.setContent(bytes(mediaContent.value), mediaContent.mime_type)
             except Exception as e:
                 print(e)
                 self.mediaWidget.setContent(b"Error occurred while loading media")
@@ -16,27 +16,45 @@
 #
 #  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, Future
 from pathlib import Path
+from typing import Iterable, List
 
-from PyQt5.QtCore import Qt, QModelIndex, QSettings
+from PyQt5.QtCore import Qt, QModelIndex, QSettings, QThreadPool, pyqtSignal, QEventLoop, \
+    QFileSystemWatcher, QTimer, QAbstractItemModel, QPersistentModelIndex
 from PyQt5.QtGui import QDropEvent, QDragEnterEvent
-from PyQt5.QtWidgets import QAction, QMessageBox, QFileDialog
-from aas.model import AssetAdministrationShell
+from PyQt5.QtWidgets import QAction, QMessageBox, QFileDialog, QApplication, QInputDialog, QDialog
+from aas.model import AssetAdministrationShell, Referable
 
+from aas_editor import dialogs
+from aas_editor.models import ID_COMPLETIONS
 from aas_editor.package import Package, StoredFile
 from aas_editor.settings import FILTER_AAS_FILES, CLASSES_INFO, PACKVIEW_ATTRS_INFO,\
     FILE_TYPE_FILTERS
 from aas_editor.settings.app_settings import NAME_ROLE, OBJECT_ROLE, SC_SAVE_ALL, SC_OPEN, \
     PACKAGE_ROLE, MAX_RECENT_FILES, ACPLT, APPLICATION_NAME, OPEN_ICON, SAVE_ICON, SAVE_ALL_ICON, \
     OPENED_PACKS_ROLE, OPENED_FILES_ROLE, ADD_ITEM_ROLE, OPEN_DRAG_ICON, NEW_PACK_ICON, TYPE_ROLE, \
-    VIEW_ICON, NOT_GIVEN, CLEAR_ROW_ROLE, FILE_DIALOG_OPTIONS
+    VIEW_ICON, NOT_GIVEN, CLEAR_ROW_ROLE, FILE_DIALOG_OPTIONS, UNDO_ROLE
+from aas_editor.tools.merge import mergePackages
 from aas_editor.utils.util_classes import ClassesInfo
+from aas_editor.utils.util_journal import JournalEntry
 from aas_editor.widgets import TreeView
+from aas_editor.workers import PackageLoader, PackageSaver, readPackage
 
 
 class PackTreeView(TreeView):
     EMPTY_VIEW_MSG = "Drop AAS files here"
     EMPTY_VIEW_ICON = OPEN_DRAG_ICON
+    FILE_CHANGE_DELAY = 500  # msec
+
+    loadingStarted = pyqtSignal(str)
+    loadingProgress = pyqtSignal(str, int, int, int)  # file, read bytes, file size, parsed objects
+    loadingFinished = pyqtSignal(str)
+    _packRestored = pyqtSignal(str, Future)
+    savingStarted = pyqtSignal(str)
+    savingFinished = pyqtSignal(str)
 
     def __init__(self, parent=None):
         super(PackTreeView, self).__init__(parent,
@@ -44,9 +62,32 @@ class PackTreeView(TreeView):
                                            emptyViewIcon=self.EMPTY_VIEW_ICON)
         PackTreeView.__instance = self
         self.recentFilesSeparator = None
+        self.packLoaders = {}
+        self.packSavers = {}
+        self.pendingSaves = {}
+        # packages to be closed after they were saved
+        self.packsToClose = set()
+        # target file -> package file and edit journal position when the saved snapshot was taken
+        self.saveCheckpoints = {}
+        self.packReloaders = {}
+        # size and modification time of the opened files as they were read or written by the editor
+        self.fileStats = {}
+        self.fileWatcher = QFileSystemWatcher(self)
+        self.fileWatcher.fileChanged.connect(self._onFileChanged)
+        # external tools may write a file in several steps, so changes are handled with a delay
+        self._changedFiles = set()
+        self._fileChangeTimer = QTimer(self, singleShot=True, interval=self.FILE_CHANGE_DELAY,
+                                       timeout=self._onFilesChanged)
+        self._packRestored.connect(self._onPackRestored)
         self.setAcceptDrops(True)
         self.setExpandsOnDoubleClick(False)
 
+    def setModelWithProxy(self, model: QAbstractItemModel) -> None:
+        super(PackTreeView, self).setModelWithProxy(model)
+        # opened packages are the top level rows
+        model.rowsInserted.connect(lambda parent, first, last: parent.isValid() or self._onPacksOpened(first, last))
+        model.rowsRemoved.connect(lambda parent, first, last: parent.isValid() or self.onPacksChanged())
+
     # noinspection PyArgumentList
     def initActions(self):
         super(PackTreeView, self).initActions()
@@ -97,6 +138,21 @@ class PackTreeView(TreeView):
                                   triggered=self.saveAll,
                                   enabled=True)
 
+        self.compareAct = QAction("Compare with...", self,
+                                  statusTip="Show changes between current file and another opened file",
+                                  triggered=lambda: self.compareWithDialog(),
+                                  enabled=False)
+
+        self.findUsagesAct = QAction("Find usages", self,
+                                     statusTip="Show elements referencing the current element",
+                                     triggered=lambda: self.findUsagesWithDialog(),
+                                     enabled=False)
+
+        self.mergeAct = QAction("Merge opened files...", self,
+                                statusTip="Merge all opened files into a new file",
+                                triggered=lambda: self.mergeWithDialog(),
+                                enabled=False)
+
         self.closeAct = QAction("Close AAS file", self,
                                 statusTip="Close current file",
                                 triggered=self.closeFileWithDialog,
@@ -141,6 +197,9 @@ class PackTreeView(TreeView):
             for pack in packs:
                 CLASSES_INFO[AssetAdministrationShell][PACKVIEW_ATTRS_INFO] = {"asset": {}, "submodel": {}}
                 self.sourceModel().update(pack)
+                # attribute rows to hide must exist
+                if self.sourceModel().canFetchMore(pack):
+                    self.sourceModel().fetchMore(pack)
 
             rowsToHide = []
             for attr in ("submodels", "assets", "concept_descriptions", "others"):
@@ -160,6 +219,9 @@ class PackTreeView(TreeView):
         self.attrsMenu.addAction(self.saveAct)
         self.attrsMenu.addAction(self.saveAsAct)
         self.attrsMenu.addAction(self.saveAllAct)
+        self.attrsMenu.addAction(self.compareAct)
+        self.attrsMenu.addAction(self.findUsagesAct)
+        self.attrsMenu.addAction(self.mergeAct)
         self.attrsMenu.addAction(self.closeAct)
         self.attrsMenu.addAction(self.closeAllAct)
 
@@ -187,6 +249,9 @@ class PackTreeView(TreeView):
         self.saveAct.setToolTip(f"Save {index.data(PACKAGE_ROLE)}")
         self.saveAsAct.setEnabled(self.isSaveOk())
         self.saveAllAct.setEnabled(self.isSaveAllOk())
+        self.compareAct.setEnabled(self.isCompareOk())
+        self.findUsagesAct.setEnabled(isinstance(index.data(OBJECT_ROLE), Referable))
+        self.mergeAct.setEnabled(len(self.model().data(QModelIndex(), OPENED_PACKS_ROLE)) > 1)
         self.closeAct.setEnabled(self.isCloseOk())
         self.closeAllAct.setEnabled(self.isCloseAllOk())
 
@@ -220,6 +285,10 @@ class PackTreeView(TreeView):
         pack = self.currentIndex().data(PACKAGE_ROLE)
         return True if pack else False
 
+    def isCompareOk(self) -> bool:
+        pack = self.currentIndex().data(PACKAGE_ROLE)
+        return bool(pack) and len(self.model().data(QModelIndex(), OPENED_PACKS_ROLE)) > 1
+
     def isCloseOk(self) -> bool:
         pack = self.currentIndex().data(PACKAGE_ROLE)
         return True if pack else False
@@ -277,7 +346,7 @@ class PackTreeView(TreeView):
                                                options=FILE_DIALOG_OPTIONS)[0]
             if file:
                 pack = Package()
-                saved = self.savePack(pack, file)
+                saved = self.writePack(pack, file)
                 if saved:
                     self.model().setData(QModelIndex(), pack, ADD_ITEM_ROLE)
             else:
@@ -292,7 +361,7 @@ class PackTreeView(TreeView):
                                                filter=FILTER_AAS_FILES,
                                                options=FILE_DIALOG_OPTIONS)[0]
             if file:
-                opened = self.openPack(file)
+                opened = self.openPackInBackground(file)
             else:
                 # cancel pressed
                 return
@@ -327,18 +396,276 @@ class PackTreeView(TreeView):
                 return True
         return False
 
-    def savePack(self, pack: Package = None, file: str = None) -> bool:
-        pack = self.currentIndex().data(PACKAGE_ROLE) if pack is None else pack
+    def isOpened(self, file: str) -> bool:
+        openedPacks = self.model().data(QModelIndex(), OPENED_FILES_ROLE)
+        return Path(file).absolute() in openedPacks or Path(file).absolute() in self.packLoaders
+
+    def openPackInBackground(self, file: str) -> bool:
+        """Read package in a worker thread, add it to the model when it is read"""
+        if self.isOpened(file):
+            QMessageBox.critical(self, "Error", f"Package {file} is already opened")
+            return False
+
+        loader = PackageLoader(file)
+        loader.signals.progress.connect(self.loadingProgress)
+        loader.signals.finished.connect(self._onPackLoaded)
+        loader.signals.cancelled.connect(self._onPackLoadingEnded)
+        loader.signals.error.connect(self._onPackLoadingFailed)
+        self.packLoaders[Path(file).absolute()] = loader
+        self.loadingStarted.emit(file)
+        QThreadPool.globalInstance().start(loader)
+        return True
+
+    def restorePacks(self, files: Iterable[str]):
+        """Read packages concurrently in separate processes
+
+        The parsers are pure python, so threads would not run in parallel.
+        Every package is added to the model as soon as it is read.
+        """
+        files = [str(file) for file in files if not self.isOpened(file)]
+        if not files:
+            return
+
+        executor = ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1),
+                                       mp_context=multiprocessing.get_context("spawn"))
+        for file in files:
+            future = executor.submit(readPackage, file)
+            self.packLoaders[Path(file).absolute()] = future
+            self.loadingStarted.emit(file)
+            # callback is called in a thread of the executor, signal passes the result to the gui thread
+            future.add_done_callback(lambda f, file=file: self._packRestored.emit(file, f))
+        executor.shutdown(wait=False)
+
+    def _onPackRestored(self, file: str, future: Future):
+        if future.cancelled():
+            self._onPackLoadingEnded(file)
+        elif future.exception() is not None:
+            self._onPackLoadingFailed(file, str(future.exception()))
+        elif getattr(future, "cancelRequested", False):
+            self._onPackLoadingEnded(file)
+        else:
+            self._onPackLoaded(file, future.result())
+            self.model().setData(QModelIndex(), [], UNDO_ROLE)
+
+    def isLoading(self) -> bool:
+        return bool(self.packLoaders)
+
+    def cancelLoading(self):
+        for loader in self.packLoaders.values():
+            if isinstance(loader, Future):
+                # running processes can not be stopped, their results are dropped
+                loader.cancelRequested = True
+            loader.cancel()
+
+    def _onPackLoaded(self, file: str, pack: Package):
+        self._onPackLoadingEnded(file)
+        openedPacks = self.model().data(QModelIndex(), OPENED_FILES_ROLE)
+        if pack.file in openedPacks:
+            QMessageBox.critical(self, "Error", f"Package {file} is already opened")
+        else:
+            self.updateRecentFiles(pack.file.as_posix())
+            self.model().setData(QModelIndex(), pack, ADD_ITEM_ROLE)
+
+    def _onPackLoadingFailed(self, file: str, msg: str):
+        self._onPackLoadingEnded(file)
+        self.removeFromRecentFiles(file)
+        QMessageBox.critical(self, "Error", f"Package {file} couldn't be opened: {msg}")
+
+    def _onPackLoadingEnded(self, file: str):
+        self.packLoaders.pop(Path(file).absolute(), None)
+        self.loadingFinished.emit(file)
+
+    def writePack(self, pack: Package, file: str) -> bool:
+        """Write package in the gui thread, used for new packages which are added after saving"""
         try:
             pack.write(file)
             self.updateRecentFiles(pack.file.absolute().as_posix())
             return True
         except (TypeError, ValueError) as e:
             QMessageBox.critical(self, "Error", f"Package couldn't be saved: {file}: {e}")
-        except AttributeError as e:
-            QMessageBox.critical(self, "Error", f"No chosen package to save: {e}")
         return False
 
+    def savePack(self, pack: Package = None, file: str = None) -> bool:
+        """Write package in a worker thread, errors are reported when writing is finished
+
+        :return: True if writing was started
+        """
+        pack = self.currentIndex().data(PACKAGE_ROLE) if pack is None else pack
+        if pack is None:
+            QMessageBox.critical(self, "Error", "No chosen package to save")
+            return False
+
+        target = Path(file if file else pack.file).absolute()
+        if target.suffix.lower() not in Package.FILE_TYPES:
+            QMessageBox.critical(self, "Error",
+                                 f"Package couldn't be saved: {target}: Wrong file type: {target.suffix}")
+            return False
+        if target in self.packSavers:
+            # the running saver writes an older snapshot, so write again when it is finished
+            self.pendingSaves[target] = pack
+            return True
+
+        try:
+            saver = PackageSaver(pack, target.as_posix())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Package couldn't be saved: {target}: {e}")
+            return False
+        self.saveCheckpoints[target] = (pack.file, self.sourceModel().journal.checkpoint(pack.file))
+        saver.signals.finished.connect(self._onPackSaved)
+        saver.signals.error.connect(self._onPackSavingFailed)
+        self.packSavers[target] = saver
+        self.savingStarted.emit(target.as_posix())
+        QThreadPool.globalInstance().start(saver)
+        return True
+
+    def isSaving(self) -> bool:
+        return bool(self.packSavers)
+
+    def waitForSaving(self):
+        """Process events until all packages are written, e.g. before the app is closed"""
+        while self.isSaving():
+            QApplication.processEvents(QEventLoop.WaitForMoreEvents)
+
+    def _onPackSaved(self, pack: Package, file: str, tmpFile: str):
+        # errors must not escape the slot, else the saver would never be removed
+        try:
+            packFile, checkpoint = self.saveCheckpoints.pop(Path(file).absolute())
+            pack.onSnapshotWritten(tmpFile, file)
+            if pack in self.model().data(QModelIndex(), OPENED_PACKS_ROLE):
+                # edits made while saving are not in the written file
+                self.sourceModel().journal.saved(packFile, checkpoint, pack.file)
+            self.updateWatchedFiles()
+            self._updateFileStat(pack.file)
+            self.updateRecentFiles(file)
+        except Exception as e:
+            self._onPackSavingFailed(pack, file, str(e))
+            return
+        self._onPackSavingEnded(file)
+        # a pending save of newer changes may have been started
+        if pack in self.packsToClose and Path(file).absolute() not in self.packSavers:
+            self.packsToClose.discard(pack)
+            self.closePack(pack)
+
+    def _onPackSavingFailed(self, pack: Package, file: str, msg: str):
+        self.saveCheckpoints.pop(Path(file).absolute(), None)
+        # keep the package opened, so that the changes are not lost
+        self.packsToClose.discard(pack)
+        QMessageBox.critical(self, "Error", f"Package couldn't be saved: {file}: {msg}")
+        self._onPackSavingEnded(file)
+
+    def _onPackSavingEnded(self, file: str):
+        target = Path(file).absolute()
+        self.packSavers.pop(target, None)
+        self.savingFinished.emit(file)
+        if target in self.pendingSaves:
+            self.savePack(self.pendingSaves.pop(target), file)
+
+    def onPacksChanged(self):
+        """Called if a package was opened or closed"""
+        ID_COMPLETIONS.setPackages(self.model().data(QModelIndex(), OPENED_PACKS_ROLE))
+        self.updateWatchedFiles()
+        # unsaved edits of closed packages are dropped
+        journal = self.sourceModel().journal
+        for file in journal.startedFiles() - self.model().data(QModelIndex(), OPENED_FILES_ROLE):
+            journal.discard(file)
+
+    def _onPacksOpened(self, first: int, last: int):
+        self.onPacksChanged()
+        journal = self.sourceModel().journal
+        for row in range(first, last + 1):
+            packIndex = self.sourceModel().index(row, 0)
+            file = packIndex.data(PACKAGE_ROLE).file
+            entries = journal.entries(file)
+            journal.start(file)
+            if entries:
+                # don't change the model while it notifies about the inserted rows
+                QTimer.singleShot(0, lambda index=QPersistentModelIndex(packIndex), entries=entries:
+                                  self.recoverEdits(QModelIndex(index), entries))
+
+    def recoverEdits(self, packIndex: QModelIndex, entries: List[JournalEntry]):
+        """Offer to replay journaled edits, which were not saved before the editor was closed"""
+        if not packIndex.isValid():
+            return
+        pack: Package = packIndex.data(PACKAGE_ROLE)
+        res = QMessageBox.question(self, "Recover changes",
+                                   f"{len(entries)} changes of {pack.file} were not saved "
+                                   f"when the editor was closed last time. Recover them?")
+        if res == QMessageBox.Yes:
+            applied = self.sourceModel().replayEdits(packIndex, entries)
+            if applied < len(entries):
+                QMessageBox.warning(self, "Recover changes",
+                                    f"Only {applied} of {len(entries)} changes of {pack.file} "
+                                    f"could be recovered")
+
+    def updateWatchedFiles(self):
+        """Watch the files of all opened packages for changes by other programs"""
+        files = self.model().data(QModelIndex(), OPENED_FILES_ROLE)
+        for file in set(self.fileStats) - files:
+            self.fileWatcher.removePath(file.as_posix())
+            del self.fileStats[file]
+        for file in files - set(self.fileStats):
+            self._updateFileStat(file)
+            if file.exists():
+                self.fileWatcher.addPath(file.as_posix())
+
+    def _updateFileStat(self, file: Path):
+        try:
+            stat = file.stat()
+            self.fileStats[file] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            self.fileStats[file] = None
+
+    def _onFileChanged(self, file: str):
+        self._changedFiles.add(Path(file))
+        self._fileChangeTimer.start()
+
+    def _onFilesChanged(self):
+        changedFiles, self._changedFiles = self._changedFiles, set()
+        for file in changedFiles:
+            if file not in self.fileStats or not file.exists():
+                continue
+            # files are replaced on writing, so they have to be watched again
+            if file.as_posix() not in self.fileWatcher.files():
+                self.fileWatcher.addPath(file.as_posix())
+            if file in self.packSavers or file in self.packReloaders:
+                continue
+            stat = file.stat()
+            if self.fileStats[file] == (stat.st_mtime_ns, stat.st_size):
+                # written by the editor itself
+                continue
+            self._updateFileStat(file)
+            res = QMessageBox.question(self, "File changed",
+                                       f"{file} was changed by another program. Reload it?\n"
+                                       f"Unsaved changes of the changed elements will be lost.")
+            if res == QMessageBox.Yes:
+                self.reloadPack(file)
+
+    def reloadPack(self, file: Path):
+        """Read package file in a worker thread and take over only the changed identifiables"""
+        loader = PackageLoader(file.as_posix())
+        loader.signals.finished.connect(self._onPackReloaded)
+        loader.signals.error.connect(self._onPackReloadingFailed)
+        loader.signals.cancelled.connect(lambda file: self.packReloaders.pop(Path(file), None))
+        self.packReloaders[file] = loader
+        QThreadPool.globalInstance().start(loader)
+
+    def _onPackReloaded(self, file: str, newPack: Package):
+        self.packReloaders.pop(Path(file), None)
+        for pack in self.model().data(QModelIndex(), OPENED_PACKS_ROLE):
+            if pack.file == newPack.file:
+                packIndex, = self.sourceModel().match(QModelIndex(), OBJECT_ROLE, pack, hits=1)
+                self.sourceModel().reloadPack(packIndex, newPack)
+                # journaled edits can't be replayed onto the changed file
+                self.sourceModel().journal.start(pack.file)
+                # undo history refers to the replaced objects
+                self.model().setData(QModelIndex(), [], UNDO_ROLE)
+                self._updateFileStat(pack.file)
+                break
+
+    def _onPackReloadingFailed(self, file: str, msg: str):
+        self.packReloaders.pop(Path(file), None)
+        QMessageBox.critical(self, "Error", f"Package {file} couldn't be reloaded: {msg}")
+
     def savePackAsWithDialog(self, pack: Package = None) -> bool:
         pack = self.currentIndex().data(PACKAGE_ROLE) if pack is None else pack
         saved = False
@@ -358,9 +685,79 @@ class PackTreeView(TreeView):
                     return
 
     def saveAll(self):
+        """Write all packages concurrently in worker threads"""
         for pack in self.model().data(QModelIndex(), OPENED_PACKS_ROLE):
             self.savePack(pack)
 
+    def compareWithDialog(self, pack: Package = None):
+        pack = self.currentIndex().data(PACKAGE_ROLE) if pack is None else pack
+        if pack is None:
+            QMessageBox.critical(self, "Error", "No chosen package to compare")
+            return
+        otherPacks = {str(p.file): p for p in self.model().data(QModelIndex(), OPENED_PACKS_ROLE)
+                      if p is not pack}
+        if not otherPacks:
+            QMessageBox.critical(self, "Error", "No other opened package to compare with")
+            return
+        file, ok = QInputDialog.getItem(self, "Compare with", f"Show changes from {pack} to:",
+                                        sorted(otherPacks), editable=False)
+        if not ok:
+            return
+        try:
+            dialog = dialogs.DiffDialog(pack, otherPacks[file], self)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Packages couldn't be compared: {e}")
+            return
+        dialog.exec()
+
+    def findUsagesWithDialog(self):
+        obj = self.currentIndex().data(OBJECT_ROLE)
+        pack: Package = self.currentIndex().data(PACKAGE_ROLE)
+        if not isinstance(obj, Referable) or pack is None:
+            QMessageBox.critical(self, "Error", "No chosen element to find usages of")
+            return
+        dialog = dialogs.UsagesDialog(obj, pack.referenceIndex.usages(obj), self)
+        if dialog.exec() == QDialog.Accepted and dialog.chosenUsage():
+            try:
+                index, = self.model().match(QModelIndex(), OBJECT_ROLE, dialog.chosenUsage().obj, hits=1)
+            except ValueError:
+                QMessageBox.critical(self, "Not found error",
+                                     f"The referencing element is not shown in the tree: "
+                                     f"{dialog.chosenUsage().obj}")
+                return
+            self.setCurrentIndex(index)
+            self.scrollTo(index)
+
+    def mergeWithDialog(self):
+        packs = sorted(self.model().data(QModelIndex(), OPENED_PACKS_ROLE), key=repr)
+        file = QFileDialog.getSaveFileName(self, "Save merged AAS file", "merged_aas_file.aasx",
+                                           filter=FILTER_AAS_FILES,
+                                           initialFilter=self.defNewFileTypeFilter,
+                                           options=FILE_DIALOG_OPTIONS)[0]
+        if not file:
+            # cancel pressed
+            return
+        if self.isOpened(file):
+            QMessageBox.critical(self, "Error", f"Package {file} is opened, choose another file")
+            return
+        try:
+            pack, conflicts = mergePackages(packs)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Packages couldn't be merged: {e}")
+            return
+
+        if conflicts:
+            dialog = QMessageBox(QMessageBox.Warning, "Merge conflicts",
+                                 f"{len(conflicts)} identifiables differ between the files, "
+                                 f"the version of the first file is used. Save the merged file?",
+                                 standardButtons=QMessageBox.Save | QMessageBox.Cancel)
+            dialog.setDetailedText("\n".join(f"{conflict.id}: {', '.join(conflict.files)}"
+                                              for conflict in conflicts))
+            if dialog.exec() != QMessageBox.Save:
+                return
+        if self.writePack(pack, file):
+            self.model().setData(QModelIndex(), pack, ADD_ITEM_ROLE)
+
     def closeFileWithDialog(self):
         pack = self.currentIndex().data(PACKAGE_ROLE)
         try:
@@ -379,8 +776,7 @@ class PackTreeView(TreeView):
                 dialog.button(QMessageBox.Save).setText("&Save&Close")
                 res = dialog.exec()
                 if res == QMessageBox.Save:
-                    self.savePack()
-                    self.closeFile(packItem)
+                    self.savePackAndClose(pack)
                 elif res == QMessageBox.Discard:
                     self.closeFile(packItem)
             except AttributeError as e:
@@ -397,21 +793,32 @@ class PackTreeView(TreeView):
         res = dialog.exec()
         if res == QMessageBox.Save:
             for pack in self.model().data(QModelIndex(), OPENED_PACKS_ROLE):
-                self.savePack(pack)
-                packItem, = self.model().match(QModelIndex(), OBJECT_ROLE, pack, hits=1)
-                self.closeFile(packItem)
+                self.savePackAndClose(pack)
         elif res == QMessageBox.Discard:
             for pack in self.model().data(QModelIndex(), OPENED_PACKS_ROLE):
                 packItem, = self.model().match(QModelIndex(), OBJECT_ROLE, pack, hits=1)
                 self.closeFile(packItem)
 
+    def savePackAndClose(self, pack: Package):
+        """Save package and close it when it was written, it stays opened if saving fails"""
+        if self.savePack(pack):
+            self.packsToClose.add(pack)
+
+    def closePack(self, pack: Package):
+        try:
+            packItem, = self.model().match(QModelIndex(), OBJECT_ROLE, pack, hits=1)
+        except ValueError:
+            # already closed
+            return
+        self.closeFile(packItem)
+
     def closeFile(self, packItem: QModelIndex):
         self.model().setData(packItem, NOT_GIVEN, CLEAR_ROW_ROLE)
 
     def openRecentSlot(self):
         action = self.sender()
         if action:
-            self.openPack(action.data())
+            self.openPackInBackground(action.data())
 
     def updateRecentFiles(self, file: str):
         self.removeFromRecentFiles(file)
@@ -464,4 +871,4 @@ class PackTreeView(TreeView):
     def dropEvent(self, e: QDropEvent) -> None:
         for url in e.mimeData().urls():
             file = str(url.toLocalFile())
-            self.openPack(file)
+            self.openPackInBackground(file)
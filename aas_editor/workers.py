@@ -0,0 +1,106 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import time
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+import aas_editor.settings  # must be imported before aas_editor.package, else circular import
+from aas_editor.package import Package, ReadingCancelled
+
+
+def readPackage(file: str) -> Package:
+    """Read package, used as task for processes of a process pool"""
+    return Package(file)
+
+
+class PackageLoaderSignals(QObject):
+    """Signals of PackageLoader, QRunnable itself can not emit signals"""
+    progress = pyqtSignal(str, int, int, int)  # file, read bytes, file size, parsed objects
+    finished = pyqtSignal(str, object)  # file, package
+    cancelled = pyqtSignal(str)  # file
+    error = pyqtSignal(str, str)  # file, error message
+
+
+class PackageLoader(QRunnable):
+    """Reads a Package in a worker thread of a QThreadPool
+
+    The finished package is only handed over via the finished signal, so that
+    the GUI thread is the only one touching the models.
+    """
+    PROGRESS_INTERVAL = 0.1  # sec between two progress signals
+
+    def __init__(self, file: str):
+        super(PackageLoader, self).__init__()
+        self.file = file
+        self.signals = PackageLoaderSignals()
+        self._cancelled = False
+        self._lastProgress = 0
+        self._lastBytesRead = 0
+
+    def cancel(self):
+        self._cancelled = True
+
+    def isCancelled(self) -> bool:
+        return self._cancelled
+
+    def _onReadProgress(self, bytesRead: int, size: int, objsParsed: int):
+        if self._cancelled:
+            raise ReadingCancelled(self.file)
+        now = time.monotonic()
+        readToEnd = bytesRead == size and self._lastBytesRead != size
+        if now - self._lastProgress >= self.PROGRESS_INTERVAL or readToEnd:
+            self._lastProgress = now
+            self._lastBytesRead = bytesRead
+            self.signals.progress.emit(self.file, bytesRead, size, objsParsed)
+
+    def run(self):
+        try:
+            pack = Package(self.file, readProgress=self._onReadProgress)
+        except ReadingCancelled:
+            self.signals.cancelled.emit(self.file)
+        except Exception as e:
+            self.signals.error.emit(self.file, str(e))
+        else:
+            if self._cancelled:
+                self.signals.cancelled.emit(self.file)
+            else:
+                self.signals.finished.emit(self.file, pack)
+
+
+class PackageSaverSignals(QObject):
+    """Signals of PackageSaver, QRunnable itself can not emit signals"""
+    finished = pyqtSignal(object, str, str)  # package, file, temporary file the snapshot was written to
+    error = pyqtSignal(object, str, str)  # package, file, error message
+
+
+class PackageSaver(QRunnable):
+    """Writes a snapshot of a Package in a worker thread of a QThreadPool
+
+    The snapshot is taken on creation, so the package can be edited further while it is written.
+    It is written to a temporary file, which has to replace the file in the GUI thread by
+    Package.onSnapshotWritten(), as the package may still read lazy files from the replaced file.
+    """
+
+    def __init__(self, pack: Package, file: str = None):
+        super(PackageSaver, self).__init__()
+        self.pack = pack
+        self.file = Path(file if file else pack.file).absolute().as_posix()
+        self.signals = PackageSaverSignals()
+        self._snapshot = pack.snapshot()
+
+    def run(self):
+        try:
+            tmpFile = self._snapshot.writeTmpFile(self.file)
+        except Exception as e:
+            self.signals.error.emit(self.pack, self.file, str(e))
+        else:
+            self.signals.finished.emit(self.pack, self.file, tmpFile.as_posix())
@@ -0,0 +1,85 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import contextlib
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import aas_editor.settings
+from aas_editor.package import Package
+from aas_editor.tools.convert import conversionJobs, main
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+
+
+class TestConvert(TestCase):
+    def setUp(self):
+        self.tmpDir = Path(tempfile.mkdtemp())
+        self.src = self.tmpDir.joinpath("src")
+        shutil.copytree(AAS_FILES, self.src.joinpath("sub"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_conversion_jobs(self):
+        dst = self.src.joinpath("out")
+        jobs = conversionJobs(self.src, dst, "json", ["xml", "aasx"])
+        self.assertEqual(len(jobs), len(list(AAS_FILES.glob("*.xml"))) + 1)
+        for src, target in jobs:
+            self.assertEqual(target, dst.joinpath("sub", src.name).with_suffix(".json"))
+
+        # results of a previous run are not converted again
+        dst.joinpath("sub").mkdir(parents=True)
+        shutil.copy(AAS_FILES.joinpath("1testXml.xml"), dst.joinpath("sub"))
+        self.assertEqual(len(conversionJobs(self.src, dst, "json", ["xml", "aasx"])), len(jobs))
+
+        file = AAS_FILES.joinpath("1testXml.xml")
+        self.assertEqual(conversionJobs(file, dst, "aasx"), [(file, dst.joinpath("1testXml.aasx"))])
+
+    def test_convert(self):
+        dst = self.tmpDir.joinpath("dst")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            exitCode = main([self.src.as_posix(), dst.as_posix(), "--to", "json", "--from", "xml", "-j", "2"])
+        self.assertEqual(exitCode, 0)
+        self.assertIn("files/s", out.getvalue())
+        for file in AAS_FILES.glob("*.xml"):
+            converted = Package(dst.joinpath("sub", file.name).with_suffix(".json"))
+            self.assertEqual(len(converted.objStore), len(Package(file).objStore), file)
+
+    def test_convert_in_place(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            exitCode = main([self.src.as_posix(), self.src.as_posix(), "--to", "json", "--from", "xml", "-j", "2"])
+        self.assertEqual(exitCode, 0)
+        self.assertNotIn("No files", out.getvalue())
+        for file in AAS_FILES.glob("*.xml"):
+            self.assertTrue(self.src.joinpath("sub", file.name).with_suffix(".json").exists(), file)
+
+    def test_same_targets(self):
+        # files with the same name but different file types would be converted to the same file
+        shutil.copy(AAS_FILES.joinpath("testJson.json"), self.src.joinpath("sub", "1testXml.json"))
+        with self.assertRaises(ValueError):
+            conversionJobs(self.src, self.tmpDir.joinpath("dst"), "aasx")
+        with contextlib.redirect_stderr(io.StringIO()) as err, self.assertRaises(SystemExit):
+            main([self.src.as_posix(), self.tmpDir.joinpath("dst").as_posix(), "--to", "aasx"])
+        self.assertIn("1testXml.json", err.getvalue())
+
+    def test_convert_failed(self):
+        # aasx packages can not be written without shell
+        src = self.src.joinpath("sub", "3testXml.xml")
+        self.assertFalse(list(Package(src).shells))
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as err:
+            exitCode = main([src.as_posix(), self.tmpDir.as_posix(), "--to", "aasx", "-j", "1"])
+        self.assertEqual(exitCode, 1)
+        self.assertIn("3testXml.xml", err.getvalue())
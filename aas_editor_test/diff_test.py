@@ -0,0 +1,57 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+from pathlib import Path
+from unittest import TestCase
+
+from aas.model import Property, datatypes, Submodel, Identifier, IdentifierType
+
+import aas_editor.settings
+from aas_editor.package import Package
+from aas_editor.tools.diff import diffPackages, Change, ADDED, REMOVED, CHANGED
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+
+
+class TestDiff(TestCase):
+    def setUp(self) -> None:
+        self.old = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        self.new = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+
+    def test_diff_equal(self):
+        self.assertEqual(diffPackages(self.old, self.new), [])
+
+    def test_diff_changed(self):
+        shell = next(self.new.shells)
+        shell.category = "NewCategory"
+        submodel = next(self.new.submodels)
+        element = next(iter(submodel.submodel_element))
+        element.description = {"en": "changed description"}
+
+        changes = diffPackages(self.old, self.new)
+        self.assertIn(Change(CHANGED, (shell.identification.id,), ("category",)), changes)
+        self.assertIn(Change(CHANGED, (submodel.identification.id, element.id_short), ("description",)), changes)
+        self.assertEqual(len(changes), 2)
+
+    def test_diff_added_removed(self):
+        submodel = next(self.new.submodels)
+        element = next(iter(submodel.submodel_element))
+        submodel.submodel_element.remove(element)
+        submodel.submodel_element.add(Property("NewProperty", datatypes.String, "value"))
+        newSubmodel = Submodel(Identifier("https://example.com/NewSubmodel", IdentifierType.IRI))
+        self.new.add(newSubmodel)
+
+        changes = diffPackages(self.old, self.new)
+        self.assertCountEqual(changes, [
+            Change(REMOVED, (submodel.identification.id, element.id_short)),
+            Change(ADDED, (submodel.identification.id, "NewProperty")),
+            Change(ADDED, (newSubmodel.identification.id,)),
+        ])
+        self.assertIn(Change(REMOVED, (newSubmodel.identification.id,)), diffPackages(self.new, self.old))
@@ -0,0 +1,64 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import contextlib
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from aas.model import Property, SubmodelElementCollection
+
+import aas_editor.settings
+from aas_editor.package import Package
+from aas_editor.tools.diff import diffPackages
+from aas_editor.tools.generate import GeneratorConfig, generatePackage, main
+from aas_editor.utils.util_references import iterElements
+
+CONFIG = GeneratorConfig(shells=2, submodels=2, depth=2, width=2, properties=3, references=4,
+                         conceptDescriptions=5, languages=("en", "de", "fr"), files=3, fileSize=100)
+
+
+class TestGenerate(TestCase):
+    def setUp(self):
+        self.tmpDir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_generate(self):
+        pack = generatePackage(CONFIG)
+        self.assertEqual(pack.numOfShells, 2)
+        self.assertEqual(pack.numOfSubmodels, 4)
+        self.assertEqual(pack.numOfConceptDescriptions, 5)
+        self.assertEqual(len(list(pack.files)), 6)
+        elements = [element for submodel in pack.submodels for element in iterElements(submodel)]
+        self.assertEqual(len(elements), CONFIG.numOfElements())
+        self.assertEqual(max(len(list(iterElements(collection))) for collection in elements
+                             if isinstance(collection, SubmodelElementCollection)), 3 + 2 * (1 + 3))
+        self.assertTrue(all(set(element.description) == {"en", "de", "fr"} for element in elements))
+        # every property and submodel has a concept description as semantic id
+        properties = [element for element in elements if isinstance(element, Property)]
+        self.assertEqual(sum(len(pack.referenceIndex.usages(cd)) for cd in pack.concept_descriptions),
+                         len(properties) + 4)
+
+    def test_deterministic(self):
+        self.assertEqual(diffPackages(generatePackage(CONFIG), generatePackage(CONFIG)), [])
+        self.assertTrue(diffPackages(generatePackage(CONFIG), generatePackage(CONFIG._replace(seed=1))))
+
+    def test_main(self):
+        files = [self.tmpDir.joinpath(f"generated.{suffix}") for suffix in ("xml", "json", "aasx")]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main([file.as_posix() for file in files] + ["--shells", "1", "--files", "2"]), 0)
+        packs = [Package(file) for file in files]
+        self.assertEqual(diffPackages(packs[0], packs[1]), [])
+        self.assertEqual(diffPackages(packs[0], packs[2]), [])
+        self.assertEqual(len(list(packs[2].files)), 2)
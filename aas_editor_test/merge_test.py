@@ -0,0 +1,81 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import io
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from aas.model import File, Submodel, Identifier, IdentifierType
+
+import aas_editor.settings
+from aas_editor.package import Package
+from aas_editor.tools.diff import Change, CHANGED
+from aas_editor.tools.merge import mergePackages, LAST
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+
+
+def packWithFile(submodelId: str, content: bytes) -> Package:
+    pack = Package()
+    name = pack.fileStore.add_file("/aasx/doc.pdf", io.BytesIO(content), "application/pdf")
+    submodel = Submodel(Identifier(submodelId, IdentifierType.IRI))
+    submodel.submodel_element.add(File("Document", "application/pdf", name))
+    pack.add(submodel)
+    return pack
+
+
+class TestMerge(TestCase):
+    def setUp(self) -> None:
+        self.pack1 = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        self.pack2 = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+
+    def test_merge_equal(self):
+        pack, conflicts = mergePackages([self.pack1, self.pack2])
+        self.assertEqual(conflicts, [])
+        self.assertEqual(len(pack.objStore), len(self.pack1.objStore))
+        # objects of the merged package are copies
+        self.assertTrue(all(pack.objStore.get_identifiable(obj.identification) is not obj
+                            for obj in self.pack1.objStore))
+
+    def test_merge_conflict(self):
+        shell = next(self.pack2.shells)
+        shell.category = "Changed"
+        pack, conflicts = mergePackages([self.pack1, self.pack2])
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0].id, shell.identification.id)
+        self.assertEqual(conflicts[0].changes, (Change(CHANGED, (shell.identification.id,), ("category",)),))
+        self.assertNotEqual(pack.objStore.get_identifiable(shell.identification).category, "Changed")
+
+        pack, conflicts = mergePackages([self.pack1, self.pack2], keep=LAST)
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(pack.objStore.get_identifiable(shell.identification).category, "Changed")
+
+    def test_merge_files(self):
+        packs = [packWithFile("https://example.com/sm1", b"first"),
+                 packWithFile("https://example.com/sm2", b"first"),
+                 packWithFile("https://example.com/sm3", b"second")]
+        pack, conflicts = mergePackages(packs)
+        self.assertEqual(conflicts, [])
+        # equal files are stored once, different files with the same name are renamed
+        self.assertCountEqual(list(pack.fileStore), ["/aasx/doc.pdf", "/aasx/doc_0001.pdf"])
+        sm3 = pack.objStore.get_identifiable(Identifier("https://example.com/sm3", IdentifierType.IRI))
+        name = sm3.submodel_element.get_referable("Document").value
+        self.assertEqual(name, "/aasx/doc_0001.pdf")
+        out = io.BytesIO()
+        pack.fileStore.write_file(name, out)
+        self.assertEqual(out.getvalue(), b"second")
+
+    def test_merge_write(self):
+        pack, _ = mergePackages([self.pack1, self.pack2])
+        with tempfile.TemporaryDirectory() as tmpDir:
+            file = Path(tmpDir).joinpath("merged.aasx")
+            pack.write(file.as_posix())
+            self.assertEqual(len(Package(file).objStore), len(self.pack1.objStore))
@@ -0,0 +1,416 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import TestCase
+
+from aas.adapter import aasx
+from aas.model import DictObjectStore, AssetAdministrationShell, Asset, Submodel, ConceptDescription, \
+    AASReference, Property, Key, KeyElements, KeyType, File
+
+import aas_editor.settings
+from aas_editor.package import Package, ReadingCancelled, readAasXmlFileStreaming, \
+    LazySupplementaryFileContainer, StoredFile, IndexedObjectStore, IncrementalAASXWriter, UMASK
+from aas_editor.utils.util_cache import FileCache
+from aas_editor.utils.util_references import iterElements
+from aas_editor.utils.util_zip import CompressionPolicy
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+TEST_FILES = [AAS_FILES.joinpath(name) for name in
+              ("TestPackage.aasx", "1testXml.xml", "testJson.json")]
+
+
+class TestPackageRead(TestCase):
+    def test_read(self):
+        for file in TEST_FILES:
+            pack = Package(file)
+            self.assertEqual(pack.numOfShells, 1, file)
+            self.assertTrue(pack.numOfSubmodels, file)
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        self.assertEqual(len(list(pack.files)), 1)
+
+    def test_read_progress(self):
+        for file in TEST_FILES:
+            progress = []
+            pack = Package(file, readProgress=lambda *args: progress.append(args))
+            self.assertTrue(progress, file)
+            bytesRead, size, objsParsed = progress[-1]
+            self.assertEqual(bytesRead, file.stat().st_size)
+            self.assertEqual(size, file.stat().st_size)
+            self.assertLessEqual(objsParsed, len(pack.objStore))
+
+    def test_read_cancelled(self):
+        def cancel(*args):
+            raise ReadingCancelled()
+
+        for file in TEST_FILES:
+            with self.assertRaises(ReadingCancelled):
+                Package(file, readProgress=cancel)
+
+    def test_wrong_file_type(self):
+        with self.assertRaises(TypeError):
+            Package(AAS_FILES.joinpath("TestPackage.txt"))
+
+    def test_pickle(self):
+        # packages are read in other processes at startup and sent back pickled
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        unpickledPack = pickle.loads(pickle.dumps(pack))
+        self.assertEqual(unpickledPack.file, pack.file)
+        self.assertEqual(len(unpickledPack.objStore), len(pack.objStore))
+        self.assertEqual(list(unpickledPack.files), list(pack.files))
+        self.assertEqual(unpickledPack.objStore.sortedIds(), pack.objStore.sortedIds())
+
+
+class TestIndexedObjectStore(TestCase):
+    def test_index(self):
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        objStore = pack.objStore
+        self.assertIsInstance(objStore, IndexedObjectStore)
+        for typ, objs, num in ((AssetAdministrationShell, pack.shells, pack.numOfShells),
+                               (Asset, pack.assets, pack.numOfAssets),
+                               (Submodel, pack.submodels, pack.numOfSubmodels),
+                               (ConceptDescription, pack.concept_descriptions, pack.numOfConceptDescriptions)):
+            expected = [obj for obj in objStore if isinstance(obj, typ)]
+            self.assertEqual(list(objs), expected)
+            self.assertEqual(num, len(expected))
+
+        submodel = next(iter(pack.submodels))
+        numOfSubmodels = pack.numOfSubmodels
+        objStore.discard(submodel)
+        self.assertEqual(pack.numOfSubmodels, numOfSubmodels - 1)
+        self.assertNotIn(submodel, list(pack.submodels))
+        pack.add(submodel)
+        self.assertEqual(pack.numOfSubmodels, numOfSubmodels)
+
+        unpickled = pickle.loads(pickle.dumps(objStore))
+        self.assertEqual(unpickled.numOfType(Submodel), numOfSubmodels)
+        self.assertEqual(len(list(unpickled.objectsOfType(Submodel))), numOfSubmodels)
+
+    def test_sorted_ids(self):
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        objStore = pack.objStore
+        ids = objStore.sortedIds()
+        self.assertEqual(ids, sorted(obj.identification.id for obj in objStore))
+        self.assertIs(objStore.sortedIds(), ids)
+
+        submodel = next(pack.submodels)
+        version = objStore.version
+        objStore.discard(submodel)
+        self.assertGreater(objStore.version, version)
+        self.assertNotIn(submodel.identification.id, objStore.sortedIds())
+
+
+class TestPackageResolve(TestCase):
+    def test_resolve(self):
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        submodel = next(pack.submodels)
+        reference = AASReference.from_referable(submodel)
+        self.assertIs(pack.resolve(reference), submodel)
+        # equal references share the cached result
+        self.assertIs(pack.resolve(AASReference.from_referable(submodel)), submodel)
+
+        prop = Property("CachedProperty", str)
+        propKey = Key(KeyElements.PROPERTY, True, prop.id_short, KeyType.IDSHORT)
+        propReference = AASReference(reference.key + (propKey,), Property)
+        with self.assertRaises(KeyError):
+            pack.resolve(propReference)
+        submodel.submodel_element.add(prop)
+        # element was added without the model, the failure is still cached
+        with self.assertRaises(KeyError):
+            pack.resolve(propReference)
+        pack.invalidateReferences()
+        self.assertIs(pack.resolve(propReference), prop)
+
+        pack.discard(submodel)
+        with self.assertRaises(KeyError):
+            pack.resolve(reference)
+
+
+class TestPackageWrite(TestCase):
+    def setUp(self):
+        self.tmpDir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_write(self):
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        for file in TEST_FILES:
+            newFile = self.tmpDir.joinpath(file.name)
+            pack.write(newFile)
+            self.assertEqual(len(Package(newFile).objStore), len(pack.objStore), file)
+        self.assertEqual(sorted(p.name for p in self.tmpDir.iterdir()), sorted(f.name for f in TEST_FILES))
+
+    def test_write_failed(self):
+        file = self.tmpDir.joinpath("1testXml.xml")
+        shutil.copy(AAS_FILES.joinpath("1testXml.xml"), file)
+        content = file.read_bytes()
+        pack = Package(file)
+        next(iter(pack.submodels)).category = object()  # can not be serialized
+        with self.assertRaises(Exception):
+            pack.write()
+        self.assertEqual(file.read_bytes(), content)
+        self.assertEqual([p.name for p in self.tmpDir.iterdir()], [file.name])
+
+    def test_tmp_files(self):
+        # several processes may write the same file
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        file = self.tmpDir.joinpath("NewPackage.aasx")
+        tmpFiles = [pack.writeTmpFile(file), pack.writeTmpFile(file)]
+        self.assertNotEqual(tmpFiles[0], tmpFiles[1])
+        for tmpFile in tmpFiles:
+            pack.onSnapshotWritten(tmpFile, file)
+        self.assertEqual([p.name for p in self.tmpDir.iterdir()], [file.name])
+        # new files get the usual permissions, not the ones of temporary files
+        self.assertEqual(file.stat().st_mode & 0o777, 0o666 & ~UMASK)
+
+    def test_snapshot(self):
+        file = self.tmpDir.joinpath("TestPackage.aasx")
+        shutil.copy(AAS_FILES.joinpath("TestPackage.aasx"), file)
+        pack = Package(file)
+        snapshot = pack.snapshot()
+        shell = next(iter(pack.shells))
+        shell.id_short = "ChangedShell"
+        pack.fileStore.add_file("/added.txt", io.BytesIO(b"added"), "text/plain")
+        self.assertNotEqual(next(iter(snapshot.package().shells)).id_short, "ChangedShell")
+        self.assertNotIn("/added.txt", snapshot.package().fileStore)
+
+        newFile = self.tmpDir.joinpath("NewPackage.aasx")
+        tmpFile = snapshot.writeTmpFile(newFile)
+        self.assertEqual(pack.file, file)
+        pack.onSnapshotWritten(tmpFile, newFile)
+        self.assertEqual(pack.file, newFile)
+        self.assertEqual(pack.fileStore.archive, newFile)
+        self.assertNotEqual(next(iter(Package(newFile).shells)).id_short, "ChangedShell")
+
+    def test_snapshot_unreferenced_file(self):
+        file = self.tmpDir.joinpath("TestPackage.aasx")
+        shutil.copy(AAS_FILES.joinpath("TestPackage.aasx"), file)
+        pack = Package(file)
+        name, = pack.fileStore
+        content = pack.fileStore.buffer(name).tobytes()
+        for submodel in pack.submodels:
+            for element in iterElements(submodel):
+                if isinstance(element, File) and element.value == name:
+                    element.value = None
+
+        # the file is not written to the new archive, which replaces the archive it is read from
+        tmpFile = pack.snapshot().writeTmpFile(file)
+        pack.onSnapshotWritten(tmpFile, file)
+        self.assertFalse(pack.fileStore.isLazy(name))
+        self.assertEqual(pack.fileStore.buffer(name).tobytes(), content)
+        self.assertEqual([p.name for p in self.tmpDir.iterdir()], [file.name])
+
+
+class TestPackageCache(TestCase):
+    def setUp(self):
+        self.tmpDir = Path(tempfile.mkdtemp())
+        self.defaultCache = Package.cache
+        Package.cache = FileCache(self.tmpDir.joinpath("cache"), maxSize=2**30)
+
+    def tearDown(self):
+        Package.cache = self.defaultCache
+        shutil.rmtree(self.tmpDir)
+
+    def test_read_cached(self):
+        for file in TEST_FILES:
+            pack = Package(file)
+            key = Package.cache.key(file)
+            self.assertIsNotNone(Package.cache.get(key), file)
+
+            cachedPack = Package(file, readProgress=lambda *args: None)
+            self.assertEqual(len(cachedPack.objStore), len(pack.objStore))
+            self.assertEqual(list(cachedPack.files), list(pack.files))
+            self.assertEqual(len(list(Package.cache.dir.iterdir())), TEST_FILES.index(file) + 1)
+
+    def test_invalidated(self):
+        file = self.tmpDir.joinpath("1testXml.xml")
+        shutil.copy(AAS_FILES.joinpath("1testXml.xml"), file)
+        pack = Package(file)
+        next(iter(pack.submodels)).id_short = "ChangedSubmodel"
+        pack.write()
+        self.assertIsNone(Package.cache.get(Package.cache.key(file)))
+        self.assertEqual(next(iter(Package(file).submodels)).id_short, "ChangedSubmodel")
+
+    def test_evict(self):
+        cache = Package.cache
+        keys = [cache.key(file) for file in TEST_FILES]
+        cache.put(keys[0], b"x" * 1000)
+        entry, = cache.dir.iterdir()
+        os.utime(entry, (0, 0))  # least recently used
+        cache.maxSize = 2 * entry.stat().st_size
+        for key in keys[1:]:
+            cache.put(key, b"x" * 1000)
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertEqual(cache.get(keys[-1]), b"x" * 1000)
+
+
+class TestReadAasXmlFileStreaming(TestCase):
+    def test_read(self):
+        for file in AAS_FILES.glob("*.xml"):
+            objStore = aasx.read_aas_xml_file(file.as_posix())
+            streamedObjStore = DictObjectStore()
+            readAasXmlFileStreaming(streamedObjStore, file.as_posix())
+            self.assertEqual(len(streamedObjStore), len(objStore), file)
+            for obj in objStore:
+                streamedObj = streamedObjStore.get_identifiable(obj.identification)
+                self.assertEqual(type(streamedObj), type(obj))
+                self.assertEqual(streamedObj.id_short, obj.id_short)
+
+
+class TestLazySupplementaryFileContainer(TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.file = Path(self.tmpDir).joinpath("TestPackage.aasx")
+        shutil.copy(AAS_FILES.joinpath("TestPackage.aasx"), self.file)
+        with zipfile.ZipFile(self.file) as zf:
+            self.pdf = zf.read("TestFile.pdf")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def content(self, fileStore, name):
+        content = io.BytesIO()
+        fileStore.write_file(name, content)
+        return content.getvalue()
+
+    def test_read_on_demand(self):
+        pack = Package(self.file)
+        self.assertIsInstance(pack.fileStore, LazySupplementaryFileContainer)
+        self.assertTrue(pack.fileStore.isLazy("/TestFile.pdf"))
+        self.assertEqual(pack.fileStore.get_content_type("/TestFile.pdf"), "application/pdf")
+        self.assertEqual(self.content(pack.fileStore, "/TestFile.pdf"), self.pdf)
+
+    def test_add_file(self):
+        pack = Package(self.file)
+        fileStore = pack.fileStore
+        self.assertEqual(fileStore.add_file("/TestFile.pdf", io.BytesIO(self.pdf), "application/pdf"),
+                         "/TestFile.pdf")
+        self.assertEqual(fileStore.add_file("/TestFile.pdf", io.BytesIO(b"other"), "application/pdf"),
+                         "/TestFile_0001.pdf")
+        self.assertFalse(fileStore.isLazy("/TestFile_0001.pdf"))
+        self.assertEqual(self.content(fileStore, "/TestFile_0001.pdf"), b"other")
+        self.assertEqual(list(fileStore), ["/TestFile.pdf", "/TestFile_0001.pdf"])
+
+    def test_save(self):
+        pack = Package(self.file)
+        pack.write()
+        self.assertTrue(pack.fileStore.isLazy("/TestFile.pdf"))
+        self.assertEqual(self.content(pack.fileStore, "/TestFile.pdf"), self.pdf)
+        self.assertEqual(self.content(Package(self.file).fileStore, "/TestFile.pdf"), self.pdf)
+
+        newFile = Path(self.tmpDir).joinpath("NewPackage.aasx")
+        pack.write(newFile)
+        self.assertEqual(pack.fileStore.archive, newFile)
+        self.assertEqual(self.content(Package(newFile).fileStore, "/TestFile.pdf"), self.pdf)
+
+    def test_save_incremental(self):
+        pack = Package(self.file)
+        pack.write()
+        with zipfile.ZipFile(self.file) as zf:
+            infos = {info.filename: info for info in zf.infolist()}
+
+        pack.write()
+        with zipfile.ZipFile(self.file) as zf:
+            for info in zf.infolist():
+                if info.filename != "docProps/core.xml":  # creation time is always updated
+                    self.assertEqual(info.CRC, infos[info.filename].CRC, info.filename)
+                    self.assertEqual(info.compress_size, infos[info.filename].compress_size, info.filename)
+            self.assertIsNone(zf.testzip())
+
+        shell = next(iter(pack.shells))
+        shell.id_short = "ChangedShell"
+        pack.write()
+        pack = Package(self.file)
+        self.assertEqual(next(iter(pack.shells)).id_short, "ChangedShell")
+        self.assertEqual(self.content(pack.fileStore, "/TestFile.pdf"), self.pdf)
+
+    def test_save_compression(self):
+        pack = Package(self.file)
+        pack.fileStore.add_file("/Image.jpg", io.BytesIO(b"jpeg" * 1000), "image/jpeg")
+        newFile = Path(self.tmpDir).joinpath("NewPackage.aasx")
+        pack.write(newFile)
+        with zipfile.ZipFile(newFile) as zf:
+            # the jpeg is not referenced and not written, the xml is compressed
+            self.assertNotIn("Image.jpg", zf.NameToInfo)
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_DEFLATED for info in zf.infolist()
+                                if info.filename.endswith(".xml")))
+
+        policy = CompressionPolicy(["application/pdf", "video/"], level=1)
+        self.assertEqual(policy.compression("application/PDF"), (zipfile.ZIP_STORED, None))
+        self.assertEqual(policy.compression("video/mp4"), (zipfile.ZIP_STORED, None))
+        self.assertEqual(policy.compression("application/xml; charset=utf-8"), (zipfile.ZIP_DEFLATED, 1))
+
+        newFile = Path(self.tmpDir).joinpath("DeflatedPackage.aasx")
+        with IncrementalAASXWriter(newFile, policy=CompressionPolicy()) as writer:
+            writer.write_aas(next(pack.shells).identification, pack.objStore, pack.fileStore)
+        with zipfile.ZipFile(newFile) as zf:
+            self.assertEqual(zf.getinfo("TestFile.pdf").compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(zf.read("TestFile.pdf"), self.pdf)
+        newFile = Path(self.tmpDir).joinpath("StoredPackage.aasx")
+        with IncrementalAASXWriter(newFile, policy=policy) as writer:
+            writer.write_aas(next(pack.shells).identification, pack.objStore, pack.fileStore)
+        with zipfile.ZipFile(newFile) as zf:
+            self.assertEqual(zf.getinfo("TestFile.pdf").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.read("TestFile.pdf"), self.pdf)
+            self.assertIsNone(zf.testzip())
+
+    def test_changed_archive(self):
+        pack = Package(self.file)
+        with zipfile.ZipFile(self.file, "w") as zf:
+            zf.writestr("TestFile.pdf", b"changed")
+        with self.assertRaises(ValueError):
+            self.content(pack.fileStore, "/TestFile.pdf")
+
+
+class TestStoredFile(TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        # copy of the test package with the uncompressed pdf
+        self.file = Path(self.tmpDir).joinpath("TestPackage.aasx")
+        with zipfile.ZipFile(AAS_FILES.joinpath("TestPackage.aasx")) as zin, \
+                zipfile.ZipFile(self.file, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                if info.filename not in zout.NameToInfo:
+                    compression = zipfile.ZIP_STORED if info.filename == "TestFile.pdf" else zipfile.ZIP_DEFLATED
+                    zout.writestr(info.filename, zin.read(info), compress_type=compression)
+            self.pdf = zin.read("TestFile.pdf")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_buffer(self):
+        for file in (self.file, AAS_FILES.joinpath("TestPackage.aasx")):
+            storedFile = StoredFile("/TestFile.pdf", Package(file).fileStore)
+            buffer = storedFile.buffer()
+            self.assertTrue(buffer.readonly)
+            self.assertEqual(buffer, self.pdf)
+            self.assertEqual(storedFile.value, self.pdf)
+            with storedFile.open() as f:
+                self.assertEqual(f.read(), self.pdf)
+
+    def test_buffer_not_saved(self):
+        file = Path(self.tmpDir).joinpath("TestFile.pdf")
+        file.write_bytes(self.pdf)
+        storedFile = StoredFile(filePath=file)
+        self.assertEqual(storedFile.buffer(), self.pdf)
+        with storedFile.open() as f:
+            self.assertEqual(f.read(), self.pdf)
+
+        pack = Package()
+        pack.add(storedFile)
+        self.assertTrue(storedFile.savedInStore())
+        self.assertEqual(storedFile.buffer(), self.pdf)
@@ -0,0 +1,68 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+from pathlib import Path
+from unittest import TestCase
+
+from PyQt5.QtCore import QModelIndex, Qt
+from PyQt5.QtWidgets import QApplication
+from aas.model import Submodel, Identifier, IdentifierType, Key
+
+import aas_editor.settings
+from aas_editor.models import IdCompletionModel, ID_COMPLETIONS, PacksTable, DetailedInfoTable
+from aas_editor.package import Package
+from aas_editor.settings import DEFAULT_COMPLETIONS, COLUMNS_IN_PACKS_TABLE, ADD_ITEM_ROLE, OBJECT_ROLE, \
+    NAME_ROLE, VALUE_COLUMN
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+
+app = QApplication.instance() or QApplication([])
+
+
+class TestIdCompletionModel(TestCase):
+    def test_completions(self):
+        self.assertIs(DEFAULT_COMPLETIONS[Key]["value"], ID_COMPLETIONS)
+
+        pack1 = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        pack2 = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        model = IdCompletionModel()
+        model.setPackages([pack1, pack2])
+        model.refresh()
+        # ids of both packages are equal and listed only once
+        self.assertEqual(model.stringList(), pack1.objStore.sortedIds())
+
+        pack2.add(Submodel(Identifier("https://example.com/sm", IdentifierType.IRI)))
+        self.assertEqual(model.completions("https://example.com"), ["https://example.com/sm"])
+        self.assertEqual(model.completions("https://acplt.org/Test_Sub"), ["https://acplt.org/Test_Submodel"])
+
+        # ids of closed packages are removed
+        model.setPackages([pack1])
+        self.assertEqual(model.completions("https://example.com"), [])
+
+    def test_edited_id(self):
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        model = IdCompletionModel()
+        model.setPackages([pack])
+        self.assertEqual(model.completions("https://example.com"), [])
+
+        packsTable = PacksTable(COLUMNS_IN_PACKS_TABLE)
+        packsTable.setData(QModelIndex(), pack, ADD_ITEM_ROLE)
+        submodel = next(pack.submodels)
+        oldId = submodel.identification
+        submodelIndex, = packsTable.match(QModelIndex(), OBJECT_ROLE, submodel, hits=1)
+        detailedInfo = DetailedInfoTable(submodelIndex)
+        idIndex, = [detailedInfo.index(row, VALUE_COLUMN) for row in range(detailedInfo.rowCount())
+                    if detailedInfo.index(row, 0).data(NAME_ROLE) == "identification"]
+        newId = Identifier("https://example.com/edited", IdentifierType.IRI)
+        self.assertTrue(detailedInfo.setData(idIndex, newId, Qt.EditRole))
+
+        self.assertEqual(model.completions("https://example.com"), ["https://example.com/edited"])
+        self.assertNotIn(oldId.id, model.completions(oldId.id))
+        self.assertIs(pack.objStore.get_identifiable(newId), submodel)
@@ -0,0 +1,46 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+from unittest import TestCase
+
+from PyQt5.QtCore import QModelIndex
+from PyQt5.QtWidgets import QApplication
+from aas.model import Property
+
+import aas_editor.settings
+from aas_editor.models import PacksTable, DetailedInfoTable
+from aas_editor.settings import COLUMNS_IN_PACKS_TABLE, ADD_ITEM_ROLE, OBJECT_ROLE, NAME_ROLE
+from aas_editor.tools.generate import GeneratorConfig, generatePackage
+
+app = QApplication.instance() or QApplication([])
+
+
+class TestDetailedInfoTable(TestCase):
+    def setUp(self) -> None:
+        self.pack = generatePackage(GeneratorConfig(submodels=1, depth=1, width=1, properties=1, languages=()))
+        self.packsTable = PacksTable(COLUMNS_IN_PACKS_TABLE)
+        self.packsTable.setData(QModelIndex(), self.pack, ADD_ITEM_ROLE)
+        self.prop = next(element for element in next(self.pack.submodels).submodel_element
+                         if isinstance(element, Property))
+
+    def test_lazy_population(self):
+        propIndex, = self.packsTable.match(QModelIndex(), OBJECT_ROLE, self.prop, hits=1)
+        model = DetailedInfoTable(propIndex)
+        # attributes of the object are populated, their children are populated when fetched
+        attrs = {model.index(row, 0).data(NAME_ROLE): model.index(row, 0) for row in range(model.rowCount())}
+        semanticId = attrs["semantic_id"]
+        self.assertIs(semanticId.data(OBJECT_ROLE), self.prop.semantic_id)
+        self.assertTrue(model.hasChildren(semanticId))
+        self.assertFalse(model.hasChildren(attrs["value_id"]))
+        self.assertEqual(model.rowCount(semanticId), 0)
+        self.assertTrue(model.canFetchMore(semanticId))
+        model.fetchMore(semanticId)
+        self.assertFalse(model.canFetchMore(semanticId))
+        self.assertGreater(model.rowCount(semanticId), 0)
@@ -0,0 +1,188 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from PyQt5.QtCore import QModelIndex
+from PyQt5.QtWidgets import QApplication
+from aas.model import Submodel, Identifier, IdentifierType, AASReference, SubmodelElementCollection, Referable
+
+import aas_editor.settings
+from aas_editor.models import PacksTable, StandardTable
+from aas_editor.package import Package
+from aas_editor.settings import COLUMNS_IN_PACKS_TABLE, ADD_ITEM_ROLE, OBJECT_ROLE, NAME_ROLE, \
+    CLEAR_ROW_ROLE, NOT_GIVEN
+from aas_editor.utils.util_journal import EditJournal
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+app = QApplication.instance() or QApplication([])
+
+
+def rowIndexes(model: PacksTable, parent: QModelIndex) -> list:
+    # fetch rows of lazily populated items like a view expanding parent
+    if model.canFetchMore(parent):
+        model.fetchMore(parent)
+    return [model.index(row, 0, parent) for row in range(model.rowCount(parent))]
+
+
+class TestPacksTable(TestCase):
+    def setUp(self) -> None:
+        self.model = PacksTable(COLUMNS_IN_PACKS_TABLE)
+        self.pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        self.model.setData(QModelIndex(), self.pack, ADD_ITEM_ROLE)
+        self.packIndex = self.model.index(0, 0)
+
+    def attrIndex(self, attr: str, model: PacksTable = None, packIndex: QModelIndex = None) -> QModelIndex:
+        model = model or self.model
+        packIndex = packIndex or self.packIndex
+        attrIndex, = [index for index in rowIndexes(model, packIndex) if index.data(NAME_ROLE) == attr]
+        return attrIndex
+
+    def rowObjects(self, attr: str) -> list:
+        attrIndex = self.attrIndex(attr)
+        return [index.data(OBJECT_ROLE) for index in rowIndexes(self.model, attrIndex)]
+
+    def test_lazy_population(self):
+        # only the package item is created when the package is opened
+        self.assertEqual(self.model.rowCount(self.packIndex), 0)
+        self.assertTrue(self.model.hasChildren(self.packIndex))
+        self.assertTrue(self.model.canFetchMore(self.packIndex))
+        submodelsIndex = self.attrIndex("submodels")
+        self.assertFalse(self.model.canFetchMore(self.packIndex))
+        self.assertEqual(self.model.rowCount(submodelsIndex), 0)
+        self.assertEqual(self.rowObjects("submodels"), list(self.pack.submodels))
+        self.assertEqual([file.name for file in self.rowObjects("fileStore")], list(self.pack.fileStore))
+
+        # items not fetched yet are found
+        submodel = next(self.pack.submodels)
+        element = next(iter(submodel.submodel_element))
+        elementIndex, = self.model.match(self.packIndex, OBJECT_ROLE, element, hits=1)
+        self.assertIs(elementIndex.data(OBJECT_ROLE), element)
+        self.assertIs(elementIndex.parent().data(OBJECT_ROLE), submodel)
+        self.assertIs(self.model.indexByPath(self.model.itemPath(elementIndex)[1:], self.packIndex).data(OBJECT_ROLE),
+                      element)
+
+    def test_rows(self):
+        submodelsIndex = self.attrIndex("submodels")
+        submodels = self.rowObjects("submodels")
+        self.assertGreater(len(submodels), 2)
+        self.assertTrue(self.model.removeRows(0, 2, submodelsIndex))
+        self.assertEqual(self.rowObjects("submodels"), submodels[2:])
+        for index in rowIndexes(self.model, submodelsIndex):
+            self.assertEqual(self.model.objByIndex(index).row(), index.row())
+            self.assertEqual(self.model.parent(index), submodelsIndex)
+        self.assertEqual(self.model.parent(submodelsIndex), self.packIndex)
+
+    def test_compact_items(self):
+        items = [self.model.objByIndex(index) for index in rowIndexes(self.model, self.attrIndex("submodels"))]
+        self.assertGreater(len(items), 1)
+        self.assertFalse(any(hasattr(item, "__dict__") for item in items))
+        # metadata of items of the same type is shared
+        self.assertIs(items[0].icon, items[1].icon)
+        self.assertIs(items[0].bg, items[1].bg)
+
+    def test_match_object(self):
+        submodels = list(self.pack.submodels)
+        submodel = next(submodel for submodel in reversed(submodels) if len(submodel.submodel_element))
+        element = next(iter(submodel.submodel_element))
+        elementIndex, = self.model.match(QModelIndex(), OBJECT_ROLE, element, hits=1)
+        self.assertIs(elementIndex.data(OBJECT_ROLE), element)
+        self.assertIs(elementIndex.parent().data(OBJECT_ROLE), submodel)
+        # only the items on the path to the element are fetched
+        self.assertFalse(self.model.canFetchMore(elementIndex.parent()))
+        otherSubmodelIndexes = [index for index in rowIndexes(self.model, self.attrIndex("submodels"))
+                                if index.data(OBJECT_ROLE) is not submodel]
+        self.assertTrue(any(self.model.canFetchMore(index) for index in otherSubmodelIndexes))
+
+        # items of removed rows are not matched
+        self.assertTrue(self.model.removeRow(elementIndex.row(), elementIndex.parent()))
+        self.assertEqual(self.model.match(QModelIndex(), OBJECT_ROLE, element, hits=1), [])
+
+    def test_match_missing_object(self):
+        # an equal collection of another package has no item, only the levels down to its depth are fetched
+        otherPack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        collection = next(element for submodel in otherPack.submodels for element in submodel.submodel_element
+                          if isinstance(element, SubmodelElementCollection) and len(element.value))
+        self.assertEqual(self.model.match(QModelIndex(), OBJECT_ROLE, collection, hits=1), [])
+        fetchedObjs = [index.data(OBJECT_ROLE) for index in self.model.iterItems(QModelIndex(), fetch=False)]
+        self.assertTrue(any(isinstance(obj, SubmodelElementCollection) for obj in fetchedObjs))
+        self.assertFalse(any(isinstance(obj.parent, SubmodelElementCollection) for obj in fetchedObjs
+                             if isinstance(obj, Referable)))
+
+    def test_reload_pack(self):
+        newPack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        changedShell = next(newPack.shells)
+        changedShell.category = "Changed"
+        removedSubmodel = next(newPack.submodels)
+        newPack.discard(removedSubmodel)
+        addedSubmodel = Submodel(Identifier("https://example.com/NewSubmodel", IdentifierType.IRI))
+        newPack.add(addedSubmodel)
+        assets = self.rowObjects("assets")
+
+        self.assertEqual(self.model.reloadPack(self.packIndex, newPack), 3)
+        self.assertIn(changedShell, self.rowObjects("shells"))
+        self.assertIn(addedSubmodel, self.rowObjects("submodels"))
+        self.assertNotIn(removedSubmodel.identification,
+                         [obj.identification for obj in self.rowObjects("submodels")])
+        # rows of unchanged identifiables are kept
+        self.assertEqual(self.rowObjects("assets"), assets)
+        self.assertCountEqual([obj.identification for obj in self.pack.objStore],
+                              [obj.identification for obj in newPack.objStore])
+        self.assertEqual(self.model.reloadPack(self.packIndex, newPack), 0)
+
+    def test_replay_edits(self):
+        tmpDir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmpDir)
+        defaultJournal = StandardTable.journal
+        StandardTable.journal = EditJournal(tmpDir.joinpath("journal"))
+        self.addCleanup(setattr, StandardTable, "journal", defaultJournal)
+        file = tmpDir.joinpath("TestPackage.aasx")
+        shutil.copy(AAS_FILES.joinpath("TestPackage.aasx"), file)
+
+        model = PacksTable(COLUMNS_IN_PACKS_TABLE)
+        model.setData(QModelIndex(), Package(file), ADD_ITEM_ROLE)
+        packIndex = model.index(0, 0)
+        StandardTable.journal.start(file)
+        addedSubmodel = Submodel(Identifier("https://example.com/NewSubmodel", IdentifierType.IRI))
+        self.assertTrue(model.setData(self.attrIndex("submodels", model, packIndex), addedSubmodel, ADD_ITEM_ROLE))
+        assetsIndex = self.attrIndex("assets", model, packIndex)
+        assetIndex = rowIndexes(model, assetsIndex)[0]
+        removedAsset = assetIndex.data(OBJECT_ROLE)
+        self.assertTrue(model.setData(assetIndex, NOT_GIVEN, CLEAR_ROW_ROLE))
+        # closing the package is not journaled
+        self.assertTrue(model.setData(packIndex, NOT_GIVEN, CLEAR_ROW_ROLE))
+
+        entries = StandardTable.journal.entries(file)
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(StandardTable.journal.pendingFiles(), [file])
+
+        # edits are replayed onto the saved package
+        recoveredModel = PacksTable(COLUMNS_IN_PACKS_TABLE)
+        recoveredModel.setData(QModelIndex(), Package(file), ADD_ITEM_ROLE)
+        recoveredPack = recoveredModel.index(0, 0).data(OBJECT_ROLE)
+        self.assertEqual(recoveredModel.replayEdits(recoveredModel.index(0, 0), entries), 2)
+        self.assertIn(addedSubmodel.identification, [obj.identification for obj in recoveredPack.submodels])
+        self.assertNotIn(removedAsset.identification, [obj.identification for obj in recoveredPack.assets])
+
+    def test_reference_index_updated(self):
+        index = self.pack.referenceIndex
+        submodel = next(self.pack.submodels)
+        usages = len(index.usages(submodel))
+        referencing = Submodel(Identifier("https://example.com/Referencing", IdentifierType.IRI),
+                               semantic_id=AASReference.from_referable(submodel))
+        submodelsIndex = self.attrIndex("submodels")
+        self.assertTrue(self.model.setData(submodelsIndex, referencing, ADD_ITEM_ROLE))
+        self.assertEqual(len(index.usages(submodel)), usages + 1)
+        row = self.rowObjects("submodels").index(referencing)
+        self.assertTrue(self.model.setData(self.model.index(row, 0, submodelsIndex), NOT_GIVEN, CLEAR_ROW_ROLE))
+        self.assertEqual(len(index.usages(submodel)), usages)
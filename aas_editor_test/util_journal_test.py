@@ -0,0 +1,86 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from aas_editor.utils.util_journal import EditJournal, JournalEntry
+
+
+def entry(value) -> JournalEntry:
+    return JournalEntry((("shells", 0),), None, 1, 2, value)
+
+
+class TestEditJournal(TestCase):
+    def setUp(self) -> None:
+        self.tmpDir = Path(tempfile.mkdtemp())
+        self.journal = EditJournal(self.tmpDir.joinpath("journal"))
+        self.file = self.tmpDir.joinpath("package.json")
+        self.file.write_text("{}")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpDir)
+
+    def test_record(self):
+        self.journal.record(self.file, entry("not started"))
+        self.assertEqual(self.journal.entries(self.file), [])
+        self.journal.start(self.file)
+        self.journal.record(self.file, entry(1))
+        self.journal.record(self.file, EditJournal.encode(entry(2)))
+        self.assertEqual(self.journal.entries(self.file), [entry(1), entry(2)])
+        self.assertEqual(EditJournal(self.journal.dir).pendingFiles(), [self.file])
+
+        self.journal.discard(self.file)
+        self.assertEqual(self.journal.entries(self.file), [])
+        self.assertEqual(self.journal.pendingFiles(), [])
+
+    def test_truncated(self):
+        self.journal.start(self.file)
+        self.journal.record(self.file, entry(1))
+        self.journal.record(self.file, entry(2))
+        journalFile, = self.journal.dir.iterdir()
+        with open(journalFile, "r+b") as f:
+            f.truncate(journalFile.stat().st_size - 3)
+        self.assertEqual(self.journal.entries(self.file), [entry(1)])
+
+    def test_changed_file(self):
+        self.journal.start(self.file)
+        self.journal.record(self.file, entry(1))
+        self.file.write_text('{"assetAdministrationShells": []}')
+        # edits were made on another version of the file
+        self.assertEqual(self.journal.entries(self.file), [])
+
+    def test_saved(self):
+        self.journal.start(self.file)
+        self.journal.record(self.file, entry(1))
+        checkpoint = self.journal.checkpoint(self.file)
+        self.journal.record(self.file, entry(2))
+        newFile = self.tmpDir.joinpath("new_package.json")
+        newFile.write_text("{}")
+        self.journal.saved(self.file, checkpoint, newFile)
+        self.assertEqual(self.journal.entries(self.file), [])
+        self.assertEqual(self.journal.entries(newFile), [entry(2)])
+
+    def test_clear(self):
+        otherFile = self.tmpDir.joinpath("other_package.json")
+        otherFile.write_text("{}")
+        # journal of another editor instance
+        otherJournal = EditJournal(self.journal.dir)
+        otherJournal.start(otherFile)
+        otherJournal.record(otherFile, entry(1))
+        self.journal.start(self.file)
+        self.journal.record(self.file, entry(2))
+
+        self.journal.clear()
+        self.assertEqual(self.journal.entries(self.file), [])
+        self.assertEqual(self.journal.startedFiles(), set())
+        self.assertEqual(otherJournal.entries(otherFile), [entry(1)])
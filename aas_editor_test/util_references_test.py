@@ -0,0 +1,77 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+from pathlib import Path
+from unittest import TestCase
+
+from aas.model import AASReference, Property, ReferenceElement, Submodel, Identifier, IdentifierType, \
+    SubmodelElementCollectionUnordered, ConceptDescription, Reference
+
+import aas_editor.settings
+from aas_editor.package import Package
+from aas_editor.utils.util_references import ReferenceIndex, referableTarget, referenceTarget
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+
+
+class TestReferenceIndex(TestCase):
+    def setUp(self) -> None:
+        self.pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        self.conceptDescription = ConceptDescription(Identifier("https://example.com/Concept", IdentifierType.IRI))
+        self.pack.add(self.conceptDescription)
+        self.target = Property("Target", str)
+        self.submodel = Submodel(Identifier("https://example.com/Submodel", IdentifierType.IRI),
+                                 semantic_id=AASReference.from_referable(self.conceptDescription))
+        self.submodel.submodel_element.add(self.target)
+        self.pack.add(self.submodel)
+
+    def test_targets(self):
+        collection = SubmodelElementCollectionUnordered("Collection")
+        element = Property("Element", str)
+        collection.value.add(element)
+        self.submodel.submodel_element.add(collection)
+        target = ("https://example.com/Submodel", "Collection", "Element")
+        self.assertEqual(referableTarget(element), target)
+        self.assertEqual(referenceTarget(AASReference.from_referable(element)), target)
+        self.assertIsNone(referableTarget(Property("Detached", str)))
+
+    def test_usages(self):
+        index = self.pack.referenceIndex
+        usage, = index.usages(self.conceptDescription)
+        self.assertIs(usage.obj, self.submodel)
+        self.assertEqual(usage.attr, "semantic_id")
+        self.assertEqual(index.usages(self.target), [])
+        # references in the test package are indexed too
+        self.assertTrue(len(index))
+
+    def test_update(self):
+        index = self.pack.referenceIndex
+        referenceElement = ReferenceElement("Link", AASReference.from_referable(self.target))
+        self.submodel.submodel_element.add(referenceElement)
+        self.pack.updateReferenceIndex(added=referenceElement)
+        usage, = index.usages(self.target)
+        self.assertIs(usage.obj, referenceElement)
+
+        referenceElement.value = Reference(AASReference.from_referable(self.submodel).key)
+        self.pack.updateReferenceIndex(changed=referenceElement)
+        # only model references are indexed
+        self.assertEqual(index.usages(self.target), [])
+
+        self.pack.discard(self.submodel)
+        self.assertEqual(index.usages(self.conceptDescription), [])
+
+    def test_remove_shared_target(self):
+        elements = [Property(f"Prop{i}", str, semantic_id=AASReference.from_referable(self.conceptDescription))
+                    for i in range(100)]
+        index = ReferenceIndex(elements)
+        self.assertEqual(len(index.usages(self.conceptDescription)), 100)
+        for element in elements[:50]:
+            index.remove(element)
+        self.assertEqual(len(index.usages(self.conceptDescription)), 50)
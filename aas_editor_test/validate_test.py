@@ -0,0 +1,65 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from aas.model import File
+
+import aas_editor.settings
+from aas_editor.package import Package
+from aas_editor.tools.validate import Validator, main, TYPE_MISMATCH, DANGLING_REFERENCE, MISSING_FILE
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+
+
+class TestValidator(TestCase):
+    def test_validate(self):
+        pack = Package(AAS_FILES.joinpath("TestPackage.aasx"))
+        issues = Validator(pack).validate()
+        # the test package references a shell and an asset, which are not in the package
+        self.assertEqual([issue["kind"] for issue in issues], [DANGLING_REFERENCE, DANGLING_REFERENCE])
+        shell = next(pack.shells)
+        self.assertIn([shell.identification.id, "derived_from"], [issue["path"] for issue in issues])
+
+        submodel = next(pack.submodels)
+        submodel.category = 5
+        submodel.submodel_element.add(File("MissingFile", "application/pdf", "/missing.pdf"))
+        issues = Validator(pack).validate()
+        self.assertIn({"kind": TYPE_MISMATCH, "path": [submodel.identification.id, "category"],
+                       "expected": "Optional[String]", "actual": "Integer"}, issues)
+        self.assertIn(MISSING_FILE, [issue["kind"] for issue in issues])
+
+
+class TestValidateMain(TestCase):
+    def setUp(self):
+        self.tmpDir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_main(self):
+        report = self.tmpDir.joinpath("report.json")
+        file = self.tmpDir.joinpath("broken.json")
+        file.write_text("{broken")
+        with contextlib.redirect_stderr(io.StringIO()):
+            exitCode = main([AAS_FILES.as_posix(), file.as_posix(), "-o", report.as_posix(), "-j", "2"])
+        self.assertEqual(exitCode, 1)
+
+        result = json.loads(report.read_text())
+        self.assertEqual(result["summary"]["files"], len(list(AAS_FILES.glob("*.*"))) + 1)
+        self.assertEqual(result["summary"]["failed"], 1)
+        self.assertEqual(result["files"][-1]["file"], file.as_posix())
+        self.assertTrue(result["files"][-1]["error"])
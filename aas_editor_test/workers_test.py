@@ -0,0 +1,53 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+import aas_editor.settings
+from aas_editor.package import Package, LazySupplementaryFileContainer
+from aas_editor.workers import PackageSaver
+
+AAS_FILES = Path(__file__).parent.joinpath("aas_files")
+
+
+class TestPackageSaver(TestCase):
+    def setUp(self):
+        self.tmpDir = Path(tempfile.mkdtemp())
+        self.file = self.tmpDir.joinpath("TestPackage.aasx")
+        shutil.copy(AAS_FILES.joinpath("TestPackage.aasx"), self.file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def save(self, pack: Package):
+        written = []
+        saver = PackageSaver(pack)
+        saver.signals.finished.connect(lambda pack, file, tmpFile: written.append((file, tmpFile)))
+        saver.signals.error.connect(lambda pack, file, msg: self.fail(msg))
+        saver.run()
+        (file, tmpFile), = written
+        pack.onSnapshotWritten(tmpFile, file)
+
+    def test_save(self):
+        pack = Package(self.file)
+        name, = pack.fileStore
+        self.save(pack)
+        self.assertTrue(pack.fileStore.isLazy(name))
+        self.assertEqual([p.name for p in self.tmpDir.iterdir()], [self.file.name])
+
+        # hashes of the lazy files computed while saving are kept, so they are not read again
+        with mock.patch.object(LazySupplementaryFileContainer, "_open", autospec=True,
+                               side_effect=LazySupplementaryFileContainer._open) as openFile:
+            self.save(pack)
+        openFile.assert_not_called()
+        self.assertEqual(Package(self.file).fileStore.get_sha256(name), pack.fileStore.get_sha256(name))
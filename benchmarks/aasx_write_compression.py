@@ -0,0 +1,78 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""
+Compare save time and file size of AASX files written with different compression policies
+
+The package of FILE gets N additional attachments of SIZE MB with random (incompressible)
+content, as photos or archives have. The package is read again for every policy, so that
+no part is copied from the archive written with another policy.
+Usage: python benchmarks/aasx_write_compression.py FILE [--attachments N] [--size SIZE]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).absolute().parent.parent
+sys.path.insert(0, ROOT.as_posix())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="AAS file with at least one shell and submodel")
+    parser.add_argument("--attachments", type=int, default=20, help="number of attachments")
+    parser.add_argument("--size", type=float, default=5, help="size of an attachment in MB")
+    args = parser.parse_args()
+    args.file = Path(args.file).absolute().as_posix()
+    os.chdir(ROOT)  # app settings load themes relative to the working directory
+
+    import aas_editor.settings
+    from aas.model import File
+    from aas_editor.package import Package
+    from aas_editor.settings import AASX_STORED_MIME_TYPES, AASX_COMPRESS_LEVEL
+    from aas_editor.utils.util_zip import CompressionPolicy
+
+    policies = {
+        "deflate all": CompressionPolicy(level=None),
+        "default": CompressionPolicy(AASX_STORED_MIME_TYPES, AASX_COMPRESS_LEVEL),
+        "fast": CompressionPolicy(AASX_STORED_MIME_TYPES, 1),
+    }
+
+    contents = [os.urandom(int(args.size * 2**20)) for _ in range(args.attachments)]
+
+    def readPackage() -> Package:
+        pack = Package(args.file)
+        submodel = next(pack.submodels)
+        for i, content in enumerate(contents):
+            mimeType = "image/jpeg" if i % 2 else "application/zip"
+            suffix = ".jpg" if i % 2 else ".zip"
+            name = pack.fileStore.add_file(f"/aasx/attachments/attachment{i}{suffix}", io.BytesIO(content), mimeType)
+            submodel.submodel_element.add(File(f"Attachment{i}", mimeType, name))
+        return pack
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for policyName, policy in policies.items():
+            # written packages read their files from the written archive, so every policy gets a new package
+            pack = readPackage()
+            Package.compressionPolicy = policy
+            file = Path(tmpDir).joinpath(f"{policyName.replace(' ', '_')}.aasx")
+            start = time.perf_counter()
+            pack.write(file.as_posix())
+            duration = time.perf_counter() - start
+            print(f"{policyName:>12}: {duration:.2f} s, {file.stat().st_size / 2**20:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
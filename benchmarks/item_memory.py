@@ -0,0 +1,115 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""
+Measure memory and time per row of the fully fetched package tree and detailed info tables
+
+The package is generated with 99,600 elements by aas_editor.tools.generate. Every source
+tree is measured in a fresh process; to compare versions, pass a checkout of the older
+version too, e.g. made by "git worktree add /tmp/old <commit>".
+Usage: python benchmarks/item_memory.py [TREE ...] [--details N]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).absolute().parent.parent
+sys.path.insert(0, ROOT.as_posix())
+
+# 10 submodels with 30 collections and 9,920 properties each
+CONFIG = dict(submodels=10, depth=2, width=5, properties=320, languages=())
+
+
+def rss() -> int:
+    """Current resident set size of this process in bytes"""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(tree: str, details: int):
+    sys.path.insert(0, tree)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QModelIndex
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication([])
+
+    import aas_editor.settings
+    from aas.model import Property
+    from aas_editor.models import DetailedInfoTable, PacksTable
+    from aas_editor.settings import ADD_ITEM_ROLE, COLUMNS_IN_PACKS_TABLE, OBJECT_ROLE
+    from aas_editor.tools.generate import GeneratorConfig, generatePackage
+
+    def numOfRows(model, parent=QModelIndex()) -> int:
+        return sum(1 + numOfRows(model, model.index(row, 0, parent)) for row in range(model.rowCount(parent)))
+
+    def fetched(createModels):
+        gc.collect()
+        rssBefore = rss()
+        start = time.perf_counter()
+        models = list(createModels())
+        for model in models:
+            model.fetchAll()
+        duration = time.perf_counter() - start
+        gc.collect()
+        size = rss() - rssBefore
+        rows = sum(numOfRows(model) for model in models)
+        return models, {"rows": rows, "bytesPerRow": size / rows, "timePerRow": duration / rows}
+
+    config = GeneratorConfig(**CONFIG)
+    pack = generatePackage(config)
+    results = {"elements": config.numOfElements()}
+    # the models print debug output
+    with contextlib.redirect_stdout(io.StringIO()):
+        packsTable = PacksTable(COLUMNS_IN_PACKS_TABLE)
+        packsTable.setData(QModelIndex(), pack, ADD_ITEM_ROLE)
+        (packsTable,), results["packTree"] = fetched(lambda: [packsTable])
+
+        props = [element for element in next(pack.submodels).submodel_element
+                 if isinstance(element, Property)][:details]
+        indexes = [packsTable.match(QModelIndex(), OBJECT_ROLE, prop, hits=1)[0] for prop in props]
+        _, results["detailedInfo"] = fetched(lambda: (DetailedInfoTable(index) for index in indexes))
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trees", nargs="*", metavar="TREE", default=[ROOT.as_posix()],
+                        help="source trees of the editor to measure, default: this one")
+    parser.add_argument("--details", type=int, default=320,
+                        help="number of properties to open a detailed info table for")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    trees = [Path(tree).absolute().as_posix() for tree in args.trees]
+
+    if args.measure:
+        os.chdir(trees[0])  # app settings load themes relative to the working directory
+        measure(trees[0], args.details)
+        return
+
+    for tree in trees:
+        out = subprocess.run([sys.executable, __file__, tree, "--details", str(args.details), "--measure"],
+                             check=True, capture_output=True, text=True).stdout
+        res = json.loads(out.splitlines()[-1])
+        print(f"{tree} ({res['elements']} elements):")
+        for table in ("packTree", "detailedInfo"):
+            print(f"{table:>14}: {res[table]['rows']} rows, {res[table]['bytesPerRow']:.0f} bytes/row, "
+                  f"{res[table]['timePerRow'] * 1e6:.0f} us/row")
+
+
+if __name__ == '__main__':
+    main()
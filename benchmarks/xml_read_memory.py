@@ -0,0 +1,116 @@
+#  Copyright (C) 2021  Igor Garmaev, garmaev@gmx.net
+#
+#  This program is made available under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+#  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
+
+"""
+Compare peak memory and time of the DOM based and the streaming XML reader
+
+Every reader runs in a fresh process, so that the peak RSS of one run does not hide the other.
+Usage: python benchmarks/xml_read_memory.py FILE [--scale N]
+"""
+
+import argparse
+import copy
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).absolute().parent.parent
+sys.path.insert(0, ROOT.as_posix())
+
+MODES = ("dom", "streaming")
+
+
+def maxRss() -> int:
+    """Peak resident set size of this process in bytes"""
+    try:
+        # unlike ru_maxrss, VmHWM is not inherited from the parent process on linux
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def read(mode: str, file: str):
+    import aas_editor.settings
+    from aas.adapter import aasx
+    from aas.model import DictObjectStore
+    from aas_editor.package import readAasXmlFileStreaming
+
+    rssBefore = maxRss()
+    start = time.perf_counter()
+    if mode == "dom":
+        objStore = aasx.read_aas_xml_file(file)
+    else:
+        objStore = DictObjectStore()
+        readAasXmlFileStreaming(objStore, file)
+    duration = time.perf_counter() - start
+    print(json.dumps({"objects": len(objStore), "time": duration,
+                      "rssBefore": rssBefore, "rssPeak": maxRss()}))
+
+
+def scale(file: str, n: int) -> str:
+    """Write a copy of file with every identifiable repeated n times"""
+    import aas_editor.settings
+    from aas.adapter import aasx
+    from aas.model import DictObjectStore, Identifier
+
+    objStore = aasx.read_aas_xml_file(file)
+    scaledObjStore = DictObjectStore()
+    for obj in objStore:
+        for i in range(n):
+            objCopy = copy.deepcopy(obj)
+            objCopy.identification = Identifier(f"{obj.identification.id}_{i}", obj.identification.id_type)
+            scaledObjStore.add(objCopy)
+    scaledFile = tempfile.NamedTemporaryFile(suffix=".xml", delete=False).name
+    aasx.write_aas_xml_file(scaledFile, scaledObjStore)
+    return scaledFile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="AAS XML file")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="repeat every identifiable of the file N times before measuring")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.file = Path(args.file).absolute().as_posix()
+    os.chdir(ROOT)  # app settings load themes relative to the working directory
+
+    if args.mode:
+        read(args.mode, args.file)
+        return
+
+    file = scale(args.file, args.scale) if args.scale > 1 else args.file
+    size = Path(file).stat().st_size
+    print(f"{file}: {size / 2**20:.1f} MB")
+    try:
+        for mode in MODES:
+            out = subprocess.run([sys.executable, __file__, file, "--mode", mode],
+                                 check=True, capture_output=True, text=True).stdout
+            res = json.loads(out.splitlines()[-1])
+            peak = res["rssPeak"] - res["rssBefore"]
+            print(f"{mode:>10}: {res['objects']} objects in {res['time']:.2f} s, "
+                  f"peak RSS +{peak / 2**20:.1f} MB ({peak / size:.1f}x file size)")
+    finally:
+        if file != args.file:
+            Path(file).unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,7 @@
 #
 #  A copy of the GNU General Public License is available at http://www.gnu.org/licenses/
 
+import multiprocessing
 import sys
 from PyQt5.QtWebEngineWidgets import *
 from PyQt5 import QtWidgets
@@ -25,4 +26,5 @@ def main():
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     main()